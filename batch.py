@@ -0,0 +1,304 @@
+"""Headless batch processing over many images with a process pool.
+
+Contoh:
+
+    python batch.py "photos/*.jpg" -o out --op rotate:angle=15 --op blur:k=5
+    python batch.py photos -o out --op background:mode=auto,output=transparent \\
+        --format png --workers 8 --resume
+    python batch.py big -o out --op background:mode=solid,budget_mb=256 --workers 2
+
+Beberapa --op dijalankan berurutan; operasi geometris yang berurutan
+dilipat jadi satu warp (satu kali resample). Subfolder di bawah akar
+input yang sama dicerminkan di folder output.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from PIL import Image
+
+from processing import (
+    HAIR_BAND_WIDTH,
+    adjust_brightness_contrast,
+    apply_matrix_transform,
+    blur_image,
+    compose_transforms,
+    edge_image,
+    grayscale_image,
+    image_to_bytes,
+    reflection_matrix,
+    remove_background_advanced,
+    rotation_matrix,
+    scaling_matrix,
+    sharpen_image,
+    shear_matrix,
+    simple_background_removal_hsv,
+    translation_matrix,
+)
+
+FORMAT_EXT = {"PNG": ".png", "JPEG": ".jpg", "WEBP": ".webp"}
+
+SOLID_COLORS = {
+    "white": (255, 255, 255),
+    "red": (255, 0, 0),
+    "blue": (0, 0, 255),
+    "yellow": (255, 255, 0),
+    "green": (0, 255, 0),
+    "brown": (150, 75, 0),
+}
+
+# ===================== OPERATIONS =====================
+# Operasi geometris mengembalikan langkah {"M", "size"} untuk ditumpuk;
+# filter menerima dan mengembalikan array RGB.
+
+def _geo_translate(w, h, dx=0, dy=0):
+    return {"M": translation_matrix(dx, dy), "size": None}
+
+def _geo_scale(w, h, sx=1.0, sy=1.0):
+    return {"M": scaling_matrix(sx, sy), "size": (int(w * sx), int(h * sy))}
+
+def _geo_rotate(w, h, angle=0):
+    return {"M": rotation_matrix(angle, w, h), "size": None}
+
+def _geo_shear(w, h, x=0.0, y=0.0):
+    return {"M": shear_matrix(x, y), "size": None}
+
+def _geo_reflect(w, h, axis="y"):
+    return {"M": reflection_matrix(axis, w, h), "size": None}
+
+def _filter_background(img, mode="auto", output="transparent", color="white",
+                       feather=3, hair=1, budget_mb=0, coarse=0, islands=0,
+                       hair_band=HAIR_BAND_WIDTH):
+    return remove_background_advanced(
+        image=img,
+        mode=mode,
+        output_mode=output,
+        solid_color=SOLID_COLORS[color] if output == "solid_color" else None,
+        feather_radius=int(feather),
+        refine_hair=bool(int(hair)),
+        memory_budget_mb=budget_mb or None,
+        coarse_level=int(coarse),
+        min_island_area=int(islands),
+        hair_band_width=int(hair_band),
+    )
+
+GEOMETRIC_OPS = {
+    "translate": _geo_translate,
+    "scale": _geo_scale,
+    "rotate": _geo_rotate,
+    "shear": _geo_shear,
+    "reflect": _geo_reflect,
+}
+
+FILTER_OPS = {
+    "blur": lambda img, k=3: blur_image(img, int(k)),
+    "sharpen": lambda img: sharpen_image(img),
+    "grayscale": lambda img: grayscale_image(img),
+    "edge": lambda img, method="Sobel": edge_image(img, method.capitalize()),
+    "brightness": lambda img, brightness=0, contrast=0: adjust_brightness_contrast(img, brightness, contrast),
+    "background": _filter_background,
+    "background_hsv": lambda img: simple_background_removal_hsv(img),
+}
+
+
+def _parse_value(text):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_op(spec):
+    """Parse "name:key=val,key=val" into (name, kwargs)."""
+    name, _, params = spec.partition(":")
+    name = name.strip().lower()
+    if name not in GEOMETRIC_OPS and name not in FILTER_OPS:
+        known = ", ".join(sorted([*GEOMETRIC_OPS, *FILTER_OPS]))
+        raise argparse.ArgumentTypeError(f"unknown op {name!r} (known: {known})")
+    kwargs = {}
+    for item in filter(None, params.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"expected key=value in {spec!r}, got {item!r}")
+        kwargs[key.strip()] = _parse_value(value.strip())
+    return name, kwargs
+
+
+def run_ops(img, ops):
+    """Apply parsed ops in order; consecutive geometric ops share one warp."""
+    pending = []
+
+    def flush(img):
+        if not pending:
+            return img
+        M, size = compose_transforms(pending, (img.shape[1], img.shape[0]))
+        pending.clear()
+        return apply_matrix_transform(img, M, output_size=size)
+
+    for name, kwargs in ops:
+        if name in GEOMETRIC_OPS:
+            # Matriks dibangun di kanvas setelah langkah sebelumnya.
+            _, (w, h) = compose_transforms(pending, (img.shape[1], img.shape[0]))
+            pending.append(GEOMETRIC_OPS[name](w, h, **kwargs))
+        else:
+            img = flush(img)
+            img = FILTER_OPS[name](img, **kwargs)
+    return flush(img)
+
+# ===================== FILES =====================
+
+def _is_image(path):
+    try:
+        with Image.open(path):
+            return True
+    except Exception:
+        return False
+
+
+def collect_inputs(source):
+    """Files from a directory (sniffed, so extensionless JPEGs count) or a glob."""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in sorted(os.listdir(source))]
+    else:
+        paths = sorted(glob.glob(source, recursive=True))
+    return [p for p in paths if os.path.isfile(p) and _is_image(p)]
+
+
+def output_paths(inputs, out_dir, fmt):
+    """Output path per input, mirroring subfolders under the common input root.
+
+    Struktur folder dipertahankan supaya a/x.jpg dan b/x.jpg tidak saling
+    menimpa. Input yang masih bentrok (mis. x.png dan x.jpg di folder yang
+    sama) melempar ValueError sebelum ada file yang ditulis.
+    """
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in inputs])
+    outputs, owners = {}, {}
+    for in_path in inputs:
+        rel = os.path.relpath(os.path.abspath(in_path), root)
+        out_path = os.path.join(out_dir, os.path.splitext(rel)[0] + FORMAT_EXT[fmt])
+        owners.setdefault(os.path.normcase(out_path), []).append(in_path)
+        outputs[in_path] = out_path
+    clashes = [paths for paths in owners.values() if len(paths) > 1]
+    if clashes:
+        raise ValueError("inputs map to the same output file: "
+                         + "; ".join(", ".join(paths) for paths in clashes))
+    return outputs
+
+
+def process_file(in_path, out_path, ops, fmt):
+    """Worker: decode, run ops, encode, write atomically. Returns timings (s)."""
+    t0 = time.perf_counter()
+    with Image.open(in_path) as im:
+        img = np.array(im.convert("RGB"))
+    t1 = time.perf_counter()
+    result = run_ops(img, ops)
+    t2 = time.perf_counter()
+    data = image_to_bytes(result, fmt=fmt)
+    # Tulis ke file sementara dulu supaya --resume tidak menganggap file
+    # setengah jadi (proses terputus) sebagai selesai.
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp_path = out_path + ".part"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, out_path)
+    t3 = time.perf_counter()
+    return {"decode": t1 - t0, "process": t2 - t1, "encode": t3 - t2,
+            "total": t3 - t0, "megapixels": img.shape[0] * img.shape[1] / 1e6}
+
+# ===================== REPORTING =====================
+
+def _print_row(in_path, status, timing=None):
+    if timing is None:
+        print(f"{status:7s} {in_path}", flush=True)
+        return
+    print(f"{status:7s} {in_path}  total {timing['total'] * 1000:8.1f} ms"
+          f"  (decode {timing['decode'] * 1000:.1f} / process {timing['process'] * 1000:.1f}"
+          f" / encode {timing['encode'] * 1000:.1f})", flush=True)
+
+
+def print_summary(timings, skipped, failed, wall):
+    print("-" * 60)
+    print(f"processed {len(timings)}, skipped {skipped}, failed {failed}, wall {wall:.2f} s")
+    if not timings:
+        return
+    totals = np.array([t["total"] for t in timings]) * 1000
+    mp = sum(t["megapixels"] for t in timings)
+    print(f"per file ms: mean {totals.mean():.1f}  p50 {np.percentile(totals, 50):.1f}"
+          f"  p95 {np.percentile(totals, 95):.1f}  max {totals.max():.1f}")
+    print(f"throughput: {len(timings) / wall:.2f} files/s, {mp / wall:.2f} MP/s")
+
+# ===================== CLI =====================
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Apply the app's transforms and filters to many images.")
+    parser.add_argument("input", help="input directory or glob pattern")
+    parser.add_argument("-o", "--output", required=True, help="output directory")
+    parser.add_argument("--op", dest="ops", action="append", type=parse_op, default=[],
+                        help="operation spec name:key=val,... (repeatable, applied in order)")
+    parser.add_argument("--format", default="png", type=str.upper, choices=sorted(FORMAT_EXT),
+                        help="output format (default: png)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="process pool size (default: CPU count)")
+    parser.add_argument("--ordered", action="store_true",
+                        help="report results in input order instead of completion order")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip inputs whose output file already exists")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not args.ops:
+        print("no --op given; nothing to do", file=sys.stderr)
+        return 2
+
+    inputs = collect_inputs(args.input)
+    if not inputs:
+        print(f"no images found for {args.input!r}", file=sys.stderr)
+        return 1
+    try:
+        outputs = output_paths(inputs, args.output, args.format)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    os.makedirs(args.output, exist_ok=True)
+
+    jobs, skipped = [], 0
+    for in_path in inputs:
+        out_path = outputs[in_path]
+        if args.resume and os.path.exists(out_path):
+            skipped += 1
+            _print_row(in_path, "skip")
+            continue
+        jobs.append((in_path, out_path))
+
+    timings, failed = [], 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {pool.submit(process_file, in_path, out_path, args.ops, args.format): in_path
+                   for in_path, out_path in jobs}
+        ordered = list(futures) if args.ordered else as_completed(futures)
+        for future in ordered:
+            in_path = futures[future]
+            try:
+                timing = future.result()
+            except Exception as e:
+                failed += 1
+                _print_row(in_path, "FAILED")
+                print(f"        {type(e).__name__}: {e}", file=sys.stderr)
+                continue
+            timings.append(timing)
+            _print_row(in_path, "ok", timing)
+    print_summary(timings, skipped, failed, time.perf_counter() - start)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
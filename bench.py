@@ -0,0 +1,353 @@
+"""Benchmark suite for the image-processing helpers in processing.py.
+
+Setiap helper dijalankan pada gambar sintetis 0.3 MP - 24 MP dan foto
+contoh 1-4. Hasil (waktu, puncak memori, throughput MP/s) disimpan ke JSON
+sebagai baseline; mode --compare menampilkan selisih terhadap baseline per
+baris dan gagal bila ada regresi di atas ambang.
+
+Memori diukur dua cara: peak_mb = puncak alokasi Python/numpy
+(tracemalloc), rss_mb = kenaikan puncak RSS proses selama satu panggilan
+(VmHWM, Linux), yang juga mencakup buffer native OpenCV.
+
+    python bench.py --save bench_baseline.json
+    python bench.py --compare bench_baseline.json --threshold 0.25
+    python bench.py --sizes 0.3,1 --only background --repeat 3
+    python bench.py --sizes 5 --coarse-quality 1,2
+"""
+import argparse
+import ctypes
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import cv2
+from PIL import Image
+
+from processing import (
+    _remove_small_holes,
+    adjust_brightness_contrast,
+    apply_affine_transform,
+    compute_histogram,
+    image_to_bytes,
+    manual_convolution_gray,
+    remove_background_advanced,
+    rgb_to_gray,
+    rotation_matrix,
+    simple_background_removal_hsv,
+)
+
+DEFAULT_SIZES = [0.3, 1, 2, 5, 12, 24]
+SAMPLE_FILES = ["1", "2", "3", "4"]
+BACKGROUND_MODES = ["auto", "solid", "studio", "gradient", "textured",
+                    "natural", "minimalist", "abstract", "vintage"]
+
+# ===================== INPUTS =====================
+
+def synthetic_image(megapixels, seed=0):
+    """Deterministic 4:3 RGB test image: smooth background, a subject, noise."""
+    w = int(round(np.sqrt(megapixels * 1e6 * 4 / 3)))
+    h = int(round(w * 3 / 4))
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    img = np.empty((h, w, 3), dtype=np.uint8)
+    img[:, :, 0] = (180 + 40 * xx / w).astype(np.uint8)
+    img[:, :, 1] = (190 + 30 * yy / h).astype(np.uint8)
+    img[:, :, 2] = 200
+    cv2.ellipse(img, (w // 2, h // 2), (int(w * 0.25), int(h * 0.38)), 0, 0, 360,
+                (90, 60, 50), -1)
+    cv2.circle(img, (w // 2, int(h * 0.3)), int(min(w, h) * 0.12), (200, 160, 130), -1)
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(-8, 9, size=(h, w, 1), dtype=np.int16)
+    return np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def load_inputs(sizes, with_samples=True):
+    inputs = [(f"synthetic_{mp:g}MP", synthetic_image(mp)) for mp in sizes]
+    if with_samples:
+        for name in SAMPLE_FILES:
+            if os.path.exists(name):
+                with Image.open(name) as im:
+                    inputs.append((f"sample_{name}", np.array(im.convert("RGB"))))
+    return inputs
+
+# ===================== CASES =====================
+# Tiap case: (nama, fungsi pembuat). Pembuat menerima gambar RGB dan
+# mengembalikan callable tanpa argumen yang diukur; persiapan (grayscale,
+# matriks) tidak ikut dihitung.
+
+def _case_convolution(img):
+    gray = rgb_to_gray(img)
+    kernel = np.ones((7, 7), dtype=np.float32) / 49
+    return lambda: manual_convolution_gray(gray, kernel)
+
+
+def _case_affine(img):
+    h, w = img.shape[:2]
+    M = rotation_matrix(30, w, h)
+    return lambda: apply_affine_transform(img, M)
+
+
+def _case_background(mode, budget_mb=None):
+    return lambda img: (lambda: remove_background_advanced(
+        img, mode=mode, memory_budget_mb=budget_mb))
+
+
+def _case_gray(img):
+    return lambda: rgb_to_gray(img)
+
+
+def _case_brightness(img):
+    return lambda: adjust_brightness_contrast(img, brightness=20, contrast=15)
+
+
+def _case_histogram(img):
+    return lambda: compute_histogram(img)
+
+
+def _case_encode(fmt):
+    return lambda img: (lambda: image_to_bytes(img, fmt=fmt))
+
+
+def _case_speckled_holes(img):
+    # Ribuan lubang kecil (kasus terburuk loop per kontur) ditambah lubang besar.
+    h, w = img.shape[:2]
+    rng = np.random.default_rng(0)
+    mask = (rng.random((h, w)) < 0.9).astype(np.uint8)
+    mask[h // 4:h // 2, w // 4:w // 2] = 0
+    return lambda: _remove_small_holes(mask, min_area=100, min_island_area=100)
+
+
+def _case_hsv(img):
+    return lambda: simple_background_removal_hsv(img)
+
+
+CASES = [
+    ("manual_convolution_gray[7x7 box]", _case_convolution),
+    ("apply_affine_transform[rotate 30]", _case_affine),
+    ("rgb_to_gray", _case_gray),
+    ("adjust_brightness_contrast[+20, +15%]", _case_brightness),
+    *[(f"remove_background_advanced[{m}]", _case_background(m)) for m in BACKGROUND_MODES],
+    *[(f"remove_background_advanced[{m}, budget {b}MB]", _case_background(m, b))
+      for m, b in (("solid", 256), ("gradient", 64), ("auto", 64))],
+    ("remove_small_holes[speckled]", _case_speckled_holes),
+    ("compute_histogram", _case_histogram),
+    ("image_to_bytes[PNG]", _case_encode("PNG")),
+    ("image_to_bytes[JPEG]", _case_encode("JPEG")),
+    ("simple_background_removal_hsv", _case_hsv),
+]
+
+# ===================== MEASUREMENT =====================
+
+try:
+    _libc = ctypes.CDLL("libc.so.6")
+except OSError:
+    _libc = None
+
+
+def _proc_status_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise OSError(field)
+
+
+def peak_rss_mb(fn):
+    """Growth of peak RSS (MB) above the current RSS while `fn()` runs.
+
+    Memakai VmHWM yang di-reset lewat /proc/self/clear_refs, jadi hanya
+    Linux; None bila tidak tersedia.
+    """
+    gc.collect()
+    if _libc is not None:
+        # Kembalikan memori bebas milik malloc ke OS; tanpa ini alokasi
+        # yang memakai ulang heap dari run sebelumnya tidak menaikkan RSS.
+        _libc.malloc_trim(0)
+    try:
+        before = _proc_status_mb("VmRSS")
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return None
+    fn()
+    return max(0.0, _proc_status_mb("VmHWM") - before)
+
+
+def measure(fn, repeat):
+    """Best-of-`repeat` wall time, one traced run for the Python-visible peak,
+    and one run for the RSS peak (includes native buffers)."""
+    fn()  # warm-up (cache kernel, import lazy, dsb.)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak, peak_rss_mb(fn)
+
+
+def _vs_baseline(row, ref):
+    """Per-metric change against a baseline row, e.g. 'time -12% py +0% rss -30%'."""
+    if ref is None:
+        return ""
+    parts = []
+    for metric, label in (("seconds", "time"), ("peak_mb", "py"), ("rss_mb", "rss")):
+        old, new = ref.get(metric), row.get(metric)
+        if old is None or new is None:
+            continue
+        parts.append(f"{label} {(new - old) / old:+.0%}" if old > 0 else f"{label} n/a")
+    return "  vs base: " + " ".join(parts)
+
+
+def run_suite(inputs, only=None, repeat=3, baseline=None, log=print):
+    base = _baseline_index(baseline)
+    results = []
+    for case_name, make in CASES:
+        if only and not any(pattern in case_name for pattern in only):
+            continue
+        for image_name, img in inputs:
+            mp = img.shape[0] * img.shape[1] / 1e6
+            seconds, peak, rss = measure(make(img), repeat)
+            row = {
+                "case": case_name,
+                "image": image_name,
+                "megapixels": round(mp, 3),
+                "seconds": seconds,
+                "peak_mb": peak / (1024 * 1024),
+                "rss_mb": rss,
+                "mp_per_s": mp / seconds if seconds > 0 else float("inf"),
+            }
+            results.append(row)
+            rss_text = f"{rss:9.1f}" if rss is not None else "      n/a"
+            log(f"{case_name:42s} {image_name:18s} {seconds * 1000:10.1f} ms "
+                f"{row['peak_mb']:9.1f} MB py {rss_text} MB rss {row['mp_per_s']:9.2f} MP/s"
+                + _vs_baseline(row, base.get((case_name, image_name))))
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+# ===================== COARSE-TO-FINE QUALITY =====================
+
+def mask_agreement(ref, test):
+    """IoU of the binarized masks and mean absolute alpha difference (0..255)."""
+    a, b = ref >= 128, test >= 128
+    union = np.count_nonzero(a | b)
+    iou = np.count_nonzero(a & b) / union if union else 1.0
+    mae = float(np.abs(ref.astype(np.int16) - test.astype(np.int16)).mean())
+    return iou, mae
+
+
+def coarse_quality(inputs, levels, repeat=3, log=print):
+    """Latency and mask agreement of coarse_level=L against the full-res path."""
+    rows = []
+    for mode in BACKGROUND_MODES:
+        for image_name, img in inputs:
+            def run(level):
+                return remove_background_advanced(img, mode=mode, output_mode="custom_mask",
+                                                  coarse_level=level)
+            ref = run(0)
+            base_s = measure(lambda: run(0), repeat)[0]
+            for level in levels:
+                seconds = measure(lambda: run(level), repeat)[0]
+                iou, mae = mask_agreement(ref, run(level))
+                rows.append({"mode": mode, "image": image_name, "level": level,
+                             "seconds": seconds, "full_seconds": base_s,
+                             "iou": iou, "alpha_mae": mae})
+                log(f"{mode:11s} {image_name:18s} L{level}  {base_s * 1000:8.1f} -> "
+                    f"{seconds * 1000:8.1f} ms ({base_s / seconds:4.1f}x)  "
+                    f"IoU {iou:.3f}  alpha MAE {mae:5.2f}")
+    return rows
+
+# ===================== COMPARE =====================
+
+def _baseline_index(baseline):
+    if baseline is None:
+        return {}
+    return {(r["case"], r["image"]): r for r in baseline["results"]}
+
+
+def compare(results, baseline, threshold, log=print):
+    """Return the list of regressions (time or peak memory) beyond `threshold`."""
+    base = _baseline_index(baseline)
+    regressions = []
+    for row in results:
+        ref = base.get((row["case"], row["image"]))
+        if ref is None:
+            continue
+        for metric in ("seconds", "peak_mb", "rss_mb"):
+            # Baseline lama belum punya rss_mb.
+            old, new = ref.get(metric), row.get(metric)
+            if old is None or new is None or old <= 0:
+                continue
+            change = (new - old) / old
+            if change > threshold:
+                regressions.append((row["case"], row["image"], metric, old, new, change))
+    for case, image, metric, old, new, change in regressions:
+        log(f"REGRESSION {case} {image} {metric}: {old:.4g} -> {new:.4g} ({change:+.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(f"{s:g}" for s in DEFAULT_SIZES),
+                        help="comma-separated synthetic sizes in megapixels")
+    parser.add_argument("--no-samples", action="store_true", help="skip the sample JPEGs 1-4")
+    parser.add_argument("--only", action="append",
+                        help="only run cases whose name contains this text (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument("--save", metavar="JSON", help="write results as a baseline")
+    parser.add_argument("--compare", metavar="JSON", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown / memory growth (default: 0.25)")
+    parser.add_argument("--coarse-quality", metavar="LEVELS",
+                        help="instead of the suite, compare coarse_level=L1,L2,... "
+                             "with the full-resolution background masks")
+    args = parser.parse_args(argv)
+
+    sizes = [float(s) for s in args.sizes.split(",") if s]
+    inputs = load_inputs(sizes, with_samples=not args.no_samples)
+    if args.coarse_quality:
+        levels = [int(v) for v in args.coarse_quality.split(",") if v]
+        coarse_quality(inputs, levels, repeat=max(1, args.repeat))
+        return 0
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    results = run_suite(inputs, only=args.only, repeat=max(1, args.repeat), baseline=baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"saved {len(results)} results to {args.save}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Background jobs for long operations: worker pool, progress, cancellation.
+
+Tidak ada import Streamlit di sini. UI cukup menyimpan Job yang dikembalikan
+submit lalu mem-poll progress/partial/result; skrip tidak pernah menunggu.
+
+Contoh:
+
+    runner = JobRunner(max_workers=2)
+    job = runner.submit(fn, img)   # fn(job, img) memanggil job.report(...)
+    job.cancel()                   # berhenti di checkpoint berikutnya
+
+Pembatalan bersifat kooperatif: job.report / job.check melempar
+JobCancelled setelah cancel(), jadi fungsi job harus memanggilnya di
+antara tahap (atau meneruskan job.report sebagai callback progress).
+Sumber daya milik job (file sementara, dsb.) dilepas lewat `cleanup`
+di submit, yang selalu dipanggil, juga bila job batal sebelum mulai.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's function at a checkpoint after cancel()."""
+
+
+class Job:
+    """Handle of one submitted job; safe to read from any thread."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = PENDING
+        self.progress = 0.0
+        self.message = ""
+        self.partial = None
+        self.result = None
+        self.error: Exception | None = None
+        self.submitted_at = time.perf_counter()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the job started running (0 while pending)."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def check(self) -> None:
+        """Cancellation checkpoint for the job's function."""
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+
+    def report(self, done: int, total: int = 0, message: str | None = None,
+               partial=None) -> None:
+        """Record progress (and an optional partial result); also a checkpoint.
+
+        Tanda tangan (done, total) sama dengan callback progress
+        process_video dan background_mask, jadi bisa diteruskan langsung.
+        """
+        self.check()
+        if total:
+            self.progress = min(done / total, 1.0)
+        if message is not None:
+            self.message = message
+        if partial is not None:
+            self.partial = partial
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class JobRunner:
+    """Runs `fn(job, *args, **kwargs)` on a shared thread pool.
+
+    Thread (bukan proses): OpenCV/numpy melepas GIL, dan hasil/cache
+    dibagi tanpa pickling.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+
+    def submit(self, fn, *args, name: str | None = None, cleanup=None, **kwargs) -> Job:
+        """Queue `fn(job, *args, **kwargs)`; `cleanup()` runs once it ends, whatever the outcome."""
+        job = Job(name or getattr(fn, "__name__", "job"))
+        self._pool.submit(self._run, job, fn, args, kwargs, cleanup)
+        return job
+
+    @staticmethod
+    def _run(job: Job, fn, args, kwargs, cleanup=None) -> None:
+        try:
+            # Job yang dibatalkan selagi antre tidak pernah mulai.
+            job.check()
+            job.started_at = time.perf_counter()
+            job.status = RUNNING
+            job.result = fn(job, *args, **kwargs)
+            job.progress = 1.0
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = e
+            job.status = FAILED
+        finally:
+            try:
+                if cleanup is not None:
+                    cleanup()
+            finally:
+                job.finished_at = time.perf_counter()
+                job._done.set()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
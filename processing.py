@@ -0,0 +1,1608 @@
+"""Image-processing helpers shared by the Streamlit app and the batch CLI.
+
+Tidak ada import Streamlit di sini, jadi modul ini aman dipakai di worker
+proses atau skrip tanpa UI.
+"""
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Hashable
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import cv2
+from PIL import Image
+
+# ===================== BASIC HELPERS =====================
+
+# ---------- DECODE ----------
+
+def decode_image(data: bytes) -> np.ndarray:
+    """Decode encoded image bytes into an RGB uint8 array."""
+    img = Image.open(BytesIO(data)).convert("RGB")
+    return np.array(img)
+
+
+# ---------- ARRAY CACHE ----------
+
+class ArrayCache:
+    """LRU cache of read-only arrays under a byte budget.
+
+    Dipakai untuk hasil decode upload (kunci: hash file) dan mask
+    background (kunci: hash file + parameter mask).
+    """
+
+    def __init__(self, budget_mb: int):
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> np.ndarray | None:
+        with self._lock:
+            arr = self._entries.get(key)
+            if arr is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return arr
+
+    def put(self, key: Hashable, arr: np.ndarray) -> None:
+        # Array dibagi antar sesi, jadi dikunci read-only.
+        arr.setflags(write=False)
+        with self._lock:
+            if key in self._entries:
+                return
+            if arr.nbytes > self.budget_bytes:
+                return
+            self._entries[key] = arr
+            self.used_bytes += arr.nbytes
+            while self.used_bytes > self.budget_bytes:
+                _, old = self._entries.popitem(last=False)
+                self.used_bytes -= old.nbytes
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "used_mb": self.used_bytes / (1024 * 1024),
+                "budget_mb": self.budget_bytes / (1024 * 1024),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+# ---------- THUMBNAIL CACHE ----------
+
+def square_thumbnail_jpeg(path: str, size: int) -> bytes:
+    """Centre-cropped `size` x `size` LANCZOS thumbnail of an image file, as JPEG."""
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        width, height = img.size
+        d = min(width, height)
+        left, top = (width - d) // 2, (height - d) // 2
+        thumb = img.crop((left, top, left + d, top + d)).resize(
+            (size, size), Image.Resampling.LANCZOS)
+    buffered = BytesIO()
+    thumb.save(buffered, format="JPEG")
+    return buffered.getvalue()
+
+
+class ThumbnailCache:
+    """square_thumbnail_jpeg results cached in memory and on disk.
+
+    Kunci: (path, mtime_ns, ukuran file, sisi thumbnail), jadi file yang
+    diganti otomatis dirender ulang. Cache disk di `cache_dir` bertahan
+    antar restart proses; None = memori saja.
+    """
+
+    def __init__(self, cache_dir: str | None = None):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: dict[tuple, tuple[tuple, bytes]] = {}
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, path: str, size: int) -> bytes | None:
+        """JPEG thumbnail of `path`, or None if the file does not exist."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        slot = (os.path.abspath(path), size)
+        version = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(slot)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+
+        disk_path = self._disk_path(slot, version)
+        data = self._read(disk_path)
+        if data is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            data = square_thumbnail_jpeg(path, size)
+            self._write(disk_path, data)
+        with self._lock:
+            self._entries[slot] = (version, data)
+        return data
+
+    def _disk_path(self, slot, version) -> str | None:
+        if not self.cache_dir:
+            return None
+        stem = hashlib.sha256(repr(slot).encode()).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{stem}-{version[0]}-{version[1]}.jpg")
+
+    @staticmethod
+    def _read(disk_path) -> bytes | None:
+        if disk_path is None:
+            return None
+        try:
+            with open(disk_path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write(disk_path, data: bytes) -> None:
+        if disk_path is None:
+            return
+        # Versi lama file yang sama dibuang; tulis lewat file sementara
+        # supaya proses lain tidak membaca thumbnail setengah jadi.
+        stem = disk_path.rsplit("-", 2)[0]
+        for old in glob.glob(glob.escape(stem) + "-*.jpg"):
+            if old != disk_path:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+        tmp_path = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, disk_path)
+        except OSError:
+            # Cache disk opsional (mis. folder read-only): cukup memori.
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+
+# Tata letak piksel internal: RGB uint8 (sama dengan PIL saat upload dan
+# st.image saat tampil). Konversi BGR hanya di batas I/O OpenCV
+# (cv2.imread/imwrite/VideoCapture); operasi yang tidak peduli urutan kanal
+# (warp, blur, flip, skala kecerahan) langsung jalan di RGB.
+def to_opencv(img_rgb):
+    return cv2.cvtColor(img_rgb, cv2.COLOR_RGB2BGR)
+
+def to_streamlit(img_bgr):
+    return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+
+def apply_affine_transform(img_rgb, M, output_size=None):
+    h, w = img_rgb.shape[:2]
+    if output_size is None:
+        output_size = (w, h)
+    if M.shape == (3, 3):
+        M_affine = M[0:2, :]
+    else:
+        M_affine = M
+    return cv2.warpAffine(
+        img_rgb, M_affine, output_size,
+        flags=cv2.INTER_LINEAR,
+        borderMode=cv2.BORDER_REFLECT
+    )
+
+def apply_matrix_transform(img_rgb, M, output_size=None):
+    """Single resample for any 3x3 matrix: warpAffine, or warpPerspective
+    when the bottom row is not [0, 0, 1]."""
+    if M.shape == (2, 3) or np.allclose(M[2], [0, 0, 1]):
+        return apply_affine_transform(img_rgb, M, output_size=output_size)
+    h, w = img_rgb.shape[:2]
+    if output_size is None:
+        output_size = (w, h)
+    return cv2.warpPerspective(
+        img_rgb, M, output_size,
+        flags=cv2.INTER_LINEAR,
+        borderMode=cv2.BORDER_REFLECT
+    )
+
+def compose_transforms(steps, base_size):
+    """Fold stacked steps into one 3x3 matrix plus the final canvas (w, h).
+
+    Each step is a dict with "M" (3x3) and "size" ((w, h) or None to keep
+    the canvas). Steps apply in list order, so the product is M_n @ ... @ M_1.
+    """
+    M = np.eye(3, dtype=np.float64)
+    size = base_size
+    for step in steps:
+        M = step["M"].astype(np.float64) @ M
+        if step["size"] is not None:
+            size = step["size"]
+    return M.astype(np.float32), size
+
+# ---------- TRANSFORM MATRICES ----------
+# Semua matriks 3x3 homogen, dalam koordinat piksel kanvas (w, h).
+
+def translation_matrix(dx, dy):
+    return np.array([[1, 0, dx],
+                     [0, 1, dy],
+                     [0, 0, 1]], dtype=np.float32)
+
+def scaling_matrix(sx, sy):
+    return np.array([[sx, 0, 0],
+                     [0, sy, 0],
+                     [0, 0, 1]], dtype=np.float32)
+
+def rotation_matrix(angle, w, h):
+    """Rotate by `angle` degrees around the canvas centre."""
+    cx, cy = w / 2, h / 2
+    theta = np.deg2rad(angle)
+    cos_t = np.cos(theta)
+    sin_t = np.sin(theta)
+    R = np.array([[cos_t, -sin_t, 0],
+                  [sin_t,  cos_t, 0],
+                  [0,      0,     1]], dtype=np.float32)
+    T1 = translation_matrix(-cx, -cy)
+    T2 = translation_matrix(cx, cy)
+    return T2 @ R @ T1
+
+def shear_matrix(shear_x, shear_y):
+    return np.array([[1,      shear_x, 0],
+                     [shear_y, 1,      0],
+                     [0,       0,      1]], dtype=np.float32)
+
+def reflection_matrix(axis, w, h):
+    """Mirror across "x", "y" or "diag" (swap x and y)."""
+    if axis == "x":
+        return np.array([[1, 0, 0],
+                         [0, -1, h],
+                         [0, 0, 1]], dtype=np.float32)
+    if axis == "y":
+        return np.array([[-1, 0, w],
+                         [0, 1, 0],
+                         [0, 0, 1]], dtype=np.float32)
+    if axis == "diag":
+        return np.array([[0, 1, 0],
+                         [1, 0, 0],
+                         [0, 0, 1]], dtype=np.float32)
+    raise ValueError(f"Unsupported reflection axis: {axis}")
+
+# ---------- CONVOLUTION ENGINE ----------
+# Kernel luas di atas batas ini dihitung lewat FFT, bukan sliding window.
+FFT_KERNEL_AREA = 15 * 15
+
+
+def _separable_factors(kernel: np.ndarray):
+    """Split a rank-1 kernel into (column, row) 1D factors, or None."""
+    if kernel.shape[0] == 1 or kernel.shape[1] == 1:
+        return None
+    u, s, vt = np.linalg.svd(kernel.astype(np.float64))
+    if s[0] == 0 or np.any(s[1:] > s[0] * 1e-6):
+        return None
+    scale = np.sqrt(s[0])
+    return (u[:, 0] * scale).astype(np.float32), (vt[0] * scale).astype(np.float32)
+
+
+def _correlate_windows(padded: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """Correlate using a strided sliding-window view (no per-pixel loop)."""
+    windows = np.lib.stride_tricks.sliding_window_view(padded, kernel.shape)
+    return np.einsum("ijkl,kl->ij", windows, kernel, dtype=np.float32)
+
+
+def _correlate_separable(padded: np.ndarray, col: np.ndarray, row: np.ndarray) -> np.ndarray:
+    """Row pass followed by column pass for a rank-1 kernel."""
+    rows = np.lib.stride_tricks.sliding_window_view(padded, row.size, axis=1)
+    tmp = np.einsum("ijk,k->ij", rows, row, dtype=np.float32)
+    cols = np.lib.stride_tricks.sliding_window_view(tmp, col.size, axis=0)
+    return np.einsum("ijk,k->ij", cols, col, dtype=np.float32)
+
+
+def _correlate_fft(padded: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """Correlate through the frequency domain, keeping only the valid region."""
+    k_h, k_w = kernel.shape
+    shape = padded.shape
+    spec = np.fft.rfft2(padded, shape) * np.fft.rfft2(kernel[::-1, ::-1], shape)
+    full = np.fft.irfft2(spec, shape)
+    return full[k_h - 1:, k_w - 1:].astype(np.float32)
+
+
+def manual_convolution_gray(img_gray, kernel):
+    kernel = np.asarray(kernel, dtype=np.float32)
+    k_h, k_w = kernel.shape
+    pad_h = k_h // 2
+    pad_w = k_w // 2
+    padded = np.pad(img_gray, ((pad_h, pad_h), (pad_w, pad_w)), mode="reflect")
+    h, w = img_gray.shape
+
+    factors = _separable_factors(kernel)
+    if kernel.size >= FFT_KERNEL_AREA:
+        output = _correlate_fft(padded.astype(np.float64), kernel.astype(np.float64))
+    elif factors is not None:
+        output = _correlate_separable(padded.astype(np.float32), *factors)
+    else:
+        output = _correlate_windows(padded.astype(np.float32), kernel)
+
+    output = np.clip(output[:h, :w], 0, 255).astype(np.uint8)
+    return output
+
+def rgb_to_gray(img_rgb):
+    gray = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY)
+    return gray
+
+def adjust_brightness_contrast(img_rgb, brightness=0, contrast=0):
+    beta = brightness
+    alpha = 1 + (contrast / 100.0)
+    adjusted = cv2.convertScaleAbs(img_rgb, alpha=alpha, beta=beta)
+    return adjusted
+
+# ---------- FILTERS (hasil RGB, siap tampil/simpan) ----------
+
+SHARPEN_KERNEL = np.array(
+    [[0, -1, 0],
+     [-1, 5, -1],
+     [0, -1, 0]],
+    dtype=np.float32,
+)
+
+def blur_image(img_rgb, k):
+    gray = rgb_to_gray(img_rgb)
+    blur_kernel = np.ones((k, k), dtype=np.float32) / (k * k)
+    blurred_gray = manual_convolution_gray(gray, blur_kernel)
+    return cv2.cvtColor(blurred_gray, cv2.COLOR_GRAY2RGB)
+
+def sharpen_image(img_rgb):
+    gray = rgb_to_gray(img_rgb)
+    sharpened_gray = manual_convolution_gray(gray, SHARPEN_KERNEL)
+    return cv2.cvtColor(sharpened_gray, cv2.COLOR_GRAY2RGB)
+
+def grayscale_image(img_rgb):
+    return cv2.cvtColor(rgb_to_gray(img_rgb), cv2.COLOR_GRAY2RGB)
+
+def edge_image(img_rgb, method="Sobel"):
+    gray = rgb_to_gray(img_rgb)
+    if method == "Sobel":
+        grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+        grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+        mag = cv2.magnitude(grad_x, grad_y)
+        mag = np.clip(mag, 0, 255).astype(np.uint8)
+        return cv2.cvtColor(mag, cv2.COLOR_GRAY2RGB)
+    edges = cv2.Canny(gray, 100, 200)
+    return cv2.cvtColor(edges, cv2.COLOR_GRAY2RGB)
+
+# ---------- PREVIEW PROXY ----------
+# Slider interaktif jalan di salinan kecil; resolusi penuh hanya saat unduh.
+PREVIEW_MAX_EDGE = 1280
+
+
+def make_preview_proxy(img_rgb: np.ndarray, max_edge: int = PREVIEW_MAX_EDGE) -> np.ndarray:
+    """Downscale so the long edge is at most `max_edge` (no-op if already smaller)."""
+    h, w = img_rgb.shape[:2]
+    if max(h, w) <= max_edge:
+        return img_rgb
+    f = max_edge / max(h, w)
+    size = (max(1, round(w * f)), max(1, round(h * f)))
+    return cv2.resize(img_rgb, size, interpolation=cv2.INTER_AREA)
+
+
+def grid_scale_matrix(full_shape, proxy_shape) -> np.ndarray:
+    """3x3 matrix mapping full-res pixel coordinates onto the proxy pixel grid.
+
+    Uses pixel-centre alignment, matching how cv2.resize(INTER_AREA) samples.
+    """
+    sx = proxy_shape[1] / full_shape[1]
+    sy = proxy_shape[0] / full_shape[0]
+    return np.array([[sx, 0, 0.5 * (sx - 1)],
+                     [0, sy, 0.5 * (sy - 1)],
+                     [0, 0, 1]], dtype=np.float64)
+
+
+def rescale_transform(M: np.ndarray, S: np.ndarray) -> np.ndarray:
+    """Re-express a full-res 3x3 transform on the grid given by `S`."""
+    return (S @ M.astype(np.float64) @ np.linalg.inv(S)).astype(np.float32)
+
+
+def rescale_size(size, S: np.ndarray):
+    """Scale a full-res (w, h) output size onto the grid given by `S`."""
+    w, h = size
+    return (max(1, int(round(w * S[0, 0]))), max(1, int(round(h * S[1, 1]))))
+
+# ===================== ADVANCED BACKGROUND HELPERS =====================
+
+def _feather_mask(mask: np.ndarray, radius: int) -> np.ndarray:
+    """Feather/smooth mask edges using Gaussian blur."""
+    if radius <= 0:
+        m = mask.astype(np.float32)
+        if m.max() > 1.0:
+            m = m / 255.0
+        return m
+
+    m = mask.astype(np.float32)
+    if m.max() > 1.0:
+        m = m / 255.0
+
+    ksize = radius * 2 + 1
+    m_blur = cv2.GaussianBlur(m, (ksize, ksize), 0)
+    return np.clip(m_blur, 0.0, 1.0)
+
+
+# Lebar default band (piksel di tiap sisi tepi mask) tempat tepi Canny
+# boleh ditambahkan ke mask oleh _refine_hair_region.
+HAIR_BAND_WIDTH = 16
+# Konteks ekstra di sekitar band untuk Canny (Sobel + NMS) dan morfologi.
+_HAIR_ROI_PAD = 8
+# Grid blok untuk mencari bagian frame yang disentuh band.
+_HAIR_BLOCK = 256
+
+
+def _hair_band_runs(m: np.ndarray, reach: int, block: int):
+    """(y0, y1, x0, x1) runs of grid blocks lying within `reach` px of a mask edge.
+
+    Blok aktif bila mask tidak konstan di blok yang diperlebar `reach`
+    (min/max per strip baris, lalu per kolom). Blok aktif yang
+    bersebelahan dalam satu baris grid digabung jadi satu ROI.
+    """
+    h, w = m.shape
+    gh, gw = -(-h // block), -(-w // block)
+    hi = np.empty((gh, w), dtype=np.uint8)
+    lo = np.empty((gh, w), dtype=np.uint8)
+    for by in range(gh):
+        strip = m[max(0, by * block - reach):(by + 1) * block + reach]
+        hi[by] = strip.max(axis=0)
+        lo[by] = strip.min(axis=0)
+    span = np.ones((1, 2 * reach + 1), np.uint8)
+    pad = ((0, 0), (0, gw * block - w))
+    hi = np.pad(cv2.dilate(hi, span), pad, mode="edge").reshape(gh, gw, block).max(axis=2)
+    lo = np.pad(cv2.erode(lo, span), pad, mode="edge").reshape(gh, gw, block).min(axis=2)
+    active = hi != lo
+
+    runs = []
+    for by in range(gh):
+        cols = np.flatnonzero(active[by])
+        if not len(cols):
+            continue
+        splits = np.flatnonzero(np.diff(cols) > 1) + 1
+        for run in np.split(cols, splits):
+            runs.append((by * block, min(h, (by + 1) * block),
+                         run[0] * block, min(w, (run[-1] + 1) * block)))
+    return runs
+
+
+def _refine_hair_region(image_rgb: np.ndarray,
+                        mask: np.ndarray,
+                        refine_hair: bool = True,
+                        features: "ImageFeatures | None" = None,
+                        band_width: int = HAIR_BAND_WIDTH) -> np.ndarray:
+    """Refine mask around hair and fine details using edge cues.
+
+    Tepi Canny hanya ditambahkan dalam band selebar `band_width` piksel
+    di sekitar tepi mask (clutter background diabaikan), dan Canny +
+    morfologi hanya jalan pada ROI yang memuat band itu.
+    `band_width` <= 0 memakai edge map seluruh frame seperti dulu
+    (feats.canny, atau _banded_canny bila sudah dimemo), diproses per
+    strip baris.
+    """
+    m = mask.astype(np.uint8)
+    if m.max() > 1:
+        m = (m > 127).astype(np.uint8)
+
+    if not refine_hair:
+        return m
+
+    feats = features or ImageFeatures(image_rgb)
+    kernel = np.ones((3, 3), np.uint8)
+
+    def refine(roi, band_kernel=None):
+        if band_kernel is None:
+            edges = feats.canny(50, 150)[roi]
+        else:
+            edges = feats.canny(50, 150, region=roi)
+        edges = cv2.dilate(edges, kernel)
+        sub = m[roi]
+        add = edges > 0
+        if band_kernel is not None:
+            boundary = (cv2.dilate(sub, kernel) != cv2.erode(sub, kernel)).view(np.uint8)
+            add &= cv2.dilate(boundary, band_kernel) > 0
+        sub = cv2.morphologyEx(sub, cv2.MORPH_CLOSE, kernel)
+        sub = cv2.morphologyEx(sub, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+        sub[add] = 1
+        return sub
+
+    # Close/open hanya mengubah piksel yang bertetangga dengan tepi, dan
+    # band hanya menjangkau `band_width`, jadi hasil inti tiap ROI (dengan
+    # padding) sama dengan memproses seluruh frame; di luar ROI mask tetap.
+    h, w = m.shape
+    if band_width <= 0:
+        pad, band_kernel = _HAIR_ROI_PAD, None
+        runs = [(y, min(h, y + _HAIR_BLOCK), 0, w) for y in range(0, h, _HAIR_BLOCK)]
+    else:
+        pad = band_width + _HAIR_ROI_PAD
+        band_kernel = np.ones((2 * band_width + 1, 2 * band_width + 1), np.uint8)
+        runs = _hair_band_runs(m, band_width + 1, _HAIR_BLOCK)
+    # Hasil ROI baru ditulis ke `m` setelah tidak ada ROI berikutnya yang
+    # membaca baris aslinya (runs urut baris), jadi tanpa salinan mask kedua.
+    pending = deque()
+    for y0, y1, x0, x1 in runs:
+        ya, xa = max(0, y0 - pad), max(0, x0 - pad)
+        while pending and pending[0][0][0].stop <= ya:
+            region, value = pending.popleft()
+            m[region] = value
+        roi = np.s_[ya:min(h, y1 + pad), xa:min(w, x1 + pad)]
+        pending.append((np.s_[y0:y1, x0:x1],
+                        refine(roi, band_kernel)[y0 - ya:y1 - ya, x0 - xa:x1 - xa]))
+    for region, value in pending:
+        m[region] = value
+    return m
+
+
+def _guided_filter(guide: np.ndarray, src: np.ndarray,
+                   radius: int, eps: float) -> np.ndarray:
+    """Edge-preserving smoothing of `src` guided by `guide` (He et al., box filters).
+
+    Keduanya float32 0..1; tepi hasil mengikuti tepi di `guide`.
+    """
+    ksize = (2 * radius + 1, 2 * radius + 1)
+
+    def mean(x):
+        return cv2.boxFilter(x, cv2.CV_32F, ksize)
+
+    mean_I = mean(guide)
+    mean_p = mean(src)
+    var_I = mean(guide * guide) - mean_I * mean_I
+    a = (mean(guide * src) - mean_I * mean_p) / (var_I + eps)
+    b = mean_p - a * mean_I
+    return mean(a) * guide + mean(b)
+
+
+def _label_counts(binary: np.ndarray, counted: np.ndarray | None):
+    """8-connected labels of `binary` and, per label, its area or its number of `counted` pixels."""
+    if counted is None:
+        _, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        return labels, stats[:, cv2.CC_STAT_AREA]
+    # Tanpa stats labeling ~2x lebih cepat; bincount hanya atas `counted`.
+    n, labels = cv2.connectedComponents(binary, connectivity=8)
+    return labels, np.bincount(labels[counted], minlength=n)
+
+
+def _union_roots(n: int, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Smallest member of the set of each of 0..n-1 after joining every pair (u[i], v[i]).
+
+    Union-find versi array: root yang lebih besar dikaitkan ke yang lebih
+    kecil (np.minimum.at), lalu pointer jumping sampai datar.
+    """
+    parent = np.arange(n)
+    while True:
+        pu, pv = parent[u], parent[v]
+        diff = pu != pv
+        if not diff.any():
+            return parent
+        np.minimum.at(parent, np.maximum(pu, pv)[diff], np.minimum(pu, pv)[diff])
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+
+def _component_bands(bands, binary_rows, keep, counted_rows=None):
+    """Yield (y0, y1, 0/1 rows) marking pixels whose component satisfies `keep`.
+
+    Komponen 8-connected dari seluruh gambar, walau gambar hanya dibaca
+    per band lewat `binary_rows(y0, y1)` (baris 0/1 uint8). Pass 1 melabel
+    tiap band dan menyatukan komponen yang menyentuh baris sambungan
+    (union-find), pass 2 melabel ulang tiap band lalu memetakan label
+    lewat lookup table. `keep(counts)` -> array bool per komponen; counts =
+    luas, atau jumlah piksel True di `counted_rows(y0, y1)` bila diberikan.
+    Memori kerja ~6 byte/piksel band plus array seukuran baris sambungan;
+    band yang sudah di-yield boleh ditimpa pemanggil.
+    """
+    def label(y0, y1):
+        counted = counted_rows(y0, y1) if counted_rows else None
+        return _label_counts(binary_rows(y0, y1), counted)
+
+    seam_ids = [np.zeros(0, dtype=np.int64)] * len(bands)
+    if len(bands) > 1:
+        weights, us, vs = [], [], []
+        base, prev_last = 0, None
+        for i, (y0, y1) in enumerate(bands):
+            labels, counts = label(y0, y1)
+            ends = np.unique(labels[[0, -1]])
+            seam_ids[i] = ends = ends[ends > 0]
+            weights.append(counts[ends])
+            # Id global untuk komponen yang menyentuh baris pertama/terakhir.
+            gid = np.full(len(counts), -1, dtype=np.int64)
+            gid[ends] = base + np.arange(len(ends))
+            first, last = gid[labels[0]], gid[labels[-1]]
+            if prev_last is not None:
+                w = len(first)
+                for d in (-1, 0, 1):
+                    up = prev_last[max(0, -d):w - max(0, d)]
+                    down = first[max(0, d):w - max(0, -d)]
+                    joined = (up >= 0) & (down >= 0)
+                    us.append(up[joined])
+                    vs.append(down[joined])
+            prev_last = last
+            base += len(ends)
+        roots = _union_roots(base, np.concatenate(us), np.concatenate(vs))
+        seam_keep = keep(np.bincount(roots, weights=np.concatenate(weights),
+                                     minlength=base))[roots]
+
+    base = 0
+    for (y0, y1), ends in zip(bands, seam_ids):
+        labels, counts = label(y0, y1)
+        lut = keep(counts).astype(np.uint8)
+        lut[0] = 0  # label 0 = piksel di luar komponen
+        if len(ends):
+            lut[ends] = seam_keep[base:base + len(ends)]
+            base += len(ends)
+        yield y0, y1, lut[labels]
+
+
+def _remove_small_holes(mask: np.ndarray,
+                        min_area: int = 100,
+                        min_island_area: int = 0,
+                        bands=None) -> np.ndarray:
+    """Fill background holes below `min_area`; drop foreground islands below `min_island_area` px.
+
+    Lubang = komponen 8-connected mask terbalik dengan jumlah piksel
+    < `min_area`; pulau = komponen foreground < `min_island_area`. Keduanya
+    satu kali labeling (bukan kontur per lubang), jadi waktunya tidak
+    bergantung pada banyaknya bintik. Dengan `bands` [(y0, y1), ...]
+    labeling dikerjakan per band (lihat _component_bands), hasil sama.
+    """
+    m = mask.astype(np.uint8)
+    if m.max() > 1:
+        m = (m > 127).astype(np.uint8)
+    bands = bands or [(0, m.shape[0])]
+
+    if min_area > 0:
+        for y0, y1, small in _component_bands(bands, lambda a, b: 1 - m[a:b],
+                                              lambda counts: counts < min_area):
+            m[y0:y1] |= small
+    if min_island_area > 0:
+        for y0, y1, small in _component_bands(bands, lambda a, b: m[a:b],
+                                              lambda counts: counts < min_island_area):
+            m[y0:y1] &= 1 - small
+    return m
+
+
+# Kuadrat jarak maksimum (koordinat x2) untuk 3 kanal uint8.
+_D2_BINS = 3 * 510 ** 2 + 1
+
+
+def _color_distance_sq(img: np.ndarray, ref2: np.ndarray) -> np.ndarray:
+    """Squared Euclidean distance of each pixel to `ref2 / 2`, times four.
+
+    Koordinat dikali dua (median bisa x.5), jadi eksak sebagai int32 dan
+    cukup ~8 byte/piksel, tanpa salinan float32 seluruh gambar.
+    """
+    h, w = img.shape[:2]
+    d2 = np.zeros((h, w), dtype=np.int32)
+    tmp = np.empty((h, w), dtype=np.int32)
+    for c in range(img.shape[2]):
+        np.multiply(img[:, :, c], 2, out=tmp, dtype=np.int32)
+        tmp -= ref2[c]
+        np.square(tmp, out=tmp)
+        d2 += tmp
+    return d2
+
+
+def _accumulate_counts(counts: np.ndarray, values: np.ndarray,
+                       chunk: int = 1 << 20) -> None:
+    """Add the histogram of non-negative ints `values` into `counts`.
+
+    np.bincount menyalin input ke intp; per potongan salinannya kecil.
+    """
+    flat = values.ravel()
+    for start in range(0, flat.size, chunk):
+        counts += np.bincount(flat[start:start + chunk], minlength=counts.size)
+
+
+def _order_statistic(counts: np.ndarray, k: int) -> int:
+    """k-th smallest (0-based) value, given the histogram of the data."""
+    return int(np.searchsorted(np.cumsum(counts), k, side="right"))
+
+
+def _percentile_rank(percentile: float, n: int) -> int:
+    """Rank k such that, for integer data, `x > np.percentile(x, p)` == `x > x_(k)`.
+
+    Interpolasi linear numpy jatuh di antara statistik urutan ke-floor dan
+    ke-ceil; tidak ada nilai bulat di antaranya, jadi cukup yang floor.
+    """
+    return int(np.floor(percentile / 100 * (n - 1)))
+
+
+def _otsu_threshold(hist: np.ndarray) -> int:
+    """Same threshold as cv2.THRESH_OTSU, computed from a 256-bin histogram.
+
+    Bisa dipakai untuk histogram yang dikumpulkan per band (mode tile).
+    """
+    n = float(hist.sum())
+    mu = float(np.dot(np.arange(256), hist)) / n
+    eps = float(np.finfo(np.float32).eps)
+    q1 = mu1 = max_sigma = 0.0
+    max_val = 0
+    for i in range(256):
+        p_i = hist[i] / n
+        mu1 *= q1
+        q1 += p_i
+        q2 = 1.0 - q1
+        if min(q1, q2) < eps or max(q1, q2) > 1.0 - eps:
+            continue
+        mu1 = (mu1 + i * p_i) / q1
+        mu2 = (mu - q1 * mu1) / q2
+        sigma = q1 * q2 * (mu1 - mu2) ** 2
+        if sigma > max_sigma:
+            max_sigma = sigma
+            max_val = i
+    return max_val
+
+
+def _alpha_uint8(mask_float: np.ndarray) -> np.ndarray:
+    """Float mask 0..1 -> 8-bit alpha (rounded), without a float temporary."""
+    return cv2.convertScaleAbs(mask_float, alpha=255.0)
+
+
+def _blend_uint8(fg: np.ndarray, bg, alpha8: np.ndarray) -> np.ndarray:
+    """round((a * fg + (255 - a) * bg) / 255) in uint16 fixed point.
+
+    `bg` boleh array (H, W, 3) atau satu warna (3,) yang di-broadcast.
+    Hasil kali maks 255 * 255 muat di uint16; pembagian 255 dibulatkan
+    eksak dengan (x + 128 + ((x + 128) >> 8)) >> 8. Dikerjakan per kanal
+    supaya temporary hanya 2 byte/piksel.
+    """
+    inv = 255 - alpha8
+    solid = not (isinstance(bg, np.ndarray) and bg.ndim == 3)
+    out = np.empty(fg.shape, dtype=np.uint8)
+    acc = np.empty(alpha8.shape, dtype=np.uint16)
+    for c in range(fg.shape[2]):
+        np.multiply(fg[:, :, c], alpha8, out=acc, dtype=np.uint16)
+        if solid:
+            acc += np.multiply(inv, bg[c], dtype=np.uint16)
+        else:
+            acc += np.multiply(bg[:, :, c], inv, dtype=np.uint16)
+        acc += 128
+        acc += acc >> 8
+        acc >>= 8
+        out[:, :, c] = acc
+    return out
+
+
+def _apply_solid_background(image_rgb: np.ndarray,
+                            mask_float: np.ndarray,
+                            color: tuple[int, int, int]) -> np.ndarray:
+    """Replace background with solid RGB color (broadcast, no full-size background)."""
+    return _blend_uint8(image_rgb, color, _alpha_uint8(mask_float))
+
+
+def _apply_blur_background(image_rgb: np.ndarray,
+                           mask_float: np.ndarray,
+                           ksize: int = 21) -> np.ndarray:
+    """Blur only the background while keeping subject sharp."""
+    if ksize % 2 == 0:
+        ksize += 1
+    blurred = cv2.GaussianBlur(image_rgb, (ksize, ksize), 0)
+    return _blend_uint8(image_rgb, blurred, _alpha_uint8(mask_float))
+
+
+def segment_foreground(image: np.ndarray) -> np.ndarray:
+    """
+    SIMPLE foreground segmentation.
+
+    Untuk sementara: subject dianggap di tengah gambar (ellipse).
+    Nanti bisa kamu ganti dengan model segmentasi beneran.
+    """
+    h, w = image.shape[:2]
+    mask = np.zeros((h, w), dtype=np.uint8)
+
+    center = (w // 2, h // 2)
+    axes = (int(w * 0.35), int(h * 0.45))
+    cv2.ellipse(mask, center, axes, 0, 0, 360, 255, -1)
+
+    return mask
+
+
+def _stretch_range(plane: np.ndarray, lo: int, hi: int, dst=None) -> np.ndarray:
+    """Map lo..hi to 0..255 like cv2.normalize(NORM_MINMAX); `dst` may be `plane`."""
+    scale = 255.0 / (hi - lo) if hi > lo else 0.0
+    return cv2.convertScaleAbs(plane, dst=dst, alpha=scale, beta=-lo * scale)
+
+
+class ImageFeatures:
+    """Derived planes of one RGB image, computed on first use and memoized.
+
+    Dibagikan ke semua mode background (termasuk rekursi auto) dan
+    _refine_hair_region, jadi tiap konversi/Canny jalan paling banyak sekali.
+    """
+
+    _BORDER_CODES = {"hsv": cv2.COLOR_RGB2HSV, "lab": cv2.COLOR_RGB2LAB}
+
+    def __init__(self, image_rgb: np.ndarray):
+        self.rgb = image_rgb
+        h, w = image_rgb.shape[:2]
+        self.border_thick = max(5, min(h, w) // 20)
+        # (min, max) L seluruh gambar; diisi mode tile agar tiap band
+        # dinormalisasi sama seperti gambar utuh.
+        self.L_range: tuple[int, int] | None = None
+        self._memo: dict = {}
+
+    def rows(self, y0: int, y1: int) -> "ImageFeatures":
+        """Features of rows y0:y1, sharing slices of full-size planes memoized so far."""
+        sub = ImageFeatures(self.rgb[y0:y1])
+        sub.border_thick = self.border_thick
+        sub.L_range = self.L_range
+        for key, value in self._memo.items():
+            if not (isinstance(key, tuple) and key[0] == "border"):
+                sub._memo[key] = value[y0:y1]
+        return sub
+
+    def drop_since(self, keys) -> None:
+        """Forget planes memoized after `keys` (a snapshot of the memo keys) was taken."""
+        for key in set(self._memo) - set(keys):
+            if not (isinstance(key, tuple) and key[0] == "border"):
+                del self._memo[key]
+
+    def _get(self, key, compute):
+        value = self._memo.get(key)
+        if value is None:
+            value = self._memo[key] = compute()
+        return value
+
+    @property
+    def hsv(self) -> np.ndarray:
+        return self._get("hsv", lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2HSV))
+
+    @property
+    def lab(self) -> np.ndarray:
+        return self._get("lab", lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2LAB))
+
+    @property
+    def L(self) -> np.ndarray:
+        return self.lab[:, :, 0]
+
+    @property
+    def L_norm(self) -> np.ndarray:
+        """L stretched to 0..255 like cv2.normalize(NORM_MINMAX), over `L_range`."""
+        def compute():
+            lo, hi = self.L_range or (int(self.L.min()), int(self.L.max()))
+            return _stretch_range(self.L, lo, hi)
+        return self._get("L_norm", compute)
+
+    @property
+    def L_blur(self) -> np.ndarray:
+        return self._get("L_blur", lambda: cv2.GaussianBlur(self.L, (5, 5), 0))
+
+    @property
+    def gray(self) -> np.ndarray:
+        return self._get("gray", lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY))
+
+    def canny(self, low: int, high: int, plane: str = "gray",
+              region: tuple[slice, slice] | None = None) -> np.ndarray:
+        """Canny edges of `plane` ("gray" or "L_norm") at the given thresholds.
+
+        Dengan `region` (ROI 2-D) Canny dihitung pada ROI saja dan tidak
+        dimemo. Memo full-frame sengaja tidak diiris: histeresis di tepi ROI
+        berbeda, dan hasil tidak boleh bergantung pada urutan pemanggilan.
+        """
+        if region is None:
+            return self._get(("canny", plane, low, high),
+                             lambda: cv2.Canny(getattr(self, plane), low, high))
+        if plane == "gray" and plane not in self._memo:
+            src = cv2.cvtColor(np.ascontiguousarray(self.rgb[region]), cv2.COLOR_RGB2GRAY)
+        else:
+            src = np.ascontiguousarray(getattr(self, plane)[region])
+        return cv2.Canny(src, low, high)
+
+    @property
+    def prior_mask(self) -> np.ndarray:
+        """Binary (0/1) centre-subject prior from segment_foreground."""
+        def compute():
+            prior = segment_foreground(self.rgb)
+            if prior.max() > 1:
+                prior >>= 7  # uint8: x > 127 <=> bit teratas, tanpa salinan
+            return prior
+        return self._get("prior_mask", compute)
+
+    def hsv_distance_sq(self, ref2: np.ndarray) -> np.ndarray:
+        """_color_distance_sq of the HSV plane to the doubled colour `ref2`."""
+        return self._get(("hsv_d2", tuple(int(v) for v in ref2)),
+                         lambda: _color_distance_sq(self.hsv, ref2))
+
+    def border_pixels(self, plane: str, all_sides: bool = False) -> np.ndarray:
+        """(N, 3) pixels of the top border strip, or of all four strips.
+
+        Bila `plane` belum dihitung, hanya strip border yang dikonversi.
+        """
+        def strip(region):
+            if plane in self._memo:
+                return self._memo[plane][region].reshape(-1, 3)
+            rgb = np.ascontiguousarray(self.rgb[region])
+            return cv2.cvtColor(rgb, self._BORDER_CODES[plane]).reshape(-1, 3)
+
+        def compute():
+            b = self.border_thick
+            if not all_sides:
+                return strip(np.s_[:b])
+            return np.concatenate([
+                strip(np.s_[:b]),
+                strip(np.s_[-b:]),
+                strip(np.s_[:, :b]),
+                strip(np.s_[:, -b:]),
+            ], axis=0)
+        return self._get(("border", plane, all_sides), compute)
+
+
+# ===================== STAGE PROFILER =====================
+
+class StageProfiler:
+    """Records duration and output size of each pipeline stage.
+
+    Usage: `s = prof.start("name", key=value)` ... `prof.stop(s, array)`.
+    """
+
+    def __init__(self):
+        self.stages: list[dict] = []
+
+    def start(self, name: str, **details) -> dict:
+        return {"stage": name, **details, "_t0": time.perf_counter()}
+
+    def stop(self, entry: dict, *outputs: np.ndarray, **details) -> None:
+        entry["seconds"] = time.perf_counter() - entry.pop("_t0")
+        entry.update(details)
+        if outputs:
+            entry["output_shape"] = [list(o.shape) for o in outputs]
+            entry["output_mb"] = sum(o.nbytes for o in outputs) / (1024 * 1024)
+        self.stages.append(entry)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(s["seconds"] for s in self.stages)
+
+    def to_json(self) -> str:
+        return json.dumps({"total_seconds": self.total_seconds, "stages": self.stages},
+                          indent=2, default=float)
+
+
+class _NullProfiler:
+    """Drop-in for StageProfiler when no profiling was requested."""
+
+    def start(self, name, **details):
+        return {}
+
+    def stop(self, entry, *outputs, **details):
+        pass
+
+
+def _no_progress(done: int, total: int) -> None:
+    pass
+
+
+# ===================== ADVANCED BACKGROUND MAIN FUNCTION =====================
+
+MASK_MODES = ("solid", "studio", "gradient", "textured", "natural",
+              "minimalist", "abstract", "vintage")
+_PRIOR_MODES = ("textured", "natural", "abstract")
+
+# ---------- TILING ----------
+# Puncak memori kerja terukur per piksel (semua mode/output, termasuk
+# hasil; maks ~25 setelah composite uint8) plus cadangan; dipakai untuk
+# memilih tinggi band dari budget memori.
+#
+# Yang dibatasi budget: memori kerja tiap band (konversi warna, Canny,
+# labeling komponen, feather, composite). Di luar budget, ukuran penuh:
+# hasil (mask float32 4 byte/piksel, atau gambar composite) dan paling
+# banyak 3 plane uint8 sekaligus (mask biner, salinannya antar tahap,
+# prior/edge map/L_norm sampai raw mask selesai). Terukur (RSS, 40 MP,
+# budget 64 MB): ~300 MB di atas input, vs ~800 MB tanpa tile.
+TILE_BYTES_PER_PIXEL = 32
+# Jangkauan raw mask per band (adaptiveThreshold 21x21 = 10 baris). Tahap
+# yang tidak lokal (histeresis Canny, lubang/pulau) memakai labeling
+# komponen lintas band (_component_bands), refine_hair bekerja per ROI.
+_RAW_MASK_REACH = 10
+# Halo composite: background blur 25x25 butuh 12 baris di tiap sisi.
+_COMPOSITE_HALO = {"blurred": 12}
+
+
+def _tile_halo(feather_radius: int) -> int:
+    """Rows of overlap each mask band needs so its core matches untiled output."""
+    return max(_RAW_MASK_REACH, feather_radius)
+
+
+def _tile_rows(h: int, w: int, halo: int, budget_mb: float | None) -> int:
+    """Band height for `budget_mb` of working memory (h = do not tile).
+
+    Band tidak pernah lebih tipis dari halo, jadi budget yang sangat kecil
+    bisa terlampaui.
+    """
+    if budget_mb is None:
+        return h
+    budget = budget_mb * 1024 * 1024
+    if h * w * TILE_BYTES_PER_PIXEL <= budget:
+        return h
+    rows = int(budget // (w * TILE_BYTES_PER_PIXEL)) - 2 * halo
+    return min(h, max(rows, halo))
+
+
+def _iter_bands(feats: ImageFeatures, bands, halo: int = 0):
+    """Yield (features of band plus halo, its rows in the image, core rows in it)."""
+    h = feats.rgb.shape[0]
+    for y0, y1 in bands:
+        if (y0, y1) == (0, h):
+            yield feats, slice(None), slice(None)
+            continue
+        a, b = max(0, y0 - halo), min(h, y1 + halo)
+        yield feats.rows(a, b), slice(a, b), slice(y0 - a, y1 - a)
+
+# ---------- MASK STAGES ----------
+
+def _global_stats(bg_type: str, feats: ImageFeatures, bands) -> dict:
+    """Image-wide values the raw mask of `bg_type` needs.
+
+    Dikumpulkan per band (y0, y1); tanpa tile hanya ada satu band, yaitu
+    gambar utuh, dan plane yang dihitung di sini dipakai lagi oleh raw mask.
+    """
+    stats = {}
+    n = feats.rgb.shape[0] * feats.rgb.shape[1]
+    if bg_type in ("solid", "studio", "minimalist"):
+        border = feats.border_pixels("hsv", all_sides=bg_type != "minimalist")
+        ref2 = np.rint(np.median(border, axis=0) * 2).astype(np.int32)
+        counts = np.zeros(_D2_BINS, dtype=np.int64)
+        for band, _, _ in _iter_bands(feats, bands):
+            _accumulate_counts(counts, band.hsv_distance_sq(ref2))
+        percentile = 70 if bg_type == "minimalist" else 60
+        stats["ref2"] = ref2
+        stats["d2_thresh"] = _order_statistic(counts, _percentile_rank(percentile, n))
+
+    elif bg_type == "gradient":
+        # Mode tile: L dikumpulkan ke satu plane uint8 lalu dinormalisasi di
+        # tempat, jadi Lab cukup dihitung sekali per band.
+        L = np.empty(feats.rgb.shape[:2], dtype=np.uint8) if len(bands) > 1 else None
+        lo, hi = 255, 0
+        for (y0, y1), (band, _, _) in zip(bands, _iter_bands(feats, bands)):
+            band_L = band.L
+            lo, hi = min(lo, int(band_L.min())), max(hi, int(band_L.max()))
+            if L is not None:
+                L[y0:y1] = band_L
+        feats.L_range = (lo, hi)
+        if L is not None:
+            feats._memo["L_norm"] = _stretch_range(L, lo, hi, dst=L)
+
+    elif bg_type == "natural":
+        stats["bg_L"] = np.median(feats.border_pixels("lab")[:, 0])
+
+    elif bg_type == "vintage":
+        hist = np.zeros(256, dtype=np.int64)
+        for band, _, core in _iter_bands(feats, bands, halo=2):
+            _accumulate_counts(hist, band.L_blur[core])
+        stats["otsu"] = _otsu_threshold(hist)
+
+    if len(bands) > 1:
+        # Prior dan edge map (histeresis Canny tidak lokal) disimpan sekali
+        # di ukuran penuh (uint8); band memakai irisannya.
+        if bg_type in _PRIOR_MODES:
+            feats.prior_mask
+        if bg_type in _RAW_CANNY:
+            plane, low, high = _RAW_CANNY[bg_type]
+            _banded_canny(feats, bands, low, high, plane=plane)
+    return stats
+
+
+# Edge map Canny (plane, low, high) yang dipakai raw mask tiap mode.
+_RAW_CANNY = {
+    "gradient": ("L_norm", 50, 150),
+    "textured": ("gray", 80, 160),
+    "natural": ("gray", 80, 200),
+    "abstract": ("gray", 50, 150),
+}
+
+
+def _raw_edges(bg_type: str, feats: ImageFeatures) -> np.ndarray:
+    plane, low, high = _RAW_CANNY[bg_type]
+    return feats.canny(low, high, plane=plane)
+
+
+# Baris edge Canny bergantung pada Sobel 3x3 + NMS: 2 baris di tiap sisi.
+_CANNY_REACH = 2
+
+
+def _banded_canny(feats: ImageFeatures, bands, low: int, high: int,
+                  plane: str = "gray") -> np.ndarray:
+    """Same as feats.canny(low, high, plane), built band by band; memoized.
+
+    Canny(low, low) per band = kandidat lolos NMS, Canny(high, high) =
+    piksel kuat; histeresis = komponen 8-connected kandidat yang memuat
+    piksel kuat, disatukan lintas band oleh _component_bands. Selain
+    hasil (1 byte/piksel) memorinya sebanding tinggi band.
+    """
+    h, w = feats.rgb.shape[:2]
+    edges = np.empty((h, w), dtype=np.uint8)
+    for (y0, y1), (band, _, core) in zip(bands, _iter_bands(feats, bands, _CANNY_REACH)):
+        src = getattr(band, plane)
+        edges[y0:y1] = cv2.Canny(src, low, low)[core] > 0
+        edges[y0:y1] += cv2.Canny(src, high, high)[core] > 0
+    for y0, y1, edge in _component_bands(bands, lambda a, b: (edges[a:b] > 0).view(np.uint8),
+                                         lambda strong: strong > 0,
+                                         counted_rows=lambda a, b: edges[a:b] == 2):
+        np.multiply(edge, 255, out=edges[y0:y1])
+    feats._memo[("canny", plane, low, high)] = edges
+    return edges
+
+
+def _raw_mask(bg_type: str, feats: ImageFeatures, stats: dict) -> np.ndarray:
+    """Binary (0/1) foreground guess for one mode, before clean-up."""
+    if bg_type in ("solid", "studio", "minimalist"):
+        d2 = feats.hsv_distance_sq(stats["ref2"])
+        return (d2 > stats["d2_thresh"]).astype(np.uint8)
+
+    if bg_type == "gradient":
+        L_norm = feats.L_norm
+        edges = _raw_edges(bg_type, feats)
+        thr = cv2.adaptiveThreshold(
+            L_norm, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY, 21, 5
+        )
+        return ((thr == 255) | (edges > 0)).astype(np.uint8)
+
+    if bg_type == "textured":
+        prior_mask = feats.prior_mask
+        edges = _raw_edges(bg_type, feats)
+        prior_dilated = cv2.dilate(prior_mask, np.ones((7, 7), np.uint8))
+        edge_near_prior = cv2.dilate(edges, np.ones((5, 5), np.uint8))
+        return ((prior_dilated == 1) | (edge_near_prior > 0)).astype(np.uint8)
+
+    if bg_type == "natural":
+        prior_mask = feats.prior_mask
+        edges = _raw_edges(bg_type, feats)
+
+        L_diff = np.abs(feats.L.astype(np.float32) - stats["bg_L"])
+        contrast_mask = (L_diff > 15).astype(np.uint8)
+
+        return ((prior_mask == 1) | (edges > 0)) & contrast_mask
+
+    if bg_type == "abstract":
+        prior_mask = feats.prior_mask
+        edges = _raw_edges(bg_type, feats)
+
+        raw = ((prior_mask == 1) | (edges > 0)).astype(np.uint8)
+        return cv2.morphologyEx(raw, cv2.MORPH_CLOSE, np.ones((5, 5), np.uint8))
+
+    if bg_type == "vintage":
+        # Sama dengan cv2.threshold(..., THRESH_OTSU) pada L_blur utuh.
+        raw = feats.L_blur > stats["otsu"]
+        return cv2.morphologyEx(raw.astype(np.uint8), cv2.MORPH_OPEN,
+                                np.ones((3, 3), np.uint8))
+
+    raise ValueError(f"Unsupported background mode: {bg_type}")
+
+
+def _refine_and_feather(feats, mask_clean, feather_radius, refine_hair,
+                        hair_band_width, prof):
+    """Hair refinement -> feathered float mask (untiled path)."""
+    stage = prof.start("refine_hair", enabled=refine_hair, band_width=hair_band_width)
+    mask_refined_bin = _refine_hair_region(feats.rgb, mask_clean, refine_hair=refine_hair,
+                                           features=feats, band_width=hair_band_width)
+    prof.stop(stage, mask_refined_bin)
+    stage = prof.start("feather", radius=feather_radius)
+    mask_float = _feather_mask(mask_refined_bin, radius=feather_radius)
+    prof.stop(stage, mask_float)
+    return mask_float
+
+
+# Ukuran blok (piksel level kasar) untuk refinement band tepi.
+COARSE_BLOCK = 32
+
+
+def _coarse_to_fine_mask(image, bg_type, level, feather_radius, refine_hair,
+                         hair_band_width, min_island_area, prof):
+    """Float mask computed at 1/2**level scale, refined only near its boundary.
+
+    Raw mask, lubang, dan refine_hair dihitung di level kasar; hasilnya
+    di-upsample, lalu band selebar ~1 piksel kasar di sekitar tepi
+    diperhalus dengan guided filter berpanduan grayscale resolusi penuh.
+    """
+    h, w = image.shape[:2]
+    f = 2 ** level
+    stage = prof.start("coarse_mask", level=level)
+    small = cv2.resize(image, (max(1, w // f), max(1, h // f)),
+                       interpolation=cv2.INTER_AREA)
+    small_feats = ImageFeatures(small)
+    stats = _global_stats(bg_type, small_feats, [(0, small.shape[0])])
+    raw_mask = _raw_mask(bg_type, small_feats, stats)
+    mask_clean = _remove_small_holes(raw_mask, min_area=max(1, 100 // (f * f)),
+                                     min_island_area=min_island_area // (f * f))
+    coarse = _refine_hair_region(small, mask_clean, refine_hair=refine_hair,
+                                 features=small_feats,
+                                 band_width=-(-hair_band_width // f))
+    prof.stop(stage, coarse)
+
+    stage = prof.start("upsample_refine")
+    up = cv2.resize(coarse.astype(np.float32), (w, h), interpolation=cv2.INTER_LINEAR)
+    mask = (up >= 0.5).astype(np.float32)
+
+    # Band tepi ditentukan di level kasar (murah), lalu guided filter hanya
+    # dijalankan pada blok yang memuat band, bukan di seluruh gambar.
+    kernel = np.ones((3, 3), np.uint8)
+    band_coarse = (cv2.dilate(coarse, kernel) != cv2.erode(coarse, kernel)).astype(np.uint8)
+    block, radius = COARSE_BLOCK, 2 * f
+    ch, cw = band_coarse.shape
+    for by in range(0, ch, block):
+        for bx in range(0, cw, block):
+            band_block = band_coarse[by:by + block, bx:bx + block]
+            if not band_block.any():
+                continue
+            y0, x0 = by * f, bx * f
+            y1, x1 = min(h, (by + block) * f), min(w, (bx + block) * f)
+            if by + block >= ch:
+                y1 = h
+            if bx + block >= cw:
+                x1 = w
+            # Halo selebar radius filter supaya tepi blok tidak terpotong.
+            ya, yb = max(0, y0 - radius), min(h, y1 + radius)
+            xa, xb = max(0, x0 - radius), min(w, x1 + radius)
+            guide = cv2.cvtColor(image[ya:yb, xa:xb], cv2.COLOR_RGB2GRAY).astype(np.float32) / 255.0
+            refined = _guided_filter(guide, up[ya:yb, xa:xb], radius=radius, eps=1e-3)
+            refined = refined[y0 - ya:y1 - ya, x0 - xa:x1 - xa]
+            band = cv2.resize(band_block, (x1 - x0, y1 - y0),
+                              interpolation=cv2.INTER_NEAREST).astype(bool)
+            core = mask[y0:y1, x0:x1]
+            core[band] = np.clip(refined[band], 0.0, 1.0)
+    prof.stop(stage, mask)
+
+    stage = prof.start("feather", radius=feather_radius)
+    mask_float = _feather_mask(mask, radius=feather_radius)
+    prof.stop(stage, mask_float)
+    return mask_float
+
+
+def _resolve_mode(mode, target_background_type, feats, prof) -> str:
+    """Mask mode to run; "auto" (or unknown) picks one from the border brightness."""
+    bg_type = (target_background_type or mode or "auto").lower()
+    if bg_type in MASK_MODES:
+        return bg_type
+
+    # AUTO: analisa rata/tidaknya brightness di border
+    stage = prof.start("auto_select")
+    std_L = np.std(feats.border_pixels("lab")[:, 0])
+
+    chosen = "solid" if std_L < 5 else "gradient" if std_L < 15 else "textured"
+    prof.stop(stage, border_std_L=float(std_L), chosen=chosen)
+    return chosen
+
+
+def background_mask(
+    image: np.ndarray,
+    mode: str = "auto",
+    target_background_type: str | None = None,
+    feather_radius: int = 3,
+    refine_hair: bool = True,
+    profiler: StageProfiler | None = None,
+    features: ImageFeatures | None = None,
+    memory_budget_mb: float | None = None,
+    coarse_level: int = 0,
+    min_island_area: int = 0,
+    hair_band_width: int = HAIR_BAND_WIDTH,
+    progress=None,
+) -> np.ndarray:
+    """
+    Refined, feathered foreground mask (float32 0..1, shape (H, W)).
+
+    Hasilnya tidak bergantung pada output_mode/solid_color, jadi bisa
+    di-cache lalu dipakai ulang lewat composite_background. Argumen lain
+    sama dengan remove_background_advanced.
+    `progress(done, total)` is called after each stage (and each band when
+    tiled); an exception raised by it aborts the computation.
+    """
+    if image is None:
+        raise ValueError("Input image is None")
+
+    if image.ndim != 3 or image.shape[2] != 3:
+        raise ValueError("`image` must be RGB with shape (H, W, 3)")
+
+    prof = profiler or _NullProfiler()
+    report = progress or _no_progress
+    feats = features or ImageFeatures(image)
+    bg_type = _resolve_mode(mode, target_background_type, feats, prof)
+
+    if coarse_level > 0:
+        report(0, 1)
+        mask_float = _coarse_to_fine_mask(image, bg_type, coarse_level, feather_radius,
+                                          refine_hair, hair_band_width, min_island_area, prof)
+        report(1, 1)
+        return mask_float
+
+    h, w = image.shape[:2]
+    halo = _tile_halo(feather_radius)
+    band_rows = _tile_rows(h, w, halo, memory_budget_mb)
+    bands = [(y, min(h, y + band_rows)) for y in range(0, h, band_rows)]
+    # global_stats, lubang dan refine_hair, lalu raw mask dan feather per band.
+    total = 4 if len(bands) == 1 else 3 + 2 * len(bands)
+
+    # Konversi warna dihitung lazily oleh `feats` di stage yang pertama butuh.
+    memo_keys = list(feats._memo)
+    stage = prof.start("global_stats", mode=bg_type, bands=len(bands))
+    stats = _global_stats(bg_type, feats, bands)
+    prof.stop(stage)
+    report(1, total)
+
+    if len(bands) == 1:
+        stage = prof.start("raw_mask", mode=bg_type)
+        raw_mask = _raw_mask(bg_type, feats, stats)
+        prof.stop(stage, raw_mask)
+        report(2, total)
+
+        # ---------- POST-PROCESSING MASK ----------
+        stage = prof.start("remove_small_holes")
+        mask_clean = _remove_small_holes(raw_mask, min_area=100,
+                                         min_island_area=min_island_area)
+        prof.stop(stage, mask_clean)
+        report(3, total)
+        mask_float = _refine_and_feather(feats, mask_clean, feather_radius, refine_hair,
+                                         hair_band_width, prof)
+        report(4, total)
+        return mask_float
+
+    # ---------- TILED ----------
+    # Plane ukuran penuh hanya uint8 (mask; prior dan edge map sampai raw
+    # mask selesai) plus hasil float32; tahap lain jalan per band + halo,
+    # termasuk komponen lubang/pulau dan histeresis Canny (_component_bands).
+    stage = prof.start("raw_mask", mode=bg_type, bands=len(bands), band_rows=band_rows)
+    raw_mask = np.empty((h, w), dtype=np.uint8)
+    done = 1
+    for (y0, y1), (band, _, core) in zip(bands, _iter_bands(feats, bands, halo)):
+        raw_mask[y0:y1] = _raw_mask(bg_type, band, stats)[core]
+        done += 1
+        report(done, total)
+    feats.drop_since(memo_keys)
+    prof.stop(stage, raw_mask)
+
+    stage = prof.start("remove_small_holes")
+    mask_clean = _remove_small_holes(raw_mask, min_area=100,
+                                     min_island_area=min_island_area, bands=bands)
+    del raw_mask
+    prof.stop(stage, mask_clean)
+    done += 1
+    report(done, total)
+
+    # refine_hair bekerja per ROI di sekitar tepi mask; tanpa band
+    # (hair_band_width <= 0) edge map seluruh frame dibuat per band.
+    stage = prof.start("refine_hair", enabled=refine_hair, band_width=hair_band_width)
+    if refine_hair and hair_band_width <= 0:
+        _banded_canny(feats, bands, 50, 150)
+    mask_refined = _refine_hair_region(image, mask_clean, refine_hair=refine_hair,
+                                       features=feats, band_width=hair_band_width)
+    del mask_clean
+    feats.drop_since(memo_keys)
+    prof.stop(stage, mask_refined)
+    done += 1
+    report(done, total)
+
+    stage = prof.start("feather", radius=feather_radius, bands=len(bands), halo=halo)
+    mask_float = np.empty((h, w), dtype=np.float32)
+    for y0, y1 in bands:
+        a, b = max(0, y0 - halo), min(h, y1 + halo)
+        mask_float[y0:y1] = _feather_mask(mask_refined[a:b], radius=feather_radius)[y0 - a:y1 - a]
+        done += 1
+        report(done, total)
+    prof.stop(stage, mask_float)
+    return mask_float
+
+
+def composite_background(
+    image: np.ndarray,
+    mask_float: np.ndarray,
+    output_mode: str = "transparent",
+    solid_color: tuple[int, int, int] | None = None,
+    memory_budget_mb: float | None = None,
+    profiler: StageProfiler | None = None,
+    progress=None,
+) -> np.ndarray:
+    """Apply a background_mask result to `image` without recomputing the mask.
+
+    Dengan `memory_budget_mb`, composite dikerjakan per band baris;
+    `progress(done, total)` dipanggil per band (sama seperti background_mask).
+    """
+    prof = profiler or _NullProfiler()
+    report = progress or _no_progress
+    h, w = image.shape[:2]
+    halo = _COMPOSITE_HALO.get(output_mode, 0)
+    band_rows = _tile_rows(h, w, halo, memory_budget_mb)
+    total = -(-h // band_rows)
+
+    stage = prof.start("composite", output_mode=output_mode)
+    if band_rows >= h:
+        result = _composite_output(image, mask_float, output_mode, solid_color)
+        report(1, 1)
+    else:
+        result = None
+        for i, y0 in enumerate(range(0, h, band_rows), start=1):
+            y1 = min(h, y0 + band_rows)
+            a, b = max(0, y0 - halo), min(h, y1 + halo)
+            out = _composite_output(image[a:b], mask_float[a:b], output_mode, solid_color)
+            if result is None:
+                result = np.empty((h,) + out.shape[1:], dtype=out.dtype)
+            result[y0:y1] = out[y0 - a:y1 - a]
+            report(i, total)
+    prof.stop(stage, result)
+    return result
+
+
+def remove_background_advanced(
+    image: np.ndarray,
+    mode: str = "auto",
+    target_background_type: str | None = None,
+    output_mode: str = "transparent",
+    solid_color: tuple[int, int, int] | None = None,
+    feather_radius: int = 3,
+    refine_hair: bool = True,
+    profiler: StageProfiler | None = None,
+    features: ImageFeatures | None = None,
+    memory_budget_mb: float | None = None,
+    coarse_level: int = 0,
+    min_island_area: int = 0,
+    hair_band_width: int = HAIR_BAND_WIDTH,
+) -> np.ndarray:
+    """
+    Advanced background removal supporting multiple background types and outputs.
+
+    Pass a StageProfiler as `profiler` to record per-stage timings, and an
+    ImageFeatures of `image` as `features` to reuse planes across calls.
+    With `memory_budget_mb`, images whose intermediates would exceed the
+    budget are processed in row bands with overlapping halos; statistics
+    such as border medians and thresholds are still image-wide. The budget
+    bounds per-band working memory; full-size buffers beyond it are the
+    result plus at most three 1-byte-per-pixel masks (see TILE_BYTES_PER_PIXEL).
+    With `coarse_level` > 0 the mask is computed at 1/2**level scale and
+    only its boundary band is refined at full resolution (faster, slightly
+    softer edges); the memory budget then does not apply to the mask.
+    `min_island_area` > 0 also drops foreground specks smaller than that
+    many pixels (holes below 100 px are always filled).
+    refine_hair only adds edges within `hair_band_width` pixels of the mask
+    boundary (<= 0 = anywhere in the frame, the old behaviour).
+    Equivalent to background_mask followed by composite_background.
+    """
+    mask_float = background_mask(
+        image,
+        mode=mode,
+        target_background_type=target_background_type,
+        feather_radius=feather_radius,
+        refine_hair=refine_hair,
+        profiler=profiler,
+        features=features,
+        memory_budget_mb=memory_budget_mb,
+        coarse_level=coarse_level,
+        min_island_area=min_island_area,
+        hair_band_width=hair_band_width,
+    )
+
+    # ---------- OUTPUT ----------
+    return composite_background(image, mask_float, output_mode, solid_color,
+                                memory_budget_mb=memory_budget_mb, profiler=profiler)
+
+
+# ===================== MODE COMPARISON =====================
+
+def compare_background_modes(
+    image: np.ndarray,
+    modes=MASK_MODES,
+    feather_radius: int = 3,
+    refine_hair: bool = True,
+    max_workers: int | None = None,
+) -> list[dict]:
+    """Run background_mask for every mode concurrently on one image.
+
+    Returns [{"mode", "mask", "seconds"}] in `modes` order. Semua mode
+    berbagi satu ImageFeatures; plane yang dipakai banyak mode dihitung
+    dulu sebelum thread jalan (OpenCV/numpy melepas GIL saat bekerja).
+    """
+    feats = ImageFeatures(image)
+    feats.hsv, feats.lab, feats.gray
+    if any(m in _PRIOR_MODES for m in modes):
+        feats.prior_mask
+
+    def run(mode):
+        t0 = time.perf_counter()
+        mask = background_mask(image, mode=mode, feather_radius=feather_radius,
+                               refine_hair=refine_hair, features=feats)
+        return {"mode": mode, "mask": mask, "seconds": time.perf_counter() - t0}
+
+    workers = max_workers or min(len(modes), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, modes))
+
+
+def _composite_output(image, mask_float, output_mode, solid_color):
+    """Build the requested output (mask, RGBA, solid or blurred background)."""
+    if output_mode == "custom_mask":
+        return (mask_float * 255.0).astype(np.uint8)
+
+    if output_mode == "transparent":
+        alpha = (mask_float * 255.0).astype(np.uint8)
+        rgba = np.dstack([image.astype(np.uint8), alpha])
+        return rgba
+
+    if output_mode == "solid_color":
+        if solid_color is None:
+            solid_color = (255, 255, 255)
+        rgb_out = _apply_solid_background(image.astype(np.uint8),
+                                          mask_float, solid_color)
+        return rgb_out
+
+    if output_mode == "blurred":
+        rgb_out = _apply_blur_background(image.astype(np.uint8),
+                                         mask_float, ksize=25)
+        return rgb_out
+
+    raise ValueError(f"Unsupported output_mode: {output_mode}")
+
+
+def compute_histogram(img_rgb):
+    """Per-channel 256-bin counts as a (3, 256) int64 array (R, G, B).
+
+    Hanya angka; penggambaran diserahkan ke UI (chart native Streamlit).
+    cv2.calcHist per kanal diukur ~6x lebih cepat dari satu np.bincount
+    atas kanal yang digeser (0/256/512), jadi tetap dipakai.
+    """
+    if img_rgb.ndim == 2:
+        img_rgb = img_rgb[:, :, None]
+    channels = [min(i, img_rgb.shape[2] - 1) for i in range(3)]
+    return np.stack([
+        cv2.calcHist([img_rgb], [c], None, [256], [0, 256]).ravel()
+        for c in channels
+    ]).astype(np.int64)
+
+def simple_background_removal_hsv(img_rgb):
+    hsv = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2HSV)
+    lower = np.array([0, 0, 0])
+    upper = np.array([180, 255, 200])
+    mask_bg = cv2.inRange(hsv, lower, upper)
+    mask_fg = cv2.bitwise_not(mask_bg)
+    fg_rgb = cv2.bitwise_and(img_rgb, img_rgb, mask=mask_fg)
+    return fg_rgb
+
+# ===================== ENCODING =====================
+
+def image_to_bytes(img_rgb, fmt="PNG"):
+    """
+    Convert numpy RGB or RGBA image to bytes for download.
+    - PNG: akan simpan apa adanya (termasuk alpha/transparan).
+    - JPEG: otomatis buang alpha (RGBA -> RGB) agar tidak error.
+    Tidak di-memo; UI meng-cache hasilnya sendiri (render_download_buttons).
+    """
+    if img_rgb is None:
+        raise ValueError("image_to_bytes received None image")
+
+    arr = np.array(img_rgb)
+    # kalau grayscale, naikkan ke RGB
+    if arr.ndim == 2:
+        arr = cv2.cvtColor(arr, cv2.COLOR_GRAY2RGB)
+
+    # kalau JPEG, buang alpha dulu kalau ada
+    if fmt.upper() == "JPEG" and arr.ndim == 3 and arr.shape[2] == 4:
+        arr = arr[:, :, :3]
+
+    pil_img = Image.fromarray(arr.astype("uint8"))
+    buf = BytesIO()
+    pil_img.save(buf, format=fmt)
+    return buf.getvalue()
@@ -1,12 +1,48 @@
 
 import streamlit as st
 import numpy as np
-import cv2
 from PIL import Image
-import matplotlib.pyplot as plt
 import os
-from io import BytesIO  
 import base64
+import hashlib
+import functools
+import tempfile
+import time
+
+from batch import run_ops
+from jobs import CANCELLED, FAILED, JobRunner
+from processing import (
+    MASK_MODES,
+    PREVIEW_MAX_EDGE,
+    ArrayCache,
+    apply_matrix_transform,
+    adjust_brightness_contrast,
+    background_mask,
+    blur_image,
+    compare_background_modes,
+    compute_histogram,
+    composite_background,
+    compose_transforms,
+    decode_image,
+    edge_image,
+    grayscale_image,
+    grid_scale_matrix,
+    image_to_bytes,
+    make_preview_proxy,
+    reflection_matrix,
+    rescale_size,
+    rescale_transform,
+    rotation_matrix,
+    scaling_matrix,
+    sharpen_image,
+    shear_matrix,
+    simple_background_removal_hsv,
+    StageProfiler,
+    ThumbnailCache,
+    translation_matrix,
+)
+from translations import translations
+from video import process_video
 
 # ===================== CONFIG & THEME =====================
 
@@ -14,19 +50,45 @@ st.set_page_config(
     page_title="🧮 Matrix Transformations in Image Processing",
     layout="wide"
 )
-# ---------- VIDEO BACKGROUND (HTML langsung) ----------
-def set_video_background(video_path: str):
-    """Set an mp4 video as full-screen background using HTML/CSS."""
-    if not os.path.exists(video_path):
-        st.warning(f"Video background tidak ditemukan: {video_path}")
-        return
+# ---------- VIDEO BACKGROUND (static file serving) ----------
+# File di folder static/ disajikan Streamlit di /app/static/ (lihat
+# .streamlit/config.toml), jadi browser cukup unduh video sekali lalu cache.
+STATIC_DIR = "static"
+STATIC_URL = "app/static"
+
+
+# Tanpa autoplay: browser mengabaikan preload="none" bila ada autoplay.
+# src baru dipasang oleh skrip kecil di bawah setelah halaman dirender dan
+# video terlihat, lalu diputar begitu frame pertama siap (loadeddata).
+_VIDEO_BACKGROUND_SCRIPT = """
+<script>
+const doc = window.parent.document;
+function startVideo() {
+    const video = doc.querySelector("video.video-bg[data-src]");
+    if (!video) return false;
+    const observer = new window.parent.IntersectionObserver((entries) => {
+        if (!entries.some((e) => e.isIntersecting)) return;
+        observer.disconnect();
+        video.addEventListener("loadeddata", () => video.play().catch(() => {}), {once: true});
+        video.src = video.dataset.src;
+        video.removeAttribute("data-src");
+    });
+    observer.observe(video);
+    return true;
+}
+if (!startVideo()) {
+    new window.parent.MutationObserver((_, mo) => {
+        if (startVideo()) mo.disconnect();
+    }).observe(doc.body, {childList: true, subtree: true});
+}
+</script>
+"""
 
-    with open(video_path, "rb") as f:
-        data = f.read()
-    b64 = base64.b64encode(data).decode("utf-8")
-    video_data_url = f"data:video/mp4;base64,{b64}"
 
-    html = """
+def _video_background_html(video_url: str, poster_url: str | None) -> str:
+    """Build the (small) HTML snippet that points at the static video."""
+    poster_attr = f'poster="{poster_url}"' if poster_url else ""
+    return """
         <style>
         .video-bg {{
             position: fixed;
@@ -43,13 +105,27 @@ def set_video_background(video_path: str):
             background: transparent !important;
         }}
         </style>
-        <video class="video-bg" autoplay muted loop playsinline>
-            <source src="{video_data_url}" type="video/mp4">
-        </video>
-        """.format(video_data_url=video_data_url)
+        <video class="video-bg" muted loop playsinline preload="none" {poster_attr}
+               data-src="{video_url}"></video>
+        """.format(video_url=video_url, poster_attr=poster_attr)
+
+
+def set_video_background(video_name: str, poster_name: str | None = None):
+    """Set an mp4 from static/ as full-screen background using HTML/CSS."""
+    video_path = os.path.join(STATIC_DIR, video_name)
+    if not os.path.exists(video_path):
+        st.warning(f"Video background tidak ditemukan: {video_path}")
+        return
+
+    poster_url = None
+    if poster_name and os.path.exists(os.path.join(STATIC_DIR, poster_name)):
+        poster_url = f"{STATIC_URL}/{poster_name}"
+
+    html = _video_background_html(f"{STATIC_URL}/{video_name}", poster_url)
     st.markdown(html, unsafe_allow_html=True)
+    st.iframe(_VIDEO_BACKGROUND_SCRIPT, height=1)
 
-set_video_background("assets/background.mp4")
+set_video_background("background.mp4", poster_name="background_poster.jpg")
 
 # ----- Initialize Session State -----
 if "language" not in st.session_state:
@@ -60,299 +136,8 @@ if "geo_transform" not in st.session_state:
     st.session_state["geo_transform"] = None
 if "image_filter" not in st.session_state:
     st.session_state["image_filter"] = None
-
-# ===================== TRANSLATIONS =====================
-
-translations = {
-    "id": {
-        "title": "🔢 Operasi Matriks untuk Editing Visual",
-        "subtitle": "🎯 Eksplorasi langsung perubahan matriks 2D dan penyesuaian gambar",
-        "app_goal": "🎯 **Tujuan aplikasi:** Penjelasan praktis yang menunjukkan fungsi perubahan matriks 2D dan penyaringan gambar pada foto menggunakan ide aljabar linier.",
-        "features": "- ↩️ Perubahan: memindah, mengukur, memutar, memiringkan, membalik\n- 🧽 Penyesuaian: menghaluskan, memfokuskan, menemukan garis, menghilangkan latar, mengubah ke hitam putih, menyesuaikan cahaya & bayangan",
-        "concept_1_title": "### 🌀 Perubahan Matriks Dua Dimensi",
-        "concept_1_text1": "Gambar datar adalah sekumpulan titik \\((x, y)\\) yang bisa diubah lewat tindakan lurus seperti memindah, mengukur, memutar, memiringkan, dan membalik, ditampilkan oleh matriks 2×2 atau 3×3 (titik seragam).",
-        "concept_1_text2": "Menggunakan matriks ini pada posisi titik menggesernya: mengukur mengubah skala, memutar berputar di tengah, memiringkan membuat miring, dan membalik membalik pandangan di garis tertentu.",
-        "concept_2_title": "### 📊 Penyesuaian Gambar (Pencampuran)",
-        "concept_2_text1": "Penyesuaian menggunakan kisi kecil (matriks pencampuran) yang meluncur di gambar; di setiap tempat, ia membuat nilai titik baru dari total kali kisi dengan titik sekitar.",
-        "concept_2_text2": "Kisi dengan angka baik seragam membuat pandangan lebih halus atau kabur, sementara kisi dengan tengah baik kuat dan sekitar buruk membuat lebih tajam dan menonjolkan tepi.",
-        "concept_3_title": "### 🎲 Mengapa Praktis?",
-        "concept_3_text1": "Aplikasi ini praktis karena pengguna bisa menyetel pengaturan (seperti derajat putar, faktor ukur, kekuatan miring, jenis kisi untuk halus atau fokus, dll.) dan langsung lihat perubahan di gambar. ✨",
-        "concept_3_text2": "Ini menghubungkan struktur kisi atau matriks dengan hasil visual, membuat gagasan seperti perubahan lurus dan pencampuran lebih gampang dipahami secara alami.",
-        "quick_concepts": "#### 📝 Ide Utama",
-        "quick_concepts_text": "- ↩️ Perubahan 2D: geser posisi titik (memindah, mengukur, memutar, memiringkan, membalik).\n- 📊 Pencampuran: kisi kecil meluncur di gambar untuk membuat nilai titik baru.",
-        "upload_title": "### 📷 Tambah Foto",
-        "upload_label": "Tambah foto di sini (PNG/JPG/JPEG) 📂",
-        "upload_success": "✅ Foto ditambah dengan baik!",
-        "upload_preview": "📷 Tampilan Foto Awal",
-        "upload_info": "⬆️ Tolong tambah foto dulu untuk pakai alat di bawah.",
-        "tools_title": "### 🔧 Alat Editing Foto",
-        "tools_subtitle": "🎛️ Pilih kotak di bawah untuk buka setelan perubahan atau penyesuaian.",
-        "geo_title": "#### 🔄 Perubahan Bentuk",
-        "geo_desc": "Perubahan bentuk mengubah posisi titik, ukuran, dan arah menggunakan tindakan lurus (matriks).",
-        "btn_translation": "↔️ Pindah",
-        "btn_scaling": "📏 Ukuran",
-        "btn_rotation": "🔄 Putar",
-        "btn_shearing": "📐 Miring",
-        "btn_reflection": "🪞 Cermin",
-        "geo_info": "🔔 Tolong tambah foto dulu untuk coba perubahan.",
-        "trans_settings": "**↔️ Setelan Pindah**",
-        "trans_dx": "dx (geser samping)",
-        "trans_dy": "dy (geser atas-bawah)",
-        "btn_apply": "Pakai",
-        "trans_result": "Hasil Pindah",
-        "scale_settings": "**📏 Setelan Ukuran**",
-        "scale_x": "Ukuran X",
-        "scale_y": "Ukuran Y",
-        "scale_result": "Hasil Ukuran",
-        "rot_settings": "**🔄 Setelan Putar**",
-        "rot_angle": "Sudut putar (derajat)",
-        "rot_result": "Hasil Putar",
-        "shear_settings": "**📐 Setelan Miring**",
-        "shear_x": "Faktor miring X",
-        "shear_y": "Faktor miring Y",
-        "shear_result": "Hasil Miring",
-        "refl_settings": "**🪞 Setelan Cermin**",
-        "refl_axis": "Garis cermin",
-        "refl_result": "Hasil Cermin",
-        "hist_title": "#### 📈 Bagan Foto",
-        "hist_desc": "Bagan menampilkan sebaran kekuatan titik (redup–terang), berguna untuk periksa cahaya dan bayangan.",
-        "btn_histogram": "Tampilkan Bagan 📈",
-        "hist_warning": "Tolong tambah foto dulu untuk tampilkan bagan.",
-        "filter_title": "#### 🔧 Penyesuaian Foto",
-        "filter_desc": "Penyesuaian mengubah nilai titik berdasarkan tetangga (pencampuran) untuk lakukan halus, fokus, temukan garis, hilangkan latar, dan lain.",
-        "btn_blur": "🔲 Halus",
-        "btn_sharpen": "✨ Fokus",
-        "btn_background": "🎯 Latar",
-        "btn_grayscale": "⚫ Hitam Putih",
-        "btn_edge": "🔍 Garis",
-        "btn_brightness": "☀️ Cahaya",
-        "filter_info": "🔔 Tolong tambah foto dulu untuk pakai penyesuaian.",
-        "blur_settings": "**🔲 Setelan Penyesuaian Halus**",
-        "blur_kernel": "Ukuran kisi",
-        "blur_result": "Hasil Halus",
-        "sharpen_settings": "**✨ Setelan Penyesuaian Fokus**",
-        "sharpen_desc": "Tingkatkan rincian dan garis di foto.",
-        "sharpen_result": "Hasil Fokus",
-        "bg_settings": "**🎯 Setelan Hilangkan Latar**",
-        "bg_method": "Cara (demo pakai HSV saja sekarang)",
-        "bg_result": "Hasil Hilangkan Latar",
-        "gray_settings": "**⚫ Setelan Ubah Hitam Putih**",
-        "gray_desc": "Ubah foto ke hitam putih (abu-abu).",
-        "gray_result": "Hasil Hitam Putih",
-        "edge_settings": "**🔍 Setelan Temukan Garis**",
-        "edge_method": "Cara garis",
-        "edge_result": "Foto Garis",
-        "bright_settings": "**☀️ Setelan Cahaya & Bayangan**",
-        "bright_brightness": "Cahaya",
-        "bright_contrast": "Bayangan",
-        "bright_result": "Hasil Cahaya/Bayangan",
-        "team_title": "### 👥 Orang Kelompok",
-        "team_subtitle": "Kelompok 12 – Orang dan Tugas",
-        "team_sid": "ID:",
-        "team_role": "Tugas:",
-        "team_contribution": "Kontribusi:",
-        "upload_method_title": "### Cara Penguploadan Foto",
-        "upload_method_text": "**Langkah-langkah untuk mengupload foto:**\n1. Klik tombol **\"Tambah foto di sini (PNG/JPG/JPEG) 📂\"** yang terletak di bagian atas halaman.\n2. Pilih file gambar dari perangkat Anda (format yang didukung: PNG, JPG, atau JPEG).\n3. Tunggu hingga gambar berhasil diupload dan ditampilkan di layar.\n4. Jika berhasil, Anda akan melihat pesan konfirmasi dan preview gambar awal.\n5. Sekarang Anda dapat menggunakan alat editing di kolom kiri (transformasi geometris) dan kanan (penyesuaian gambar).",
-        "team_group": "Kelompok:",
-        "axis_x": "Garis-X",
-        "axis_y": "Garis-Y",
-        "axis_diag": "Silang",
-        "dark_mode": "Gaya Malam",
-        "light_mode": "Gaya Siang",
-    },
-    "en": {
-        "title": "🔢 Matrix Operations for Visual Editing",
-        "subtitle": "🎯 Live exploration of 2D matrix changes and picture adjustments",
-        "app_goal": "🎯 **Goal:** A hands-on exploration showing how 2D matrix changes and picture adjustments affect visuals through linear algebra ideas.",
-        "features": "- ↩️ Changes: moving, sizing, turning, slanting, flipping\n- 🧽 Adjustments: smoothing, focusing, outline spotting, backdrop clearing, turning to monochrome, tweaking light & shade",
-        "concept_1_title": "### 🌀 2D Matrix Changes",
-        "concept_1_text1": "A flat image is a group of spots \\((x, y)\\) that get moved by straight-line actions like moving, sizing, turning, slanting, and flipping, shown by 2×2 or 3×3 matrices (uniform spots).",
-        "concept_1_text2": "Using these matrices on spot places shifts them: sizing changes the scale, turning spins the view around its middle, slanting makes it lean, and flipping reverses the view on a chosen line.",
-        "concept_2_title": "### 📊 Picture Adjustments (Mixing)",
-        "concept_2_text1": "Adjusting uses a tiny grid (mixing matrix) that glides over the image; at each spot, it makes a fresh spot value by adding up the grid times nearby spots.",
-        "concept_2_text2": "Grids with even good numbers make the view softer or fuzzy, while grids with a big good middle and bad sides make it sharper and highlight edges.",
-        "concept_3_title": "### 🎲 Why Hands-On?",
-        "concept_3_text1": "The app is hands-on since users can tweak settings (such as turn degrees, size rates, slant strengths, grid kinds for smooth or focus, etc.) and right away see the changes on the view. ✨",
-        "concept_3_text2": "It links the grid or matrix setup to seen effects, making thoughts like straight changes and mixing simpler to grasp naturally.",
-        "quick_concepts": "#### 📝 Key Ideas",
-        "quick_concepts_text": "- ↩️ 2D Changes: shift spot places (moving, sizing, turning, slanting, flipping).\n- 📊 Mixing: a tiny grid gliding over the image to make fresh spot values.",
-        "upload_title": "### 📷 Add Picture",
-        "upload_label": "Add a picture here (PNG/JPG/JPEG) 📂",
-        "upload_success": "✅ Picture added well!",
-        "upload_preview": "📷 Starting Picture View",
-        "upload_info": "⬆️ Kindly add a picture first to use the tools below.",
-        "tools_title": "### 🔧 Picture Editing Tools",
-        "tools_subtitle": "🎛️ Pick a box below to open change or adjust settings.",
-        "geo_title": "#### 🔄 Shape Changes",
-        "geo_desc": "Shape changes alter the spot position, size, and direction using straight actions (matrices).",
-        "btn_translation": "↔️ Move",
-        "btn_scaling": "📏 Size",
-        "btn_rotation": "🔄 Turn",
-        "btn_shearing": "📐 Slant",
-        "btn_reflection": "🪞 Mirror",
-        "geo_info": "🔔 Kindly add a picture first to try changes.",
-        "trans_settings": "**↔️ Move Settings**",
-        "trans_dx": "dx (side move)",
-        "trans_dy": "dy (up-down move)",
-        "btn_apply": "Use",
-        "trans_result": "Move Outcome",
-        "scale_settings": "**📏 Size Settings**",
-        "scale_x": "Size X",
-        "scale_y": "Size Y",
-        "scale_result": "Size Outcome",
-        "rot_settings": "**🔄 Turn Settings**",
-        "rot_angle": "Turn angle (degrees)",
-        "rot_result": "Turn Outcome",
-        "shear_settings": "**📐 Slant Settings**",
-        "shear_x": "Slant factor X",
-        "shear_y": "Slant factor Y",
-        "shear_result": "Slant Outcome",
-        "refl_settings": "**🪞 Mirror Settings**",
-        "refl_axis": "Mirror line",
-        "refl_result": "Mirror Outcome",
-        "hist_title": "#### 📈 Picture Chart",
-        "hist_desc": "The chart displays the spread of spot strengths (dim–bright), handy for checking light and shade.",
-        "btn_histogram": "Show Chart 📈",
-        "hist_warning": "Kindly add a picture first to show the chart.",
-        "filter_title": "#### 🔧 Picture Adjustments",
-        "filter_desc": "Adjustments change spot values based on neighbors (mixing) to do smooth, focus, outline finding, backdrop removal, and more.",
-        "btn_blur": "🔲 Smooth",
-        "btn_sharpen": "✨ Focus",
-        "btn_background": "🎯 Backdrop",
-        "btn_grayscale": "⚫ Monochrome",
-        "btn_edge": "🔍 Outline",
-        "btn_brightness": "☀️ Light",
-        "filter_info": "🔔 Kindly add a picture first to use adjustments.",
-        "blur_settings": "**🔲 Smooth Adjustment Settings**",
-        "blur_kernel": "Grid size",
-        "blur_result": "Smooth Outcome",
-        "sharpen_settings": "**✨ Focus Adjustment Settings**",
-        "sharpen_desc": "Boost details and outlines in the picture.",
-        "sharpen_result": "Focus Outcome",
-        "bg_settings": "**🎯 Backdrop Removal Settings**",
-        "bg_method": "Way (demo uses HSV only now)",
-        "bg_result": "Backdrop Removal Outcome",
-        "gray_settings": "**⚫ Monochrome Change Settings**",
-        "gray_desc": "Change the picture to monochrome (black and white).",
-        "gray_result": "Monochrome Outcome",
-        "edge_settings": "**🔍 Outline Finding Settings**",
-        "edge_method": "Outline way",
-        "edge_result": "Outline Picture",
-        "bright_settings": "**☀️ Light & Shade Settings**",
-        "bright_brightness": "Light",
-        "bright_contrast": "Shade",
-        "bright_result": "Light/Shade Outcome",
-        "team_title": "### 👥 Group People",
-        "team_subtitle": "Group 12 – People and Jobs",
-        "team_sid": "ID:",
-        "team_role": "Job:",
-        "upload_method_title": "### How to Upload Photo",
-        "upload_method_text": "**Steps to upload a photo:**\n1. Click the **\"Add a picture here (PNG/JPG/JPEG) 📂\"** button located at the top of the page.\n2. Select an image file from your device (supported formats: PNG, JPG, or JPEG).\n3. Wait until the image is successfully uploaded and displayed on the screen.\n4. If successful, you will see a confirmation message and a preview of the initial image.\n5. Now you can use the editing tools in the left column (geometric transformations) and right column (image adjustments).",
-        "team_group": "Group:",
-        "team_contribution": "Contribution:",
-        "axis_x": "X-line",
-        "axis_y": "Y-line",
-        "axis_diag": "Cross",
-        "dark_mode": "Night Style",
-        "light_mode": "Day Style",
-    },
-    "zh": {
-        "title": "🧮 图像处理中的矩阵变换",
-        "subtitle": "🎯 实时探索二维矩阵变化和图片调整",
-        "app_goal": "🎯 **目标：** 通过线性代数理念展示二维矩阵变化和图片调整如何影响视觉效果的动手探索。",
-        "features": "- ↩️ 变化：移动、调整大小、旋转、倾斜、翻转\n- 🧽 调整：平滑、聚焦、轮廓检测、背景清除、转为单色、调整光线和阴影",
-        "concept_1_title": "### 🌀 二维矩阵变化",
-        "concept_1_text1": "平面图像是一组点 \\((x, y)\\)，通过直线动作如移动、调整大小、旋转、倾斜和翻转来移动，由2×2或3×3矩阵表示（均匀点）。",
-        "concept_1_text2": "在点位置使用这些矩阵会移动它们：调整大小改变比例，旋转围绕中间旋转视图，倾斜使其倾斜，翻转在选定线上反转视图。",
-        "concept_2_title": "### 📊 图片调整（混合）",
-        "concept_2_text1": "调整使用一个小网格（混合矩阵），在图像上滑动；在每个点，它通过添加网格乘以附近点来制作新的点值。",
-        "concept_2_text2": "具有均匀好数字的网格使视图更柔和或模糊，而具有大好中间和坏侧面的网格使其更锐利并突出边缘。",
-        "concept_3_title": "### 🎲 为什么动手？",
-        "concept_3_text1": "该应用是动手式的，因为用户可以调整设置（如转动度数、大小率、倾斜强度、用于平滑或聚焦的网格种类等），并立即在视图上看到变化。✨",
-        "concept_3_text2": "它将网格或矩阵设置链接到可见效果，使直线变化和混合等思想更容易自然理解。",
-        "quick_concepts": "#### 📝 关键理念",
-        "quick_concepts_text": "- ↩️ 二维变化：移动点位置（移动、调整大小、旋转、倾斜、翻转）。\n- 📊 混合：一个小网格在图像上滑动以制作新的点值。",
-        "upload_title": "### 📷 添加图片",
-        "upload_label": "在此处添加图片（PNG/JPG/JPEG）📂",
-        "upload_success": "✅ 图片添加成功！",
-        "upload_preview": "📷 起始图片视图",
-        "upload_info": "⬆️ 请先添加图片以使用下面的工具。",
-        "tools_title": "### 🔧 图片编辑工具",
-        "tools_subtitle": "🎛️ 选择下面的框以打开变化或调整设置。",
-        "geo_title": "#### 🔄 形状变化",
-        "geo_desc": "形状变化使用直线动作（矩阵）改变点位置、大小和方向。",
-        "btn_translation": "↔️ 移动",
-        "btn_scaling": "📏 大小",
-        "btn_rotation": "🔄 旋转",
-        "btn_shearing": "📐 倾斜",
-        "btn_reflection": "🪞 镜像",
-        "geo_info": "🔔 请先添加图片以尝试变化。",
-        "trans_settings": "**↔️ 移动设置**",
-        "trans_dx": "dx（侧面移动）",
-        "trans_dy": "dy（上下移动）",
-        "btn_apply": "使用",
-        "trans_result": "移动结果",
-        "scale_settings": "**📏 大小设置**",
-        "scale_x": "大小 X",
-        "scale_y": "大小 Y",
-        "scale_result": "大小结果",
-        "rot_settings": "**🔄 旋转设置**",
-        "rot_angle": "旋转角度（度）",
-        "rot_result": "旋转结果",
-        "shear_settings": "**📐 倾斜设置**",
-        "shear_x": "倾斜因子 X",
-        "shear_y": "倾斜因子 Y",
-        "shear_result": "倾斜结果",
-        "refl_settings": "**🪞 镜像设置**",
-        "refl_axis": "镜像线",
-        "refl_result": "镜像结果",
-        "hist_title": "#### 📈 图片图表",
-        "hist_desc": "图表显示点强度的分布（暗–亮），有助于检查光线和阴影。",
-        "btn_histogram": "显示图表 📈",
-        "hist_warning": "请先添加图片以显示图表。",
-        "filter_title": "#### 🔧 图片调整",
-        "filter_desc": "调整基于邻居（混合）改变点值以进行平滑、聚焦、轮廓查找、背景移除等。",
-        "btn_blur": "🔲 平滑",
-        "btn_sharpen": "✨ 聚焦",
-        "btn_background": "🎯 背景",
-        "btn_grayscale": "⚫ 单色",
-        "btn_edge": "🔍 轮廓",
-        "btn_brightness": "☀️ 光线",
-        "filter_info": "🔔 请先添加图片以使用调整。",
-        "blur_settings": "**🔲 平滑调整设置**",
-        "blur_kernel": "网格大小",
-        "blur_result": "平滑结果",
-        "sharpen_settings": "**✨ 聚焦调整设置**",
-        "sharpen_desc": "提升图片中的细节和轮廓。",
-        "sharpen_result": "聚焦结果",
-        "bg_settings": "**🎯 背景移除设置**",
-        "bg_method": "方式（演示目前仅使用HSV）",
-        "bg_result": "背景移除结果",
-        "gray_settings": "**⚫ 单色变化设置**",
-        "gray_desc": "将图片转为单色（黑白）。",
-        "gray_result": "单色结果",
-        "edge_settings": "**🔍 轮廓查找设置**",
-        "edge_method": "轮廓方式",
-        "edge_result": "轮廓图片",
-        "bright_settings": "**☀️ 光线和阴影设置**",
-        "bright_brightness": "光线",
-        "bright_contrast": "阴影",
-        "bright_result": "光线/阴影结果",
-        "team_title": "### 👥 组员",
-        "team_subtitle": "第12组 – 人员和职务",
-        "team_sid": "ID:",
-        "team_role": "职务:",
-        "team_group": "组:",
-        "team_contribution": "帮助：",
-        "upload_method_title": "### 如何上传照片",
-        "upload_method_text": "**上传照片的步骤：**\n1. 点击位于页面顶部的 **\"在此处添加图片（PNG/JPG/JPEG）📂\"** 按钮。\n2. 从您的设备中选择图像文件（支持的格式：PNG、JPG 或 JPEG）。\n3. 等待图像成功上传并显示在屏幕上。\n4. 如果成功，您将看到确认消息和初始图像的预览。\n5. 现在您可以使用左侧列（几何变换）和右侧列（图像调整）中的编辑工具。",
-        "axis_x": "X线",
-        "axis_y": "Y线",
-        "axis_diag": "交叉",
-        "dark_mode": "夜间风格",
-        "light_mode": "白天风格",
-    }
-}
+if "transform_stack" not in st.session_state:
+    st.session_state["transform_stack"] = []
 
 # ===================== HEADER =====================
 
@@ -487,402 +272,304 @@ with st.container(border=True):
 
 # ===================== HELPER FUNCTIONS =====================
 
+# ---------- DECODE & MASK CACHE ----------
+# Budget (MB) cache hasil decode upload, dipakai bersama oleh semua sesi.
+DECODE_CACHE_MB = int(os.environ.get("DECODE_CACHE_MB", "256"))
+# Budget (MB) cache mask background; ganti warna/output cukup composite ulang.
+MASK_CACHE_MB = int(os.environ.get("MASK_CACHE_MB", "256"))
+# Budget (MB) memori kerja hapus-background per sesi; foto lebih besar
+# diproses per band (lihat remove_background_advanced).
+BG_MEMORY_BUDGET_MB = int(os.environ.get("BG_MEMORY_BUDGET_MB", "512"))
+# Folder cache thumbnail (foto tim dan tampilan thumbnail lain); bertahan
+# antar restart. Kosongkan untuk cache memori saja.
+THUMBNAIL_CACHE_DIR = os.environ.get("THUMBNAIL_CACHE_DIR", os.path.join(".cache", "thumbnails"))
+
+
+@st.cache_resource
+def get_decode_cache() -> ArrayCache:
+    return ArrayCache(DECODE_CACHE_MB)
+
+
+@st.cache_resource
+def get_mask_cache() -> ArrayCache:
+    return ArrayCache(MASK_CACHE_MB)
+
+
+@st.cache_resource
+def get_thumbnail_cache() -> ThumbnailCache:
+    return ThumbnailCache(THUMBNAIL_CACHE_DIR or None)
+
+
 def load_image(file):
-    img = Image.open(file).convert("RGB")
-    img_np = np.array(img)
-    return img_np
-
-def to_opencv(img_rgb):
-    return cv2.cvtColor(img_rgb, cv2.COLOR_RGB2BGR)
-
-def to_streamlit(img_bgr):
-    return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
-
-def apply_affine_transform(img_rgb, M, output_size=None):
-    img_bgr = to_opencv(img_rgb)
-    h, w = img_bgr.shape[:2]
-    if output_size is None:
-        output_size = (w, h)
-    if M.shape == (3, 3):
-        M_affine = M[0:2, :]
-    else:
-        M_affine = M
-    transformed = cv2.warpAffine(
-        img_bgr, M_affine, output_size,
-        flags=cv2.INTER_LINEAR,
-        borderMode=cv2.BORDER_REFLECT
-    )
-    return to_streamlit(transformed)
-
-def manual_convolution_gray(img_gray, kernel):
-    k_h, k_w = kernel.shape
-    pad_h = k_h // 2
-    pad_w = k_w // 2
-    padded = np.pad(img_gray, ((pad_h, pad_h), (pad_w, pad_w)), mode="reflect")
-    h, w = img_gray.shape
-    output = np.zeros_like(img_gray, dtype=np.float32)
-    for i in range(h):
-        for j in range(w):
-            region = padded[i:i + k_h, j:j + k_w]
-            output[i, j] = np.sum(region * kernel)
-    output = np.clip(output, 0, 255).astype(np.uint8)
-    return output
-
-def rgb_to_gray(img_rgb):
-    img_bgr = to_opencv(img_rgb)
-    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    return gray
-
-def adjust_brightness_contrast(img_rgb, brightness=0, contrast=0):
-    img_bgr = to_opencv(img_rgb)
-    beta = brightness
-    alpha = 1 + (contrast / 100.0)
-    adjusted = cv2.convertScaleAbs(img_bgr, alpha=alpha, beta=beta)
-    return to_streamlit(adjusted)
-
-def image_to_bytes(img_rgb, fmt="PNG"):
-    if img_rgb is None:
-        raise ValueError("image_to_bytes received None image")
-    arr = np.array(img_rgb)
-    if arr.ndim == 2:
-        arr = cv2.cvtColor(arr, cv2.COLOR_GRAY2RGB)
-    if fmt.upper() == "JPEG" and arr.ndim == 3 and arr.shape[2] == 4:
-        arr = arr[:, :, :3]
-    pil_img = Image.fromarray(arr.astype("uint8"))
-    buf = BytesIO()
-    pil_img.save(buf, format=fmt)
-    return buf.getvalue()
-
-# ===================== ADVANCED BACKGROUND HELPERS =====================
-
-def _feather_mask(mask: np.ndarray, radius: int) -> np.ndarray:
-    """Feather/smooth mask edges using Gaussian blur."""
-    if radius <= 0:
-        m = mask.astype(np.float32)
-        if m.max() > 1.0:
-            m = m / 255.0
-        return m
-
-    m = mask.astype(np.float32)
-    if m.max() > 1.0:
-        m = m / 255.0
-
-    ksize = radius * 2 + 1
-    m_blur = cv2.GaussianBlur(m, (ksize, ksize), 0)
-    return np.clip(m_blur, 0.0, 1.0)
-
-
-def _refine_hair_region(image_rgb: np.ndarray,
-                        mask: np.ndarray,
-                        refine_hair: bool = True) -> np.ndarray:
-    """Refine mask around hair and fine details using edge cues."""
-    m = mask.copy().astype(np.uint8)
-    if m.max() > 1:
-        m = (m > 127).astype(np.uint8)
-
-    if not refine_hair:
-        return m
-
-    img_bgr = to_opencv(image_rgb)
-    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, 50, 150)
-    edge_dilated = cv2.dilate(edges, np.ones((3, 3), np.uint8))
-
-    m = cv2.morphologyEx(m, cv2.MORPH_CLOSE, np.ones((3, 3), np.uint8))
-    m = cv2.morphologyEx(m, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
-
-    m[edge_dilated > 0] = 1
-    return m.astype(np.uint8)
-
-
-def _remove_small_holes(mask: np.ndarray,
-                        min_area: int = 100) -> np.ndarray:
-    """Remove small holes inside the foreground mask."""
-    m = mask.copy().astype(np.uint8)
-    if m.max() > 1:
-        m = (m > 127).astype(np.uint8)
-
-    inv = (1 - m).astype(np.uint8)
-    contours, _ = cv2.findContours(inv, cv2.RETR_EXTERNAL,
-                                   cv2.CHAIN_APPROX_SIMPLE)
-    for cnt in contours:
-        if cv2.contourArea(cnt) < min_area:
-            cv2.drawContours(inv, [cnt], -1, 0, thickness=cv2.FILLED)
-
-    cleaned = 1 - inv
-    return cleaned.astype(np.uint8)
-
-
-def _apply_solid_background(image_rgb: np.ndarray,
-                            mask_float: np.ndarray,
-                            color: tuple[int, int, int]) -> np.ndarray:
-    """Replace background with solid RGB color."""
-    h, w = image_rgb.shape[:2]
-    bg = np.full((h, w, 3), color, dtype=np.uint8)
-
-    alpha = mask_float[:, :, None]
-    out = (alpha * image_rgb.astype(np.float32) +
-           (1.0 - alpha) * bg.astype(np.float32))
-    return out.astype(np.uint8)
-
-
-def _apply_blur_background(image_rgb: np.ndarray,
-                           mask_float: np.ndarray,
-                           ksize: int = 21) -> np.ndarray:
-    """Blur only the background while keeping subject sharp."""
-    if ksize % 2 == 0:
-        ksize += 1
-    blurred = cv2.GaussianBlur(image_rgb, (ksize, ksize), 0)
-
-    alpha = mask_float[:, :, None]
-    out = (alpha * image_rgb.astype(np.float32) +
-           (1.0 - alpha) * blurred.astype(np.float32))
-    return out.astype(np.uint8)
-
-
-def segment_foreground(image: np.ndarray) -> np.ndarray:
+    """Return (sha256 of the file bytes, decoded RGB array)."""
+    data = file.getvalue() if hasattr(file, "getvalue") else file.read()
+    key = hashlib.sha256(data).hexdigest()
+    cache = get_decode_cache()
+    img_np = cache.get(key)
+    if img_np is None:
+        img_np = decode_image(data)
+        cache.put(key, img_np)
+    return key, img_np
+
+def current_image_key(img):
+    """Hash of the uploaded file (or of the pixels when set without upload)."""
+    key = st.session_state.get("original_key")
+    if key is None:
+        key = hashlib.sha256(np.ascontiguousarray(img)).hexdigest()
+    return key
+
+def cached_background_mask(image_key, img, mode, feather_radius, refine_hair, profiler=None,
+                           progress=None, cache=None):
+    """background_mask, memoized per (image, mode, feather_radius, refine_hair).
+
+    Dari thread worker, `cache` harus diberikan: get_mask_cache() butuh
+    konteks skrip Streamlit.
     """
-    SIMPLE foreground segmentation.
+    key = (image_key, mode, feather_radius, refine_hair)
+    if cache is None:
+        cache = get_mask_cache()
+    mask = cache.get(key)
+    if mask is None:
+        mask = background_mask(
+            img,
+            mode=mode,
+            feather_radius=feather_radius,
+            refine_hair=refine_hair,
+            profiler=profiler,
+            memory_budget_mb=BG_MEMORY_BUDGET_MB,
+            progress=progress,
+        )
+        cache.put(key, mask)
+    return mask
 
-    Untuk sementara: subject dianggap di tengah gambar (ellipse).
-    Nanti bisa kamu ganti dengan model segmentasi beneran.
-    """
-    h, w = image.shape[:2]
-    mask = np.zeros((h, w), dtype=np.uint8)
+# ---------- BACKGROUND JOBS ----------
+# Operasi berat (hapus background, video) jalan di pool worker bersama;
+# sesi hanya menyimpan Job dan mem-poll progress lewat fragment, jadi
+# skrip tidak terblokir dan pekerjaan bisa dibatalkan.
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", str(max(2, os.cpu_count() or 1))))
+JOB_POLL_SECONDS = 0.5
 
-    center = (w // 2, h // 2)
-    axes = (int(w * 0.35), int(h * 0.45))
-    cv2.ellipse(mask, center, axes, 0, 0, 360, 255, -1)
 
-    return mask
+@st.cache_resource
+def get_job_runner() -> JobRunner:
+    return JobRunner(JOB_WORKERS)
 
 
-# ===================== ADVANCED BACKGROUND MAIN FUNCTION =====================
+def submit_job(slot, fn, *args, **kwargs):
+    """Run fn(job, ...) on the worker pool; supersedes the session's job in `slot`.
 
-def remove_background_advanced(
-    image: np.ndarray,
-    mode: str = "auto",
-    target_background_type: str | None = None,
-    output_mode: str = "transparent",
-    solid_color: tuple[int, int, int] | None = None,
-    feather_radius: int = 3,
-    refine_hair: bool = True,
-) -> np.ndarray:
+    Job lama dibatalkan (berhenti di checkpoint berikutnya) alih-alih
+    ditunggu, jadi Apply baru tidak antre di belakang hasil yang basi.
     """
-    Advanced background removal supporting multiple background types and outputs.
-    """
-    if image is None:
-        raise ValueError("Input image is None")
-
-    if image.ndim != 3 or image.shape[2] != 3:
-        raise ValueError("`image` must be RGB with shape (H, W, 3)")
-
-    h, w = image.shape[:2]
-    img_bgr = to_opencv(image)
-    img_hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
-    img_lab = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2LAB)
-    L_channel = img_lab[:, :, 0]
-
-    bg_type = (target_background_type or mode or "auto").lower()
-
-    # ---------- RAW MASK PER MODE ----------
-    if bg_type in ["solid", "studio"]:
-        border_thick = max(5, min(h, w) // 20)
-        border_pixels = np.concatenate([
-            img_hsv[:border_thick, :, :].reshape(-1, 3),
-            img_hsv[-border_thick:, :, :].reshape(-1, 3),
-            img_hsv[:, :border_thick, :].reshape(-1, 3),
-            img_hsv[:, -border_thick:, :].reshape(-1, 3),
-        ], axis=0)
-        bg_color = np.median(border_pixels, axis=0).astype(np.float32)
-
-        hsv_flat = img_hsv.reshape(-1, 3).astype(np.float32)
-        dist = np.linalg.norm(hsv_flat - bg_color[None, :], axis=1)
-        dist_img = dist.reshape(h, w)
-        thresh = np.percentile(dist_img, 60)
-        raw_mask = (dist_img > thresh).astype(np.uint8)
-
-    elif bg_type == "gradient":
-        L_norm = cv2.normalize(L_channel, None, 0, 255, cv2.NORM_MINMAX)
-        edges = cv2.Canny(L_norm, 50, 150)
-        thr = cv2.adaptiveThreshold(
-            L_norm, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY, 21, 5
-        )
-        raw_mask = ((thr == 255) | (edges > 0)).astype(np.uint8)
-
-    elif bg_type == "textured":
-        prior_mask = segment_foreground(image)
-        if prior_mask.max() > 1:
-            prior_mask = (prior_mask > 127).astype(np.uint8)
-
-        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 80, 160)
-        prior_dilated = cv2.dilate(prior_mask, np.ones((7, 7), np.uint8))
-        edge_near_prior = cv2.dilate(edges, np.ones((5, 5), np.uint8))
-        raw_mask = ((prior_dilated == 1) | (edge_near_prior > 0)).astype(np.uint8)
-
-    elif bg_type == "natural":
-        prior_mask = segment_foreground(image)
-        if prior_mask.max() > 1:
-            prior_mask = (prior_mask > 127).astype(np.uint8)
-
-        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 80, 200)
-
-        border_thick = max(5, min(h, w) // 20)
-        border_pixels = img_lab[:border_thick, :, :].reshape(-1, 3)
-        bg_L = np.median(border_pixels[:, 0])
-
-        L_diff = np.abs(L_channel.astype(np.float32) - bg_L)
-        contrast_mask = (L_diff > 15).astype(np.uint8)
-
-        raw_mask = ((prior_mask == 1) | (edges > 0)) & contrast_mask
-
-    elif bg_type == "minimalist":
-        border_thick = max(5, min(h, w) // 20)
-        border_pixels = img_hsv[:border_thick, :, :].reshape(-1, 3)
-        bg_color = np.median(border_pixels, axis=0).astype(np.float32)
-
-        hsv_flat = img_hsv.reshape(-1, 3).astype(np.float32)
-        dist = np.linalg.norm(hsv_flat - bg_color[None, :], axis=1)
-        dist_img = dist.reshape(h, w)
-        thresh = np.percentile(dist_img, 70)
-        raw_mask = (dist_img > thresh).astype(np.uint8)
-
-    elif bg_type == "abstract":
-        prior_mask = segment_foreground(image)
-        if prior_mask.max() > 1:
-            prior_mask = (prior_mask > 127).astype(np.uint8)
-
-        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
-
-        raw = ((prior_mask == 1) | (edges > 0)).astype(np.uint8)
-        raw = cv2.morphologyEx(raw, cv2.MORPH_CLOSE, np.ones((5, 5), np.uint8))
-        raw_mask = raw
-
-    elif bg_type == "vintage":
-        L_blur = cv2.GaussianBlur(L_channel, (5, 5), 0)
-        _, thr = cv2.threshold(L_blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        raw = thr == 255
-        raw = cv2.morphologyEx(raw.astype(np.uint8), cv2.MORPH_OPEN,
-                               np.ones((3, 3), np.uint8))
-        raw_mask = raw
+    old = st.session_state.get(slot)
+    if old is not None and not old.finished:
+        old.cancel()
+    st.session_state[slot] = get_job_runner().submit(fn, *args, **kwargs)
 
-    else:
-        # AUTO: analisa rata/tidaknya brightness di border
-        border_thick = max(5, min(h, w) // 20)
-        border_pixels = img_lab[:border_thick, :, :].reshape(-1, 3)
-        L_border = border_pixels[:, 0]
-        std_L = np.std(L_border)
-
-        if std_L < 5:
-            return remove_background_advanced(
-                image=image,
-                mode="solid",
-                target_background_type="solid",
-                output_mode=output_mode,
-                solid_color=solid_color,
-                feather_radius=feather_radius,
-                refine_hair=refine_hair,
-            )
-        elif std_L < 15:
-            return remove_background_advanced(
-                image=image,
-                mode="gradient",
-                target_background_type="gradient",
-                output_mode=output_mode,
-                solid_color=solid_color,
-                feather_radius=feather_radius,
-                refine_hair=refine_hair,
-            )
+
+def render_job(slot, show_partial, show_result, error_text):
+    """Progress, Cancel and partial output of the job in `slot`; result once done."""
+    job = st.session_state.get(slot)
+    if job is None:
+        return
+    polling = not job.finished
+
+    # Selama job jalan hanya fragment ini yang di-rerun tiap JOB_POLL_SECONDS;
+    # begitu selesai satu rerun penuh mematikan polling dan menampilkan hasil.
+    @st.fragment(run_every=JOB_POLL_SECONDS if polling else None)
+    def poll():
+        if not job.finished:
+            text = t["job_cancelling"] if job.cancel_requested else (job.message or t["job_running"])
+            st.progress(job.progress, text=f"{text} · {job.elapsed:.1f} s")
+            st.button(t["btn_job_cancel"], key=f"{slot}_cancel", on_click=job.cancel,
+                      disabled=job.cancel_requested)
+            if job.partial is not None:
+                show_partial(job.partial)
+        elif polling:
+            st.rerun()
+        elif job.status == CANCELLED:
+            st.warning(t["job_cancelled"])
+        elif job.status == FAILED:
+            st.error(error_text.format(error=job.error))
         else:
-            return remove_background_advanced(
-                image=image,
-                mode="textured",
-                target_background_type="textured",
-                output_mode=output_mode,
-                solid_color=solid_color,
-                feather_radius=feather_radius,
-                refine_hair=refine_hair,
-            )
+            show_result(job.result)
+
+    poll()
+
+
+def background_job(job, mask_cache, image_key, img, method, bg_mode, profiler):
+    """Worker side of the background Apply: (image, download image, profiler)."""
+    if method == "HSV Color Thresholding":
+        result = simple_background_removal_hsv(img)
+        return result, result, profiler
+
+    if method == "Blur Background":
+        output_mode = "blurred"
+        solid_color = None
+    elif method == "Remove Background Transparent":
+        output_mode = "transparent"
+        solid_color = None
+    elif method == "Solid Red Background":
+        output_mode = "solid_color"
+        solid_color = (255, 0, 0)
+    elif method == "Solid Blue Background":
+        output_mode = "solid_color"
+        solid_color = (0, 0, 255)
+    elif method == "Solid Yellow Background":
+        output_mode = "solid_color"
+        solid_color = (255, 255, 0)
+    elif method == "Solid Green Background":
+        output_mode = "solid_color"
+        solid_color = (0, 255, 0)
+    elif method == "Solid Brown Background":
+        output_mode = "solid_color"
+        solid_color = (150, 75, 0)
+    else:
+        output_mode = "transparent"
+        solid_color = None
+
+    # Mask di-cache per foto; ganti output/warna hanya composite.
+    mask = cached_background_mask(
+        image_key, img, mode=bg_mode, feather_radius=3, refine_hair=True,
+        profiler=profiler,
+        progress=lambda done, total: job.report(done, total, t["bg_job_mask"]),
+        cache=mask_cache,
+    )
+    # Mask sudah jadi: tampilkan sebagai hasil sementara selama composite.
+    job.report(0, 1, t["bg_job_composite"], partial=(mask * 255).astype(np.uint8))
+    result = composite_background(
+        img, mask, output_mode, solid_color,
+        memory_budget_mb=BG_MEMORY_BUDGET_MB,
+        profiler=profiler,
+        progress=job.report,
+    )
+    if result.ndim == 3 and result.shape[2] == 4:
+        return result, result[:, :, :3], profiler
+    return result, result, profiler
 
-    # ---------- POST-PROCESSING MASK ----------
-    mask_clean = _remove_small_holes(raw_mask, min_area=100)
-    mask_refined_bin = _refine_hair_region(image, mask_clean, refine_hair=refine_hair)
-    mask_float = _feather_mask(mask_refined_bin, radius=feather_radius)
-
-    # ---------- OUTPUT ----------
-    if output_mode == "custom_mask":
-        return (mask_float * 255.0).astype(np.uint8)
-
-    if output_mode == "transparent":
-        alpha = (mask_float * 255.0).astype(np.uint8)
-        rgba = np.dstack([image.astype(np.uint8), alpha])
-        return rgba
-
-    if output_mode == "solid_color":
-        if solid_color is None:
-            solid_color = (255, 255, 255)
-        rgb_out = _apply_solid_background(image.astype(np.uint8),
-                                          mask_float, solid_color)
-        return rgb_out
-
-    if output_mode == "blurred":
-        rgb_out = _apply_blur_background(image.astype(np.uint8),
-                                         mask_float, ksize=25)
-        return rgb_out
-
-    raise ValueError(f"Unsupported output_mode: {output_mode}")
-
-def compute_histogram(img_rgb):
-    img_bgr = to_opencv(img_rgb)
-    color = ('b', 'g', 'r')
-    fig, ax = plt.subplots(figsize=(8, 4))
-    for i, col in enumerate(color):
-        hist = cv2.calcHist([img_bgr], [i], None, [256], [0, 256])
-        ax.plot(hist, color=col)
-        ax.set_xlim([0, 256])
-    ax.set_title("Color Histogram")
-    ax.set_xlabel("Pixel value")
-    ax.set_ylabel("Frequency")
-    fig.tight_layout()
-    return fig
-
-def simple_background_removal_hsv(img_rgb):
-    img_bgr = to_opencv(img_rgb)
-    hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
-    lower = np.array([0, 0, 0])
-    upper = np.array([180, 255, 200])
-    mask_bg = cv2.inRange(hsv, lower, upper)
-    mask_fg = cv2.bitwise_not(mask_bg)
-    fg = cv2.bitwise_and(img_bgr, img_bgr, mask=mask_fg)
-    fg_rgb = to_streamlit(fg)
-    return fg_rgb
-
-def image_to_bytes(img_rgb, fmt="PNG"):
-    """
-    Convert numpy RGB or RGBA image to bytes for download.
-    - PNG: akan simpan apa adanya (termasuk alpha/transparan).
-    - JPEG: otomatis buang alpha (RGBA -> RGB) agar tidak error.
-    """
-    if img_rgb is None:
-        raise ValueError("image_to_bytes received None image")
 
-    arr = np.array(img_rgb)
-    # kalau grayscale, naikkan ke RGB
-    if arr.ndim == 2:
-        arr = cv2.cvtColor(arr, cv2.COLOR_GRAY2RGB)
+def show_background_result(result):
+    bg_removed_img, output_for_download, profiler = result
+    st.image(bg_removed_img, caption=t["bg_result"], use_column_width=True)
+    render_download_buttons(lambda: output_for_download, "background_result", "dl_bg")
+    if profiler is not None and profiler.stages:
+        render_profiler_panel(profiler, "bg")
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_histogram(image_key, _img):
+    """Histogram counts per foto; `_img` tidak di-hash, kuncinya hash file."""
+    return compute_histogram(_img)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_image_bytes(digest, _img, fmt):
+    """image_to_bytes per (isi gambar, format); `_img` tidak di-hash, kuncinya `digest`."""
+    return image_to_bytes(_img, fmt=fmt)
+
+
+def download_bytes(img, fmt):
+    # Kunci dari isi piksel, jadi array yang diubah in-place tidak memberi
+    # bytes basi; hash jauh lebih murah daripada encode ulang.
+    digest = hashlib.sha256(repr((img.shape, img.dtype.str)).encode())
+    digest.update(np.ascontiguousarray(img))
+    return cached_image_bytes(digest.hexdigest(), img, fmt)
+
+def render_preview(render, original: np.ndarray, preview: np.ndarray):
+    """Run `render(img, S)` on the preview image.
+
+    Returns the preview result and a zero-argument callable that replays the
+    same parameters on the full-resolution original (for export).
+    """
+    if preview is original:
+        result = render(original, np.eye(3))
+        return result, lambda: result
+    result = render(preview, grid_scale_matrix(original.shape, preview.shape))
+    return result, functools.cache(lambda: render(original, np.eye(3)))
+
+def render_geo_result(steps, original, preview, caption, file_stem, key_prefix):
+    """Compose `steps` into one warp, show it on the preview and offer downloads."""
+    M, size = compose_transforms(steps, (original.shape[1], original.shape[0]))
+    result, export_img = render_preview(
+        lambda img, G: apply_matrix_transform(
+            img, rescale_transform(M, G), output_size=rescale_size(size, G),
+        ),
+        original, preview,
+    )
+    st.image(result, caption=caption, use_column_width=True)
+    render_download_buttons(export_img, file_stem, key_prefix)
+
+
+def render_profiler_panel(profiler, key_prefix: str):
+    """Collapsible per-stage timing table with a JSON export."""
+    total_ms = profiler.total_seconds * 1000
+    with st.expander(t["bg_profiler_title"].format(total=total_ms), expanded=False):
+        st.dataframe(
+            [
+                {
+                    "stage": s["stage"],
+                    "ms": round(s["seconds"] * 1000, 2),
+                    "share %": round(100 * s["seconds"] / profiler.total_seconds, 1)
+                    if profiler.total_seconds else 0.0,
+                    "output MB": round(s.get("output_mb", 0.0), 2),
+                    "details": ", ".join(
+                        f"{k}={v}" for k, v in s.items()
+                        if k not in ("stage", "seconds", "output_mb", "output_shape")
+                    ),
+                }
+                for s in profiler.stages
+            ],
+            use_container_width=True,
+        )
+        st.download_button(
+            label="⬇️ Download JSON",
+            data=profiler.to_json(),
+            file_name="profile.json",
+            mime="application/json",
+            key=f"dl_{key_prefix}_profile",
+            on_click="ignore",
+        )
 
-    # kalau JPEG, buang alpha dulu kalau ada
-    if fmt.upper() == "JPEG" and arr.ndim == 3 and arr.shape[2] == 4:
-        arr = arr[:, :, :3]
 
-    pil_img = Image.fromarray(arr.astype("uint8"))
-    buf = BytesIO()
-    pil_img.save(buf, format=fmt)
-    return buf.getvalue()
+def render_cache_stats():
+    """Collapsible hit/miss/eviction counters of the shared caches."""
+    with st.expander(t["cache_stats_title"], expanded=False):
+        caches = {
+            "decode": get_decode_cache(),
+            "mask": get_mask_cache(),
+            "thumbnail": get_thumbnail_cache(),
+        }
+        rows = []
+        for name, cache in caches.items():
+            stats = cache.stats()
+            lookups = stats["hits"] + stats.get("disk_hits", 0) + stats["misses"]
+            rows.append({
+                "cache": name,
+                **stats,
+                "hit %": round(100 * (lookups - stats["misses"]) / lookups, 1) if lookups else 0.0,
+            })
+        st.dataframe(rows, use_container_width=True)
+
+
+def render_download_buttons(export_img, file_stem: str, key_prefix: str):
+    """PNG/JPG download buttons; `export_img()` only runs when clicked."""
+    col_png, col_jpg = st.columns(2)
+    with col_png:
+        st.download_button(
+            label="⬇️ Download PNG",
+            data=lambda: download_bytes(export_img(), "PNG"),
+            file_name=f"{file_stem}.png",
+            mime="image/png",
+            key=f"{key_prefix}_png",
+            on_click="ignore",
+        )
+    with col_jpg:
+        st.download_button(
+            label="⬇️ Download JPG",
+            data=lambda: download_bytes(export_img(), "JPEG"),
+            file_name=f"{file_stem}.jpg",
+            mime="image/jpeg",
+            key=f"{key_prefix}_jpg",
+            on_click="ignore",
+        )
 
 def create_square_image_html(image_path, size=140):
     """Create HTML for square cropped image"""
@@ -894,35 +581,23 @@ def create_square_image_html(image_path, size=140):
 
 # ===================== TEAM PHOTO HELPERS =====================
 
-def safe_display_square_image(path):
-    if os.path.exists(path):
-        try:
-            img = Image.open(path)
-            if img.mode != "RGB":
-                img = img.convert("RGB")
-            width, height = img.size
-            min_dim = min(width, height)
-            left = (width - min_dim) // 2
-            top = (height - min_dim) // 2
-            right = left + min_dim
-            bottom = top + min_dim
-            img_cropped = img.crop((left, top, right, bottom))
-            img_resized = img_cropped.resize((140, 140), Image.Resampling.LANCZOS)
-
-            buffered = BytesIO()
-            img_resized.save(buffered, format="JPEG")
-            img_str = base64.b64encode(buffered.getvalue()).decode()
-
-            st.markdown(
-                f"""
-                <div class="team-photo-container">
-                    <img src="data:image/jpeg;base64,{img_str}" alt="Team member"/>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
-        except Exception as e:
-            st.error(f"Error loading image: {e}")
+def safe_display_square_image(path, size=140):
+    try:
+        # Rerun cukup stat file; decode/crop/resize hanya saat file berubah.
+        data = get_thumbnail_cache().get(path, size)
+    except Exception as e:
+        st.error(f"Error loading image: {e}")
+        return
+    if data is not None:
+        img_str = base64.b64encode(data).decode()
+        st.markdown(
+            f"""
+            <div class="team-photo-container">
+                <img src="data:image/jpeg;base64,{img_str}" alt="Team member"/>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
     else:
         st.markdown(
             """
@@ -935,19 +610,22 @@ def safe_display_square_image(path):
             unsafe_allow_html=True,
         )
 
-# Ensure images folder and placeholders exist
-images_dir = "images"
-os.makedirs(images_dir, exist_ok=True)
-placeholder_files = [
-    os.path.join(images_dir, "gitsi.jpeg"),
-    os.path.join(images_dir, "bella.jpeg"),
-    os.path.join(images_dir, "chinta.jpeg"),
-    os.path.join(images_dir, "yessa.jpeg"),
-]
-for p in placeholder_files:
-    if not os.path.exists(p):
-        placeholder = Image.new("RGB", (400, 400), color=(200, 200, 200))
-        placeholder.save(p, format="JPEG")
+# Ensure images folder and placeholders exist (sekali per proses, bukan per rerun)
+@st.cache_resource
+def ensure_placeholder_images(images_dir="images"):
+    os.makedirs(images_dir, exist_ok=True)
+    placeholder_files = [
+        os.path.join(images_dir, "gitsi.jpeg"),
+        os.path.join(images_dir, "bella.jpeg"),
+        os.path.join(images_dir, "chinta.jpeg"),
+        os.path.join(images_dir, "yessa.jpeg"),
+    ]
+    for p in placeholder_files:
+        if not os.path.exists(p):
+            placeholder = Image.new("RGB", (400, 400), color=(200, 200, 200))
+            placeholder.save(p, format="JPEG")
+
+ensure_placeholder_images()
 
 # ===================== UPLOAD IMAGE =====================
 
@@ -959,15 +637,32 @@ with st.container(border=True):
         key="image_uploader",
     )
     if uploaded_file is not None:
-        original_img = load_image(uploaded_file)
+        image_key, original_img = load_image(uploaded_file)
         st.session_state.original_img = original_img
+        st.session_state.original_key = image_key
         st.success(t["upload_success"])
         st.image(original_img, caption=t["upload_preview"], use_column_width=True)
+        st.toggle(t["preview_mode"], value=True, key="preview_mode",
+                  help=t["preview_help"].format(edge=PREVIEW_MAX_EDGE))
     else:
         st.info(t["upload_info"])
 
 original_img = st.session_state.original_img
 
+# Proxy dibuat sekali per foto; dipakai selama mode pratinjau aktif.
+preview_img = original_img
+if original_img is not None:
+    if st.session_state.get("preview_src") is not original_img:
+        st.session_state.preview_src = original_img
+        st.session_state.preview_img = make_preview_proxy(original_img)
+        st.session_state["transform_stack"] = []
+        # Hasil hapus-background milik foto sebelumnya tidak berlaku lagi.
+        stale_job = st.session_state.pop("bg_job", None)
+        if stale_job is not None:
+            stale_job.cancel()
+    if st.session_state.get("preview_mode", True):
+        preview_img = st.session_state.preview_img
+
 with st.container(border=True):
     st.markdown(t["upload_method_title"])
     st.markdown(t["upload_method_text"])
@@ -979,9 +674,40 @@ st.write(t["tools_subtitle"])
 
 tools_col_left, tools_col_right = st.columns(2, vertical_alignment="top")  # PENTING [file:2]
 
+# Tiap panel alat adalah st.fragment: interaksi di dalamnya hanya menjalankan
+# ulang panel itu, bukan seluruh halaman (video background, konsep, upload,
+# kartu tim). Rerun fragment memakai argumen dari run penuh terakhir; upload
+# baru dan toggle pratinjau ada di luar panel, jadi selalu run penuh.
+
+
+def geo_step_controls(step, caption, file_stem, key_suffix, original_img, preview_img):
+    """Apply/Stack buttons for one geometric tool.
+
+    Apply shows the current stack plus this step (one warp); Stack appends it.
+    """
+    col_apply, col_stack = st.columns(2)
+    with col_apply:
+        apply_clicked = st.button(f"{t['btn_apply']} ✅", key=f"btn_apply_{key_suffix}", type="primary")
+    with col_stack:
+        if st.button(t["btn_stack_add"], key=f"btn_stack_{key_suffix}", type="secondary"):
+            st.session_state["transform_stack"].append(step)
+    if apply_clicked:
+        render_geo_result(
+            st.session_state["transform_stack"] + [step],
+            original_img, preview_img, caption, file_stem, f"dl_{key_suffix}",
+        )
+
 # ==================== LEFT: GEOMETRIC TRANSFORMATIONS ====================
 
-with tools_col_left:
+@st.fragment
+def geometric_panel(original_img, preview_img):
+    # Ukuran kanvas setelah tumpukan; matriks alat baru dibangun di kanvas ini.
+    if original_img is not None:
+        _, (canvas_w, canvas_h) = compose_transforms(
+            st.session_state["transform_stack"],
+            (original_img.shape[1], original_img.shape[0]),
+        )
+
     # Box 1: judul + tombol
     with st.container(border=True):
         st.markdown(t["geo_title"])
@@ -1016,127 +742,46 @@ with tools_col_left:
                 st.markdown(t["trans_settings"])
                 dx = st.slider(t["trans_dx"], -200, 200, 0, key="trans_dx")
                 dy = st.slider(t["trans_dy"], -200, 200, 0, key="trans_dy")
-                if st.button(f"{t['btn_apply']} ✅", key="btn_apply_trans", type="primary"):
-                    T = np.array([[1, 0, dx],
-                                  [0, 1, dy],
-                                  [0, 0, 1]], dtype=np.float32)
-                    translated_img = apply_affine_transform(original_img, T)
-                    st.image(translated_img, caption=t["trans_result"], use_column_width=True)
-                    col_png, col_jpg = st.columns(2)
-                    with col_png:
-                        st.download_button(
-                            label="⬇️ Download PNG",
-                            data=image_to_bytes(translated_img, fmt="PNG"),
-                            file_name="translation_result.png",
-                            mime="image/png",
-                            key="dl_trans_png",
-                        )
-                    with col_jpg:
-                        st.download_button(
-                            label="⬇️ Download JPG",
-                            data=image_to_bytes(translated_img, fmt="JPEG"),
-                            file_name="translation_result.jpg",
-                            mime="image/jpeg",
-                            key="dl_trans_jpg",
-                        )
+                T = translation_matrix(dx, dy)
+                geo_step_controls(
+                    {"tool": "btn_translation", "params": f"dx={dx}, dy={dy}", "M": T, "size": None},
+                    t["trans_result"], "translation_result", "trans",
+                    original_img, preview_img,
+                )
 
             elif st.session_state["geo_transform"] == "scaling":
                 st.markdown(t["scale_settings"])
                 sx = st.slider(t["scale_x"], 0.1, 3.0, 1.0, key="scale_x")
                 sy = st.slider(t["scale_y"], 0.1, 3.0, 1.0, key="scale_y")
-                if st.button(f"{t['btn_apply']} ✅", key="btn_apply_scale", type="primary"):
-                    h, w = original_img.shape[:2]
-                    S = np.array([[sx, 0, 0],
-                                  [0, sy, 0],
-                                  [0, 0, 1]], dtype=np.float32)
-                    new_w = int(w * sx)
-                    new_h = int(h * sy)
-                    scaled_img = apply_affine_transform(original_img, S, output_size=(new_w, new_h))
-                    st.image(scaled_img, caption=t["scale_result"], use_column_width=True)
-                    col_png, col_jpg = st.columns(2)
-                    with col_png:
-                        st.download_button(
-                            label="⬇️ Download PNG",
-                            data=image_to_bytes(scaled_img, fmt="PNG"),
-                            file_name="scaling_result.png",
-                            mime="image/png",
-                            key="dl_scale_png",
-                        )
-                    with col_jpg:
-                        st.download_button(
-                            label="⬇️ Download JPG",
-                            data=image_to_bytes(scaled_img, fmt="JPEG"),
-                            file_name="scaling_result.jpg",
-                            mime="image/jpeg",
-                            key="dl_scale_jpg",
-                        )
+                S = scaling_matrix(sx, sy)
+                new_w = int(canvas_w * sx)
+                new_h = int(canvas_h * sy)
+                geo_step_controls(
+                    {"tool": "btn_scaling", "params": f"sx={sx:.2f}, sy={sy:.2f}", "M": S, "size": (new_w, new_h)},
+                    t["scale_result"], "scaling_result", "scale",
+                    original_img, preview_img,
+                )
 
             elif st.session_state["geo_transform"] == "rotation":
                 st.markdown(t["rot_settings"])
                 angle = st.slider(t["rot_angle"], -180, 180, 0, key="rot_angle")
-                if st.button(f"{t['btn_apply']} ✅", key="btn_apply_rot", type="primary"):
-                    h, w = original_img.shape[:2]
-                    cx, cy = w / 2, h / 2
-                    theta = np.deg2rad(angle)
-                    cos_t = np.cos(theta)
-                    sin_t = np.sin(theta)
-                    R = np.array([[cos_t, -sin_t, 0],
-                                  [sin_t,  cos_t, 0],
-                                  [0,      0,     1]], dtype=np.float32)
-                    T1 = np.array([[1, 0, -cx],
-                                   [0, 1, -cy],
-                                   [0, 0, 1]], dtype=np.float32)
-                    T2 = np.array([[1, 0, cx],
-                                   [0, 1, cy],
-                                   [0, 0, 1]], dtype=np.float32)
-                    M = T2 @ R @ T1
-                    rotated_img = apply_affine_transform(original_img, M)
-                    st.image(rotated_img, caption=t["rot_result"], use_column_width=True)
-                    col_png, col_jpg = st.columns(2)
-                    with col_png:
-                        st.download_button(
-                            label="⬇️ Download PNG",
-                            data=image_to_bytes(rotated_img, fmt="PNG"),
-                            file_name="rotation_result.png",
-                            mime="image/png",
-                            key="dl_rot_png",
-                        )
-                    with col_jpg:
-                        st.download_button(
-                            label="⬇️ Download JPG",
-                            data=image_to_bytes(rotated_img, fmt="JPEG"),
-                            file_name="rotation_result.jpg",
-                            mime="image/jpeg",
-                            key="dl_rot_jpg",
-                        )
+                M = rotation_matrix(angle, canvas_w, canvas_h)
+                geo_step_controls(
+                    {"tool": "btn_rotation", "params": f"{angle}°", "M": M, "size": None},
+                    t["rot_result"], "rotation_result", "rot",
+                    original_img, preview_img,
+                )
 
             elif st.session_state["geo_transform"] == "shearing":
                 st.markdown(t["shear_settings"])
                 shear_x = st.slider(t["shear_x"], -1.0, 1.0, 0.0, key="shear_x")
                 shear_y = st.slider(t["shear_y"], -1.0, 1.0, 0.0, key="shear_y")
-                if st.button(f"{t['btn_apply']} ✅", key="btn_apply_shear", type="primary"):
-                    Sh = np.array([[1,      shear_x, 0],
-                                   [shear_y, 1,      0],
-                                   [0,       0,      1]], dtype=np.float32)
-                    sheared_img = apply_affine_transform(original_img, Sh)
-                    st.image(sheared_img, caption=t["shear_result"], use_column_width=True)
-                    col_png, col_jpg = st.columns(2)
-                    with col_png:
-                        st.download_button(
-                            label="⬇️ Download PNG",
-                            data=image_to_bytes(sheared_img, fmt="PNG"),
-                            file_name="shearing_result.png",
-                            mime="image/png",
-                            key="dl_shear_png",
-                        )
-                    with col_jpg:
-                        st.download_button(
-                            label="⬇️ Download JPG",
-                            data=image_to_bytes(sheared_img, fmt="JPEG"),
-                            file_name="shearing_result.jpg",
-                            mime="image/jpeg",
-                            key="dl_shear_jpg",
-                        )
+                Sh = shear_matrix(shear_x, shear_y)
+                geo_step_controls(
+                    {"tool": "btn_shearing", "params": f"x={shear_x:.2f}, y={shear_y:.2f}", "M": Sh, "size": None},
+                    t["shear_result"], "shearing_result", "shear",
+                    original_img, preview_img,
+                )
 
             elif st.session_state["geo_transform"] == "reflection":
                 st.markdown(t["refl_settings"])
@@ -1145,40 +790,50 @@ with tools_col_left:
                     [t["axis_x"], t["axis_y"], t["axis_diag"]],
                     key="refl_axis",
                 )
-                if st.button(f"{t['btn_apply']} ✅", key="btn_apply_refl", type="primary"):
-                    h, w = original_img.shape[:2]
-                    if axis == t["axis_x"]:
-                        Rf = np.array([[1, 0, 0],
-                                       [0, -1, h],
-                                       [0, 0, 1]], dtype=np.float32)
-                    elif axis == t["axis_y"]:
-                        Rf = np.array([[-1, 0, w],
-                                       [0, 1, 0],
-                                       [0, 0, 1]], dtype=np.float32)
-                    else:
-                        Rf = np.array([[0, 1, 0],
-                                       [1, 0, 0],
-                                       [0, 0, 1]], dtype=np.float32)
-                    reflected_img = apply_affine_transform(original_img, Rf)
-                    st.image(reflected_img, caption=t["refl_result"], use_column_width=True)
-                    col_png, col_jpg = st.columns(2)
-                    with col_png:
-                        st.download_button(
-                            label="⬇️ Download PNG",
-                            data=image_to_bytes(reflected_img, fmt="PNG"),
-                            file_name="reflection_result.png",
-                            mime="image/png",
-                            key="dl_refl_png",
-                        )
-                    with col_jpg:
-                        st.download_button(
-                            label="⬇️ Download JPG",
-                            data=image_to_bytes(reflected_img, fmt="JPEG"),
-                            file_name="reflection_result.jpg",
-                            mime="image/jpeg",
-                            key="dl_refl_jpg",
-                        )
+                if axis == t["axis_x"]:
+                    Rf = reflection_matrix("x", canvas_w, canvas_h)
+                elif axis == t["axis_y"]:
+                    Rf = reflection_matrix("y", canvas_w, canvas_h)
+                else:
+                    Rf = reflection_matrix("diag", canvas_w, canvas_h)
+                geo_step_controls(
+                    {"tool": "btn_reflection", "params": axis, "M": Rf, "size": None},
+                    t["refl_result"], "reflection_result", "refl",
+                    original_img, preview_img,
+                )
 
+    # Box 3: tumpukan perubahan (satu matriks, satu warp)
+    with st.container(border=True):
+        st.markdown(t["stack_title"])
+        st.write(t["stack_desc"])
+        stack = st.session_state["transform_stack"]
+        if original_img is None:
+            st.info(t["geo_info"])
+        elif not stack:
+            st.info(t["stack_empty"])
+        else:
+            st.markdown("\n".join(
+                f"{i}. {t[step['tool']]} ({step['params']})"
+                for i, step in enumerate(stack, start=1)
+            ))
+            stack_col1, stack_col2, stack_col3 = st.columns(3)
+            with stack_col1:
+                show_stack = st.button(t["btn_stack_show"], key="btn_stack_show", type="primary")
+            with stack_col2:
+                # Callback jalan sebelum panel dirender ulang, jadi daftar di
+                # atas langsung ikut berubah tanpa st.rerun() satu halaman.
+                st.button(t["btn_stack_undo"], key="btn_stack_undo", type="secondary",
+                          on_click=stack.pop)
+            with stack_col3:
+                st.button(t["btn_stack_clear"], key="btn_stack_clear", type="secondary",
+                          on_click=stack.clear)
+            if show_stack:
+                render_geo_result(stack, original_img, preview_img,
+                                  t["stack_result"], "stack_result", "dl_stack")
+
+
+@st.fragment
+def histogram_panel(original_img):
     # Histogram box
     with st.container(border=True):
         st.markdown(t["hist_title"])
@@ -1186,15 +841,72 @@ with tools_col_left:
         show_hist = st.button(t["btn_histogram"], key="btn_histogram", type="secondary")
         if show_hist:
             if original_img is not None:
-                hist_fig = compute_histogram(original_img)
-                st.pyplot(hist_fig)
-                plt.close(hist_fig)
+                hist = cached_histogram(current_image_key(original_img), original_img)
+                st.line_chart(
+                    {"R": hist[0], "G": hist[1], "B": hist[2]},
+                    x_label=t["hist_x_label"],
+                    y_label=t["hist_y_label"],
+                    color=["#e74c3c", "#27ae60", "#2980b9"],
+                )
             else:
                 st.warning(t["hist_warning"])
 
 # ==================== RIGHT: IMAGE FILTERING ====================
 
-with tools_col_right:
+@st.fragment
+def background_panel(original_img, preview_img):
+    st.markdown(t["bg_settings"])
+    method = st.selectbox(
+        t["bg_method"],
+        [
+            "HSV Color Thresholding",
+            "Blur Background",
+            "Remove Background Transparent",
+            "Solid Red Background",
+            "Solid Blue Background",
+            "Solid Yellow Background",
+            "Solid Green Background",
+            "Solid Brown Background",
+        ],
+        key="bg_method",
+    )
+    bg_mode = st.selectbox(t["bg_mode"], ["auto", *MASK_MODES], key="bg_mode",
+                           help=t["bg_mode_help"])
+    show_profiler = st.toggle(t["bg_profiler"], key="bg_profiler")
+    if st.button(f"{t['btn_apply']} ✅", key="btn_apply_bg", type="primary"):
+        submit_job("bg_job", background_job, get_mask_cache(), current_image_key(original_img),
+                   original_img, method, bg_mode, StageProfiler() if show_profiler else None)
+    render_job(
+        "bg_job",
+        lambda mask: st.image(mask, caption=t["bg_mask_preview"], use_column_width=True),
+        show_background_result,
+        "Error saat memproses background: {error}",
+    )
+
+    # Bandingkan semua mode sekaligus (di gambar pratinjau) untuk
+    # memilih mode yang cocok sebelum Apply.
+    if st.button(t["btn_bg_compare"], key="btn_bg_compare", type="secondary"):
+        t0 = time.perf_counter()
+        results = compare_background_modes(preview_img, feather_radius=3, refine_hair=True)
+        wall = time.perf_counter() - t0
+        if preview_img is original_img:
+            # Mask per band identik dengan mask tanpa tile, jadi hasil
+            # perbandingan boleh mengisi cache yang dipakai Apply.
+            image_key = current_image_key(original_img)
+            for r in results:
+                get_mask_cache().put((image_key, r["mode"], 3, True), r["mask"])
+        st.caption(t["bg_compare_stats"].format(
+            wall=wall * 1000, total=sum(r["seconds"] for r in results) * 1000))
+        grid = st.columns(4)
+        for i, r in enumerate(results):
+            with grid[i % 4]:
+                st.image((r["mask"] * 255).astype(np.uint8),
+                         caption=f"{r['mode']} · {r['seconds'] * 1000:.0f} ms",
+                         use_column_width=True)
+
+
+@st.fragment
+def filter_panel(original_img, preview_img):
     with st.container(border=True):
         st.markdown(t["filter_title"])
         st.write(t["filter_desc"])
@@ -1238,176 +950,31 @@ with tools_col_right:
                     key="blur_kernel_size",
                 )
                 if st.button(f"{t['btn_apply']} ✅", key="btn_apply_blur", type="primary"):
-                    gray = rgb_to_gray(original_img)
-                    k = kernel_size
-                    blur_kernel = np.ones((k, k), dtype=np.float32) / (k * k)
-                    blurred_gray = manual_convolution_gray(gray, blur_kernel)
-                    blurred_rgb = cv2.cvtColor(blurred_gray, cv2.COLOR_GRAY2RGB)
+                    blurred_rgb = blur_image(original_img, kernel_size)
                     st.image(blurred_rgb, caption=t["blur_result"], use_column_width=True)
-                    col_png, col_jpg = st.columns(2)
-                    with col_png:
-                        st.download_button(
-                            label="⬇️ Download PNG",
-                            data=image_to_bytes(blurred_rgb, fmt="PNG"),
-                            file_name="blur_result.png",
-                            mime="image/png",
-                            key="dl_blur_png",
-                        )
-                    with col_jpg:
-                        st.download_button(
-                            label="⬇️ Download JPG",
-                            data=image_to_bytes(blurred_rgb, fmt="JPEG"),
-                            file_name="blur_result.jpg",
-                            mime="image/jpeg",
-                            key="dl_blur_jpg",
-                        )
+                    render_download_buttons(lambda: blurred_rgb, "blur_result", "dl_blur")
 
             # SHARPEN
             elif st.session_state["image_filter"] == "sharpen":
                 st.markdown(t["sharpen_settings"])
                 st.write(t["sharpen_desc"])
                 if st.button(f"{t['btn_apply']} ✅", key="btn_apply_sharpen", type="primary"):
-                    gray = rgb_to_gray(original_img)
-                    sharpen_kernel = np.array(
-                        [[0, -1, 0],
-                         [-1, 5, -1],
-                         [0, -1, 0]],
-                        dtype=np.float32,
-                    )
-                    sharpened_gray = manual_convolution_gray(gray, sharpen_kernel)
-                    sharpened_rgb = cv2.cvtColor(sharpened_gray, cv2.COLOR_GRAY2RGB)
+                    sharpened_rgb = sharpen_image(original_img)
                     st.image(sharpened_rgb, caption=t["sharpen_result"], use_column_width=True)
-                    col_png, col_jpg = st.columns(2)
-                    with col_png:
-                        st.download_button(
-                            label="⬇️ Download PNG",
-                            data=image_to_bytes(sharpened_rgb, fmt="PNG"),
-                            file_name="sharpen_result.png",
-                            mime="image/png",
-                            key="dl_sharp_png",
-                        )
-                    with col_jpg:
-                        st.download_button(
-                            label="⬇️ Download JPG",
-                            data=image_to_bytes(sharpened_rgb, fmt="JPEG"),
-                            file_name="sharpen_result.jpg",
-                            mime="image/jpeg",
-                            key="dl_sharp_jpg",
-                        )
+                    render_download_buttons(lambda: sharpened_rgb, "sharpen_result", "dl_sharp")
 
             # BACKGROUND
             elif st.session_state["image_filter"] == "background":
-                st.markdown(t["bg_settings"])
-                method = st.selectbox(
-                    t["bg_method"],
-                    [
-                        "HSV Color Thresholding",
-                        "Blur Background",
-                        "Remove Background Transparent",
-                        "Solid Red Background",
-                        "Solid Blue Background",
-                        "Solid Yellow Background",
-                        "Solid Green Background",
-                        "Solid Brown Background",
-                    ],
-                    key="bg_method",
-                )
-                if st.button(f"{t['btn_apply']} ✅", key="btn_apply_bg", type="primary"):
-                    bg_removed_img = None
-                    output_for_download = None
-                    try:
-                        if method == "HSV Color Thresholding":
-                            bg_removed_img = simple_background_removal_hsv(original_img)
-                            output_for_download = bg_removed_img
-                        else:
-                            if method == "Blur Background":
-                                output_mode = "blurred"
-                                solid_color = None
-                            elif method == "Remove Background Transparent":
-                                output_mode = "transparent"
-                                solid_color = None
-                            elif method == "Solid Red Background":
-                                output_mode = "solid_color"
-                                solid_color = (255, 0, 0)
-                            elif method == "Solid Blue Background":
-                                output_mode = "solid_color"
-                                solid_color = (0, 0, 255)
-                            elif method == "Solid Yellow Background":
-                                output_mode = "solid_color"
-                                solid_color = (255, 255, 0)
-                            elif method == "Solid Green Background":
-                                output_mode = "solid_color"
-                                solid_color = (0, 255, 0)
-                            elif method == "Solid Brown Background":
-                                output_mode = "solid_color"
-                                solid_color = (150, 75, 0)
-                            else:
-                                output_mode = "transparent"
-                                solid_color = None
-
-                            result = remove_background_advanced(
-                                image=original_img,
-                                mode="auto",
-                                output_mode=output_mode,
-                                solid_color=solid_color,
-                                feather_radius=3,
-                                refine_hair=True,
-                            )
-                            bg_removed_img = result
-                            if result.ndim == 3 and result.shape[2] == 4:
-                                output_for_download = result[:, :, :3]
-                            else:
-                                output_for_download = result
-                    except Exception as e:
-                        st.error(f"Error saat memproses background: {e}")
-                        bg_removed_img = None
-                        output_for_download = None
-
-                    if bg_removed_img is not None:
-                        st.image(bg_removed_img, caption=t["bg_result"], use_column_width=True)
-                        col_png, col_jpg = st.columns(2)
-                        with col_png:
-                            st.download_button(
-                                label="⬇️ Download PNG",
-                                data=image_to_bytes(output_for_download, fmt="PNG"),
-                                file_name="background_result.png",
-                                mime="image/png",
-                                key="dl_bg_png",
-                            )
-                        with col_jpg:
-                            st.download_button(
-                                label="⬇️ Download JPG",
-                                data=image_to_bytes(output_for_download, fmt="JPEG"),
-                                file_name="background_result.jpg",
-                                mime="image/jpeg",
-                                key="dl_bg_jpg",
-                            )
+                background_panel(original_img, preview_img)
 
             # GRAYSCALE
             elif st.session_state["image_filter"] == "grayscale":
                 st.markdown(t["gray_settings"])
                 st.write(t["gray_desc"])
                 if st.button(f"{t['btn_apply']} ✅", key="btn_apply_gray", type="primary"):
-                    gray_img = rgb_to_gray(original_img)
-                    gray_rgb = cv2.cvtColor(gray_img, cv2.COLOR_GRAY2RGB)
+                    gray_rgb = grayscale_image(original_img)
                     st.image(gray_rgb, caption=t["gray_result"], use_column_width=True)
-                    col_png, col_jpg = st.columns(2)
-                    with col_png:
-                        st.download_button(
-                            label="⬇️ Download PNG",
-                            data=image_to_bytes(gray_rgb, fmt="PNG"),
-                            file_name="grayscale_result.png",
-                            mime="image/png",
-                            key="dl_gray_png",
-                        )
-                    with col_jpg:
-                        st.download_button(
-                            label="⬇️ Download JPG",
-                            data=image_to_bytes(gray_rgb, fmt="JPEG"),
-                            file_name="grayscale_result.jpg",
-                            mime="image/jpeg",
-                            key="dl_gray_jpg",
-                        )
+                    render_download_buttons(lambda: gray_rgb, "grayscale_result", "dl_gray")
 
             # EDGE
             elif st.session_state["image_filter"] == "edge":
@@ -1418,36 +985,9 @@ with tools_col_right:
                     key="edge_method",
                 )
                 if st.button(f"{t['btn_apply']} ✅", key="btn_apply_edge", type="primary"):
-                    img_bgr = to_opencv(original_img)
-                    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-                    if method_edge == "Sobel":
-                        grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-                        grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-                        mag = cv2.magnitude(grad_x, grad_y)
-                        mag = np.clip(mag, 0, 255).astype(np.uint8)
-                        edge_bgr = cv2.cvtColor(mag, cv2.COLOR_GRAY2BGR)
-                    else:
-                        edges = cv2.Canny(gray, 100, 200)
-                        edge_bgr = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
-                    edge_img = to_streamlit(edge_bgr)
+                    edge_img = edge_image(original_img, method_edge)
                     st.image(edge_img, caption=f"{t['edge_result']} ({method_edge})", use_column_width=True)
-                    col_png, col_jpg = st.columns(2)
-                    with col_png:
-                        st.download_button(
-                            label="⬇️ Download PNG",
-                            data=image_to_bytes(edge_img, fmt="PNG"),
-                            file_name="edge_result.png",
-                            mime="image/png",
-                            key="dl_edge_png",
-                        )
-                    with col_jpg:
-                        st.download_button(
-                            label="⬇️ Download JPG",
-                            data=image_to_bytes(edge_img, fmt="JPEG"),
-                            file_name="edge_result.jpg",
-                            mime="image/jpeg",
-                            key="dl_edge_jpg",
-                        )
+                    render_download_buttons(lambda: edge_img, "edge_result", "dl_edge")
 
             # BRIGHTNESS / CONTRAST
             elif st.session_state["image_filter"] == "brightness":
@@ -1455,25 +995,143 @@ with tools_col_right:
                 brightness = st.slider(t["bright_brightness"], -100, 100, 0, key="brightness_value")
                 contrast = st.slider(t["bright_contrast"], -100, 100, 0, key="contrast_value")
                 if st.button(f"{t['btn_apply']} ✅", key="btn_apply_bright", type="primary"):
-                    adjusted_img = adjust_brightness_contrast(original_img, brightness, contrast)
+                    adjusted_img, export_img = render_preview(
+                        lambda img, S: adjust_brightness_contrast(img, brightness, contrast),
+                        original_img, preview_img,
+                    )
                     st.image(adjusted_img, caption=t["bright_result"], use_column_width=True)
-                    col_png, col_jpg = st.columns(2)
-                    with col_png:
-                        st.download_button(
-                            label="⬇️ Download PNG",
-                            data=image_to_bytes(adjusted_img, fmt="PNG"),
-                            file_name="brightness_contrast_result.png",
-                            mime="image/png",
-                            key="dl_bright_png",
-                        )
-                    with col_jpg:
-                        st.download_button(
-                            label="⬇️ Download JPG",
-                            data=image_to_bytes(adjusted_img, fmt="JPEG"),
-                            file_name="brightness_contrast_result.jpg",
-                            mime="image/jpeg",
-                            key="dl_bright_jpg",
-                        )
+                    render_download_buttons(export_img, "brightness_contrast_result", "dl_bright")
+
+
+with tools_col_left:
+    geometric_panel(original_img, preview_img)
+    histogram_panel(original_img)
+
+with tools_col_right:
+    filter_panel(original_img, preview_img)
+
+# ===================== VIDEO MODE =====================
+
+# Klip contoh yang ikut di repo.
+SAMPLE_VIDEOS = ["l", "p", os.path.join(STATIC_DIR, "background.mp4")]
+
+
+def video_op_controls(tool):
+    """Widgets for one video tool; returns ops in the batch.py (name, kwargs) form."""
+    if tool == "btn_translation":
+        dx = st.slider(t["trans_dx"], -200, 200, 0, key="vid_dx")
+        dy = st.slider(t["trans_dy"], -200, 200, 0, key="vid_dy")
+        return [("translate", {"dx": dx, "dy": dy})]
+    if tool == "btn_scaling":
+        sx = st.slider(t["scale_x"], 0.1, 3.0, 1.0, key="vid_sx")
+        sy = st.slider(t["scale_y"], 0.1, 3.0, 1.0, key="vid_sy")
+        return [("scale", {"sx": sx, "sy": sy})]
+    if tool == "btn_rotation":
+        angle = st.slider(t["rot_angle"], -180, 180, 0, key="vid_angle")
+        return [("rotate", {"angle": angle})]
+    if tool == "btn_shearing":
+        shear_x = st.slider(t["shear_x"], -1.0, 1.0, 0.0, key="vid_shear_x")
+        shear_y = st.slider(t["shear_y"], -1.0, 1.0, 0.0, key="vid_shear_y")
+        return [("shear", {"x": shear_x, "y": shear_y})]
+    if tool == "btn_reflection":
+        axes = {t["axis_x"]: "x", t["axis_y"]: "y", t["axis_diag"]: "diag"}
+        axis = st.selectbox(t["refl_axis"], list(axes), key="vid_axis")
+        return [("reflect", {"axis": axes[axis]})]
+    if tool == "btn_blur":
+        k = st.selectbox(t["blur_kernel"], [3, 5, 7], key="vid_blur_k")
+        return [("blur", {"k": k})]
+    if tool == "btn_edge":
+        method_edge = st.selectbox(t["edge_method"], ["Sobel", "Canny"], key="vid_edge")
+        return [("edge", {"method": method_edge})]
+    if tool == "btn_brightness":
+        brightness = st.slider(t["bright_brightness"], -100, 100, 0, key="vid_brightness")
+        contrast = st.slider(t["bright_contrast"], -100, 100, 0, key="vid_contrast")
+        return [("brightness", {"brightness": brightness, "contrast": contrast})]
+    if tool == "btn_background":
+        return [("background", {"output": "blurred"})]
+    return [({"btn_sharpen": "sharpen", "btn_grayscale": "grayscale"}[tool], {})]
+
+
+def remove_files(paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def video_job(job, in_path, out_path, ops, ext):
+    """Worker side of the video run: (stats, encoded bytes, ext)."""
+    latest = [None]
+
+    def frame_fn(frame):
+        latest[0] = run_ops(frame, ops)
+        return latest[0]
+
+    def report(done, total):
+        # Frame terakhir jadi hasil sementara; report juga checkpoint batal.
+        job.report(done, total, t["video_progress"].format(done=done, total=total or "?"),
+                   partial=latest[0])
+
+    stats = process_video(in_path, out_path, frame_fn, progress=report)
+    with open(out_path, "rb") as f:
+        return stats, f.read(), ext
+
+
+def show_video_result(result):
+    stats, video_bytes, ext = result
+    st.success(t["video_stats"].format(**stats))
+    mime = "video/webm" if ext == ".webm" else "video/mp4"
+    st.video(video_bytes, format=mime)
+    st.download_button(
+        label="⬇️ Download Video",
+        data=video_bytes,
+        file_name=f"video_result{ext}",
+        mime=mime,
+        key="dl_video",
+        on_click="ignore",
+    )
+
+
+with st.container(border=True):
+    st.markdown(t["video_title"])
+    st.write(t["video_desc"])
+    video_file = st.file_uploader(t["video_upload"], type=["mp4", "mov", "webm", "m4v"], key="video_uploader")
+    sample_video = st.selectbox(t["video_sample"], SAMPLE_VIDEOS, key="video_sample",
+                                disabled=video_file is not None)
+    video_tool = st.selectbox(
+        t["video_tool"],
+        ["btn_translation", "btn_scaling", "btn_rotation", "btn_shearing", "btn_reflection",
+         "btn_blur", "btn_sharpen", "btn_grayscale", "btn_edge", "btn_brightness", "btn_background"],
+        format_func=lambda key: t[key],
+        key="video_tool",
+    )
+    video_ops = video_op_controls(video_tool)
+    video_ext = st.radio(t["video_format"], [".webm", ".mp4"], horizontal=True, key="video_ext")
+
+    if st.button(t["btn_video_run"], key="btn_video_run", type="primary"):
+        tmp_paths = []
+        try:
+            if video_file is not None:
+                suffix = os.path.splitext(video_file.name)[1] or ".mp4"
+                with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+                    f.write(video_file.getvalue())
+                in_path = f.name
+                tmp_paths.append(in_path)
+            else:
+                in_path = sample_video
+            with tempfile.NamedTemporaryFile(suffix=video_ext, delete=False) as f:
+                out_path = f.name
+            tmp_paths.append(out_path)
+        except Exception as e:
+            st.error(t["video_error"].format(error=e))
+            remove_files(tmp_paths)
+        else:
+            # File sementara dihapus oleh runner setelah job selesai, gagal
+            # atau dibatalkan (juga bila batal sebelum sempat jalan).
+            submit_job("video_job", video_job, in_path, out_path, video_ops, video_ext,
+                       cleanup=functools.partial(remove_files, tmp_paths))
+    render_job("video_job",
+               lambda frame: st.image(frame, caption=t["video_latest_frame"], width=320),
+               show_video_result, t["video_error"])
 
 # ===================== TEAM MEMBERS =====================
 
@@ -1545,3 +1203,4 @@ for i in range(1, 4):
                 unsafe_allow_html=True,
             )
 
+render_cache_stats()
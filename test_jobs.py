@@ -0,0 +1,34 @@
+"""Tests for jobs.JobRunner: status, cancellation and cleanup."""
+import threading
+
+from jobs import CANCELLED, DONE, FAILED, JobRunner
+
+
+def test_cleanup_runs_for_job_cancelled_while_queued():
+    runner = JobRunner(max_workers=1)
+    release = threading.Event()
+    blocker = runner.submit(lambda job: release.wait(5))
+    cleaned = []
+    queued = runner.submit(lambda job: "never", cleanup=lambda: cleaned.append(True))
+    queued.cancel()
+    release.set()
+    assert queued.wait(5) and blocker.wait(5)
+    assert queued.status == CANCELLED and queued.started_at is None
+    assert cleaned == [True]
+    runner.shutdown()
+
+
+def test_cleanup_runs_after_success_and_failure():
+    runner = JobRunner(max_workers=1)
+    cleaned = []
+
+    def fail(job):
+        raise RuntimeError("boom")
+
+    ok = runner.submit(lambda job: 42, cleanup=lambda: cleaned.append("ok"))
+    bad = runner.submit(fail, cleanup=lambda: cleaned.append("bad"))
+    assert ok.wait(5) and bad.wait(5)
+    assert (ok.status, ok.result) == (DONE, 42)
+    assert bad.status == FAILED and isinstance(bad.error, RuntimeError)
+    assert cleaned == ["ok", "bad"]
+    runner.shutdown()
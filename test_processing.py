@@ -0,0 +1,311 @@
+"""Tests for processing helpers (convolution, encode memo, preview proxy, tiling).
+
+Jalankan dari root repo: python -m pytest -q
+"""
+import os
+import zlib
+from io import BytesIO
+
+import numpy as np
+import pytest
+import cv2
+from PIL import Image
+
+from processing import (
+    FFT_KERNEL_AREA,
+    MASK_MODES,
+    PREVIEW_MAX_EDGE,
+    SHARPEN_KERNEL,
+    ImageFeatures,
+    _banded_canny,
+    _blend_uint8,
+    _global_stats,
+    _raw_mask,
+    _remove_small_holes,
+    _tile_halo,
+    _tile_rows,
+    apply_matrix_transform,
+    background_mask,
+    compose_transforms,
+    grid_scale_matrix,
+    image_to_bytes,
+    make_preview_proxy,
+    manual_convolution_gray,
+    reflection_matrix,
+    rescale_size,
+    rescale_transform,
+    rotation_matrix,
+    scaling_matrix,
+    shear_matrix,
+    translation_matrix,
+)
+
+
+def reference_convolution_gray(img_gray, kernel):
+    """Loop per-piksel versi lama (reflect padding, korelasi)."""
+    k_h, k_w = kernel.shape
+    pad_h = k_h // 2
+    pad_w = k_w // 2
+    padded = np.pad(img_gray, ((pad_h, pad_h), (pad_w, pad_w)), mode="reflect")
+    h, w = img_gray.shape
+    output = np.zeros_like(img_gray, dtype=np.float32)
+    for i in range(h):
+        for j in range(w):
+            region = padded[i:i + k_h, j:j + k_w]
+            output[i, j] = np.sum(region * kernel)
+    return np.clip(output, 0, 255).astype(np.uint8)
+
+
+def _box(k_h, k_w):
+    return np.ones((k_h, k_w), dtype=np.float32) / (k_h * k_w)
+
+
+def _random_kernel(rng, k_h, k_w):
+    # Tidak separable, dengan bobot negatif supaya clip ke 0/255 ikut teruji.
+    kernel = rng.normal(0.0, 1.0, (k_h, k_w)).astype(np.float32)
+    return kernel / max(abs(kernel.sum()), 1.0)
+
+
+KERNELS = {
+    "box3": _box(3, 3),
+    "box5": _box(5, 5),
+    "box2": _box(2, 2),
+    "box4": _box(4, 4),
+    "box2x5": _box(2, 5),
+    "sharpen": SHARPEN_KERNEL,
+    "random3": _random_kernel(np.random.default_rng(1), 3, 3),
+    "random4": _random_kernel(np.random.default_rng(2), 4, 4),
+    "random3x6": _random_kernel(np.random.default_rng(3), 3, 6),
+    "fft_box15": _box(15, 15),
+    "fft_random16": _random_kernel(np.random.default_rng(4), 16, 16),
+}
+
+
+@pytest.mark.parametrize("name", sorted(KERNELS))
+@pytest.mark.parametrize("shape", [(23, 31), (40, 17), (16, 16)])
+def test_matches_reference_loop(name, shape):
+    kernel = KERNELS[name]
+    # Reflect padding butuh pad < sisi gambar.
+    assert kernel.shape[0] // 2 < shape[0] and kernel.shape[1] // 2 < shape[1]
+    rng = np.random.default_rng([zlib.crc32(name.encode()), *shape])
+    img = rng.integers(0, 256, shape, dtype=np.uint8)
+
+    got = manual_convolution_gray(img, kernel)
+    want = reference_convolution_gray(img, kernel)
+
+    assert got.shape == want.shape and got.dtype == np.uint8
+    # Urutan penjumlahan float berbeda: selisih maksimal 1 level.
+    diff = np.abs(got.astype(np.int16) - want.astype(np.int16))
+    assert diff.max() <= 1
+    # Border (baris/kolom yang memakai padding) harus ikut cocok.
+    pad_h, pad_w = kernel.shape[0] // 2, kernel.shape[1] // 2
+    border = np.ones(shape, dtype=bool)
+    border[pad_h:shape[0] - pad_h, pad_w:shape[1] - pad_w] = False
+    assert diff[border].max(initial=0) <= 1
+
+
+def test_fft_path_is_exercised():
+    assert KERNELS["fft_box15"].size >= FFT_KERNEL_AREA
+    assert KERNELS["random4"].size < FFT_KERNEL_AREA
+
+
+@pytest.mark.parametrize("value", [0, 128, 255])
+def test_constant_image_is_preserved_by_box(value):
+    img = np.full((21, 19), value, dtype=np.uint8)
+    for name in ("box3", "box4", "fft_box15"):
+        assert np.array_equal(manual_convolution_gray(img, KERNELS[name]), img)
+
+
+def test_image_to_bytes_encodes_current_contents():
+    img = np.zeros((8, 8, 3), dtype=np.uint8)
+    first = image_to_bytes(img, fmt="PNG")
+    img[2:6, 2:6] = 255
+    second = image_to_bytes(img, fmt="PNG")
+    assert second != first
+    with Image.open(BytesIO(second)) as im:
+        assert np.array_equal(np.array(im), img)
+
+
+def _load(path):
+    with Image.open(os.path.join(os.path.dirname(__file__), path)) as im:
+        return np.array(im.convert("RGB"))
+
+
+@pytest.fixture(scope="module")
+def large_photo():
+    img = _load("images/gitsi.jpeg")
+    assert max(img.shape[:2]) > PREVIEW_MAX_EDGE  # proxy benar-benar diperkecil
+    return img
+
+
+PROXY_STEPS = {
+    "rotate": lambda w, h: [{"M": rotation_matrix(30, w, h), "size": None}],
+    "scale_translate": lambda w, h: [{"M": scaling_matrix(0.8, 1.2), "size": None},
+                                     {"M": translation_matrix(40, -25), "size": None}],
+    "shear": lambda w, h: [{"M": shear_matrix(0.2, 0.1), "size": None}],
+    "reflect": lambda w, h: [{"M": reflection_matrix("y", w, h), "size": None}],
+    "resize_canvas": lambda w, h: [{"M": scaling_matrix(0.5, 0.5), "size": (w // 2, h // 2)}],
+}
+
+
+@pytest.mark.parametrize("name", sorted(PROXY_STEPS))
+def test_preview_proxy_matches_full_resolution(large_photo, name):
+    img = large_photo
+    h, w = img.shape[:2]
+    M, size = compose_transforms(PROXY_STEPS[name](w, h), (w, h))
+    proxy = make_preview_proxy(img)
+    S = grid_scale_matrix(img.shape, proxy.shape)
+
+    preview = apply_matrix_transform(proxy, rescale_transform(M, S),
+                                     output_size=rescale_size(size, S))
+    full = apply_matrix_transform(img, M, output_size=size)
+    full_small = cv2.resize(full, preview.shape[1::-1], interpolation=cv2.INTER_AREA)
+
+    # Selisih tersisa hanya dari interpolasi bilinear di tepi kontras
+    # tinggi (terukur: rata-rata 0.13-0.19, p99 2-3).
+    diff = np.abs(full_small.astype(np.int16) - preview.astype(np.int16))
+    assert diff.mean() < 0.5
+    assert np.percentile(diff, 99) <= 3
+
+
+@pytest.mark.parametrize("path, budget_mb", [("images/chinta.jpeg", 16),
+                                              ("images/bella.jpeg", 8)])
+@pytest.mark.parametrize("mode", MASK_MODES)
+def test_tiled_mask_matches_untiled_on_photo(path, budget_mb, mode):
+    img = _load(path)
+    h, w = img.shape[:2]
+    assert _tile_rows(h, w, _tile_halo(3), budget_mb) < h  # benar-benar di-tile
+    untiled = background_mask(img, mode=mode)
+    tiled = background_mask(img, mode=mode, memory_budget_mb=budget_mb)
+    assert np.array_equal(tiled, untiled)
+
+
+@pytest.mark.parametrize("solid", [False, True])
+def test_blend_uint8_matches_float_blend(solid):
+    rng = np.random.default_rng(7 + solid)
+    fg = rng.integers(0, 256, (64, 48, 3), dtype=np.uint8)
+    bg = (rng.integers(0, 256, 3, dtype=np.uint8) if solid
+          else rng.integers(0, 256, fg.shape, dtype=np.uint8))
+    alpha8 = rng.integers(0, 256, fg.shape[:2], dtype=np.uint8)
+    alpha8[:4] = 0
+    alpha8[-4:] = 255
+
+    got = _blend_uint8(fg, bg, alpha8)
+    a = alpha8[:, :, None].astype(np.float64) / 255.0
+    want = np.rint(fg * a + np.broadcast_to(bg, fg.shape) * (1 - a))
+    assert got.dtype == np.uint8
+    assert np.abs(got - want).max() <= 1
+    # Alpha 0 / 255 harus persis background / foreground.
+    assert np.array_equal(got[:4], np.broadcast_to(bg, fg.shape)[:4])
+    assert np.array_equal(got[-4:], fg[-4:])
+
+
+@pytest.mark.parametrize("mode, hair_band_width, min_island_area",
+                         [("gradient", 0, 0), ("textured", 16, 50), ("solid", 0, 200)])
+def test_tiled_mask_matches_untiled_options(mode, hair_band_width, min_island_area):
+    img = _load("images/bella.jpeg")
+    kwargs = dict(mode=mode, hair_band_width=hair_band_width,
+                  min_island_area=min_island_area)
+    assert np.array_equal(background_mask(img, memory_budget_mb=4, **kwargs),
+                          background_mask(img, **kwargs))
+
+
+@pytest.mark.parametrize("band_rows", [1, 3, 40])
+@pytest.mark.parametrize("plane, low, high", [("gray", 50, 150), ("gray", 80, 200),
+                                              ("L_norm", 50, 150)])
+def test_banded_canny_matches_cv2(band_rows, plane, low, high):
+    img = _load("images/chinta.jpeg")
+    h = img.shape[0]
+    want = cv2.Canny(getattr(ImageFeatures(img), plane), low, high)
+    feats = ImageFeatures(img)
+    feats.L_range = (int(feats.L.min()), int(feats.L.max()))
+    bands = [(y, min(h, y + band_rows)) for y in range(0, h, band_rows)]
+    assert np.array_equal(_banded_canny(feats, bands, low, high, plane=plane), want)
+
+
+@pytest.mark.parametrize("mode", ["gradient", "auto"])
+def test_memory_budget_bounds_peak_rss(large_photo, mode):
+    bench = pytest.importorskip("bench")
+    img = large_photo
+    budget_mb = 32
+    tiled = bench.peak_rss_mb(lambda: background_mask(img, mode=mode,
+                                                      memory_budget_mb=budget_mb))
+    if tiled is None:
+        pytest.skip("VmHWM tidak tersedia")
+    untiled = bench.peak_rss_mb(lambda: background_mask(img, mode=mode))
+    # Di luar budget: hasil float32 + paling banyak 3 plane uint8 (lihat
+    # TILE_BYTES_PER_PIXEL); terukur ~115 MB vs ~245 MB tanpa tile.
+    full_mb = img.shape[0] * img.shape[1] * (4 + 3) / 2 ** 20
+    assert tiled <= 1.25 * (full_mb + budget_mb)
+    assert tiled < 0.6 * untiled
+
+
+def reference_distance_mask(img, mode):
+    """Raw mask solid/studio/minimalist versi lama (norm float32 + np.percentile)."""
+    feats = ImageFeatures(img)
+    border = feats.border_pixels("hsv", all_sides=mode != "minimalist")
+    bg_color = np.median(border, axis=0).astype(np.float32)
+    hsv_flat = feats.hsv.reshape(-1, 3).astype(np.float32)
+    dist_img = np.linalg.norm(hsv_flat - bg_color[None, :], axis=1).reshape(img.shape[:2])
+    thresh = np.percentile(dist_img, 70 if mode == "minimalist" else 60)
+    return (dist_img > thresh).astype(np.uint8)
+
+
+@pytest.mark.parametrize("path", ["images/chinta.jpeg", "images/bella.jpeg"])
+@pytest.mark.parametrize("mode", ["solid", "studio", "minimalist"])
+def test_distance_mask_matches_float_percentile(path, mode):
+    img = _load(path)
+    feats = ImageFeatures(img)
+    stats = _global_stats(mode, feats, [(0, img.shape[0])])
+    assert np.array_equal(_raw_mask(mode, feats, stats),
+                          reference_distance_mask(img, mode))
+
+
+def reference_remove_small_holes(mask, min_area=100, min_island_area=0):
+    """Flood fill per komponen (8-connected), luas = jumlah piksel."""
+    out = mask.astype(np.uint8).copy()
+    for value, limit in ((0, min_area), (1, min_island_area)):
+        seen = np.zeros((out.shape[0] + 2, out.shape[1] + 2), np.uint8)
+        src = (out == value).astype(np.uint8)
+        for y, x in zip(*np.nonzero(src)):
+            if seen[y + 1, x + 1]:
+                continue
+            comp = np.zeros_like(seen)
+            area, *_ = cv2.floodFill(src.copy(), comp, (int(x), int(y)), 2,
+                                     flags=8 | cv2.FLOODFILL_MASK_ONLY | (1 << 8))
+            seen |= comp
+            if area < limit:
+                out[comp[1:-1, 1:-1] > 0] = 1 - value
+    return out
+
+
+def _random_mask(rng):
+    h, w = rng.integers(8, 120, 2)
+    mask = (rng.random((h, w)) < rng.uniform(0.3, 0.95)).astype(np.uint8)
+    return mask, h, w
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_remove_small_holes_matches_flood_fill(seed):
+    rng = np.random.default_rng(seed)
+    mask, h, w = _random_mask(rng)
+    if seed % 2:
+        # Lubang lebih besar dan retakan 1 piksel, bukan hanya bintik.
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((3, 3), np.uint8))
+        mask[:, w // 2] = 0
+    min_area = int(rng.integers(1, 200))
+    min_island_area = int(rng.integers(0, 50)) if seed % 3 == 0 else 0
+    got = _remove_small_holes(mask, min_area=min_area, min_island_area=min_island_area)
+    assert np.array_equal(got, reference_remove_small_holes(mask, min_area, min_island_area))
+
+
+def test_remove_small_holes_fills_speckle():
+    # Ribuan lubang 1 piksel (kasus lambat loop per kontur) plus satu besar.
+    rng = np.random.default_rng(0)
+    mask = np.ones((300, 400), np.uint8)
+    mask[::3, ::3] = rng.random((100, 134)) < 0.5
+    mask[101:140, 101:160] = 0
+    got = _remove_small_holes(mask, min_area=100)
+    assert got[101:140, 101:160].max() == 0
+    got[101:140, 101:160] = 1
+    assert got.all()
@@ -0,0 +1,403 @@
+"""UI strings for the Streamlit app, keyed by language code (id, en, zh)."""
+
+translations = {
+    "id": {
+        "title": "🔢 Operasi Matriks untuk Editing Visual",
+        "subtitle": "🎯 Eksplorasi langsung perubahan matriks 2D dan penyesuaian gambar",
+        "app_goal": "🎯 **Tujuan aplikasi:** Penjelasan praktis yang menunjukkan fungsi perubahan matriks 2D dan penyaringan gambar pada foto menggunakan ide aljabar linier.",
+        "features": "- ↩️ Perubahan: memindah, mengukur, memutar, memiringkan, membalik\n- 🧽 Penyesuaian: menghaluskan, memfokuskan, menemukan garis, menghilangkan latar, mengubah ke hitam putih, menyesuaikan cahaya & bayangan",
+        "concept_1_title": "### 🌀 Perubahan Matriks Dua Dimensi",
+        "concept_1_text1": "Gambar datar adalah sekumpulan titik \\((x, y)\\) yang bisa diubah lewat tindakan lurus seperti memindah, mengukur, memutar, memiringkan, dan membalik, ditampilkan oleh matriks 2×2 atau 3×3 (titik seragam).",
+        "concept_1_text2": "Menggunakan matriks ini pada posisi titik menggesernya: mengukur mengubah skala, memutar berputar di tengah, memiringkan membuat miring, dan membalik membalik pandangan di garis tertentu.",
+        "concept_2_title": "### 📊 Penyesuaian Gambar (Pencampuran)",
+        "concept_2_text1": "Penyesuaian menggunakan kisi kecil (matriks pencampuran) yang meluncur di gambar; di setiap tempat, ia membuat nilai titik baru dari total kali kisi dengan titik sekitar.",
+        "concept_2_text2": "Kisi dengan angka baik seragam membuat pandangan lebih halus atau kabur, sementara kisi dengan tengah baik kuat dan sekitar buruk membuat lebih tajam dan menonjolkan tepi.",
+        "concept_3_title": "### 🎲 Mengapa Praktis?",
+        "concept_3_text1": "Aplikasi ini praktis karena pengguna bisa menyetel pengaturan (seperti derajat putar, faktor ukur, kekuatan miring, jenis kisi untuk halus atau fokus, dll.) dan langsung lihat perubahan di gambar. ✨",
+        "concept_3_text2": "Ini menghubungkan struktur kisi atau matriks dengan hasil visual, membuat gagasan seperti perubahan lurus dan pencampuran lebih gampang dipahami secara alami.",
+        "quick_concepts": "#### 📝 Ide Utama",
+        "quick_concepts_text": "- ↩️ Perubahan 2D: geser posisi titik (memindah, mengukur, memutar, memiringkan, membalik).\n- 📊 Pencampuran: kisi kecil meluncur di gambar untuk membuat nilai titik baru.",
+        "upload_title": "### 📷 Tambah Foto",
+        "upload_label": "Tambah foto di sini (PNG/JPG/JPEG) 📂",
+        "upload_success": "✅ Foto ditambah dengan baik!",
+        "upload_preview": "📷 Tampilan Foto Awal",
+        "preview_mode": "⚡ Mode pratinjau cepat",
+        "preview_help": "Alat bekerja pada salinan kecil (sisi terpanjang {edge} px); unduhan tetap resolusi penuh.",
+        "upload_info": "⬆️ Tolong tambah foto dulu untuk pakai alat di bawah.",
+        "tools_title": "### 🔧 Alat Editing Foto",
+        "tools_subtitle": "🎛️ Pilih kotak di bawah untuk buka setelan perubahan atau penyesuaian.",
+        "geo_title": "#### 🔄 Perubahan Bentuk",
+        "geo_desc": "Perubahan bentuk mengubah posisi titik, ukuran, dan arah menggunakan tindakan lurus (matriks).",
+        "btn_translation": "↔️ Pindah",
+        "btn_scaling": "📏 Ukuran",
+        "btn_rotation": "🔄 Putar",
+        "btn_shearing": "📐 Miring",
+        "btn_reflection": "🪞 Cermin",
+        "geo_info": "🔔 Tolong tambah foto dulu untuk coba perubahan.",
+        "trans_settings": "**↔️ Setelan Pindah**",
+        "trans_dx": "dx (geser samping)",
+        "trans_dy": "dy (geser atas-bawah)",
+        "btn_apply": "Pakai",
+        "trans_result": "Hasil Pindah",
+        "scale_settings": "**📏 Setelan Ukuran**",
+        "scale_x": "Ukuran X",
+        "scale_y": "Ukuran Y",
+        "scale_result": "Hasil Ukuran",
+        "rot_settings": "**🔄 Setelan Putar**",
+        "rot_angle": "Sudut putar (derajat)",
+        "rot_result": "Hasil Putar",
+        "shear_settings": "**📐 Setelan Miring**",
+        "shear_x": "Faktor miring X",
+        "shear_y": "Faktor miring Y",
+        "shear_result": "Hasil Miring",
+        "refl_settings": "**🪞 Setelan Cermin**",
+        "refl_axis": "Garis cermin",
+        "refl_result": "Hasil Cermin",
+        "hist_title": "#### 📈 Bagan Foto",
+        "hist_desc": "Bagan menampilkan sebaran kekuatan titik (redup–terang), berguna untuk periksa cahaya dan bayangan.",
+        "btn_histogram": "Tampilkan Bagan 📈",
+        "hist_warning": "Tolong tambah foto dulu untuk tampilkan bagan.",
+        "hist_x_label": "Nilai titik",
+        "hist_y_label": "Jumlah",
+        "filter_title": "#### 🔧 Penyesuaian Foto",
+        "filter_desc": "Penyesuaian mengubah nilai titik berdasarkan tetangga (pencampuran) untuk lakukan halus, fokus, temukan garis, hilangkan latar, dan lain.",
+        "btn_blur": "🔲 Halus",
+        "btn_sharpen": "✨ Fokus",
+        "btn_background": "🎯 Latar",
+        "btn_grayscale": "⚫ Hitam Putih",
+        "btn_edge": "🔍 Garis",
+        "btn_brightness": "☀️ Cahaya",
+        "filter_info": "🔔 Tolong tambah foto dulu untuk pakai penyesuaian.",
+        "blur_settings": "**🔲 Setelan Penyesuaian Halus**",
+        "blur_kernel": "Ukuran kisi",
+        "blur_result": "Hasil Halus",
+        "sharpen_settings": "**✨ Setelan Penyesuaian Fokus**",
+        "sharpen_desc": "Tingkatkan rincian dan garis di foto.",
+        "sharpen_result": "Hasil Fokus",
+        "bg_settings": "**🎯 Setelan Hilangkan Latar**",
+        "bg_method": "Cara (demo pakai HSV saja sekarang)",
+        "bg_result": "Hasil Hilangkan Latar",
+        "bg_mode": "Mode mask",
+        "bg_mode_help": "auto menebak dari kecerahan tepi foto; pilih mode lain bila hasilnya kurang pas.",
+        "bg_profiler": "⏱️ Tampilkan profiler tahap",
+        "btn_bg_compare": "🔍 Bandingkan semua mode",
+        "bg_compare_stats": "Semua mode selesai dalam {wall:.0f} ms (jumlah waktu per mode {total:.0f} ms)",
+        "bg_profiler_title": "⏱️ Profiler (total {total:.0f} ms)",
+        "cache_stats_title": "🗄️ Statistik cache",
+        "gray_settings": "**⚫ Setelan Ubah Hitam Putih**",
+        "gray_desc": "Ubah foto ke hitam putih (abu-abu).",
+        "gray_result": "Hasil Hitam Putih",
+        "edge_settings": "**🔍 Setelan Temukan Garis**",
+        "edge_method": "Cara garis",
+        "edge_result": "Foto Garis",
+        "bright_settings": "**☀️ Setelan Cahaya & Bayangan**",
+        "bright_brightness": "Cahaya",
+        "bright_contrast": "Bayangan",
+        "bright_result": "Hasil Cahaya/Bayangan",
+        "team_title": "### 👥 Orang Kelompok",
+        "team_subtitle": "Kelompok 12 – Orang dan Tugas",
+        "team_sid": "ID:",
+        "team_role": "Tugas:",
+        "team_contribution": "Kontribusi:",
+        "upload_method_title": "### Cara Penguploadan Foto",
+        "upload_method_text": "**Langkah-langkah untuk mengupload foto:**\n1. Klik tombol **\"Tambah foto di sini (PNG/JPG/JPEG) 📂\"** yang terletak di bagian atas halaman.\n2. Pilih file gambar dari perangkat Anda (format yang didukung: PNG, JPG, atau JPEG).\n3. Tunggu hingga gambar berhasil diupload dan ditampilkan di layar.\n4. Jika berhasil, Anda akan melihat pesan konfirmasi dan preview gambar awal.\n5. Sekarang Anda dapat menggunakan alat editing di kolom kiri (transformasi geometris) dan kanan (penyesuaian gambar).",
+        "team_group": "Kelompok:",
+        "axis_x": "Garis-X",
+        "axis_y": "Garis-Y",
+        "axis_diag": "Silang",
+        "dark_mode": "Gaya Malam",
+        "light_mode": "Gaya Siang",
+        "btn_stack_add": "➕ Tumpuk",
+        "stack_title": "#### 🧱 Tumpukan Perubahan",
+        "stack_desc": "Perubahan yang ditumpuk dikalikan jadi satu matriks 3×3 dan dipakai dengan satu kali warp.",
+        "stack_empty": "Tumpukan masih kosong. Tekan ➕ Tumpuk di setelan perubahan.",
+        "btn_stack_show": "Pakai Tumpukan ✅",
+        "btn_stack_undo": "↩️ Batal",
+        "btn_stack_clear": "🗑️ Kosongkan",
+        "stack_result": "Hasil Tumpukan",
+        "video_title": "#### 🎞️ Mode Video",
+        "video_desc": "Terapkan satu perubahan atau penyesuaian ke setiap frame video. Decode, proses, dan encode jalan di thread terpisah dengan antrean terbatas.",
+        "video_upload": "Tambah video (MP4/MOV/WEBM) 🎞️",
+        "video_sample": "Atau pakai klip contoh",
+        "video_tool": "Alat",
+        "video_format": "Format hasil (WebM bisa diputar di browser, MP4 lebih cepat)",
+        "btn_video_run": "Proses Video ▶️",
+        "video_progress": "Memproses frame {done}/{total}",
+        "video_stats": "✅ {frames} frame dalam {elapsed:.1f} dtk ({fps:.1f} fps)",
+        "video_error": "Error saat memproses video: {error}",
+        "btn_job_cancel": "⏹️ Batalkan",
+        "job_running": "Sedang diproses…",
+        "job_cancelling": "Membatalkan…",
+        "job_cancelled": "Proses dibatalkan.",
+        "bg_job_mask": "Menghitung mask",
+        "bg_job_composite": "Menyusun hasil",
+        "bg_mask_preview": "Mask (hasil sementara)",
+        "video_latest_frame": "Frame terakhir yang diproses",
+    },
+    "en": {
+        "title": "🔢 Matrix Operations for Visual Editing",
+        "subtitle": "🎯 Live exploration of 2D matrix changes and picture adjustments",
+        "app_goal": "🎯 **Goal:** A hands-on exploration showing how 2D matrix changes and picture adjustments affect visuals through linear algebra ideas.",
+        "features": "- ↩️ Changes: moving, sizing, turning, slanting, flipping\n- 🧽 Adjustments: smoothing, focusing, outline spotting, backdrop clearing, turning to monochrome, tweaking light & shade",
+        "concept_1_title": "### 🌀 2D Matrix Changes",
+        "concept_1_text1": "A flat image is a group of spots \\((x, y)\\) that get moved by straight-line actions like moving, sizing, turning, slanting, and flipping, shown by 2×2 or 3×3 matrices (uniform spots).",
+        "concept_1_text2": "Using these matrices on spot places shifts them: sizing changes the scale, turning spins the view around its middle, slanting makes it lean, and flipping reverses the view on a chosen line.",
+        "concept_2_title": "### 📊 Picture Adjustments (Mixing)",
+        "concept_2_text1": "Adjusting uses a tiny grid (mixing matrix) that glides over the image; at each spot, it makes a fresh spot value by adding up the grid times nearby spots.",
+        "concept_2_text2": "Grids with even good numbers make the view softer or fuzzy, while grids with a big good middle and bad sides make it sharper and highlight edges.",
+        "concept_3_title": "### 🎲 Why Hands-On?",
+        "concept_3_text1": "The app is hands-on since users can tweak settings (such as turn degrees, size rates, slant strengths, grid kinds for smooth or focus, etc.) and right away see the changes on the view. ✨",
+        "concept_3_text2": "It links the grid or matrix setup to seen effects, making thoughts like straight changes and mixing simpler to grasp naturally.",
+        "quick_concepts": "#### 📝 Key Ideas",
+        "quick_concepts_text": "- ↩️ 2D Changes: shift spot places (moving, sizing, turning, slanting, flipping).\n- 📊 Mixing: a tiny grid gliding over the image to make fresh spot values.",
+        "upload_title": "### 📷 Add Picture",
+        "upload_label": "Add a picture here (PNG/JPG/JPEG) 📂",
+        "upload_success": "✅ Picture added well!",
+        "upload_preview": "📷 Starting Picture View",
+        "preview_mode": "⚡ Fast preview mode",
+        "preview_help": "Tools run on a small copy (long edge {edge} px); downloads are still full resolution.",
+        "upload_info": "⬆️ Kindly add a picture first to use the tools below.",
+        "tools_title": "### 🔧 Picture Editing Tools",
+        "tools_subtitle": "🎛️ Pick a box below to open change or adjust settings.",
+        "geo_title": "#### 🔄 Shape Changes",
+        "geo_desc": "Shape changes alter the spot position, size, and direction using straight actions (matrices).",
+        "btn_translation": "↔️ Move",
+        "btn_scaling": "📏 Size",
+        "btn_rotation": "🔄 Turn",
+        "btn_shearing": "📐 Slant",
+        "btn_reflection": "🪞 Mirror",
+        "geo_info": "🔔 Kindly add a picture first to try changes.",
+        "trans_settings": "**↔️ Move Settings**",
+        "trans_dx": "dx (side move)",
+        "trans_dy": "dy (up-down move)",
+        "btn_apply": "Use",
+        "trans_result": "Move Outcome",
+        "scale_settings": "**📏 Size Settings**",
+        "scale_x": "Size X",
+        "scale_y": "Size Y",
+        "scale_result": "Size Outcome",
+        "rot_settings": "**🔄 Turn Settings**",
+        "rot_angle": "Turn angle (degrees)",
+        "rot_result": "Turn Outcome",
+        "shear_settings": "**📐 Slant Settings**",
+        "shear_x": "Slant factor X",
+        "shear_y": "Slant factor Y",
+        "shear_result": "Slant Outcome",
+        "refl_settings": "**🪞 Mirror Settings**",
+        "refl_axis": "Mirror line",
+        "refl_result": "Mirror Outcome",
+        "hist_title": "#### 📈 Picture Chart",
+        "hist_desc": "The chart displays the spread of spot strengths (dim–bright), handy for checking light and shade.",
+        "btn_histogram": "Show Chart 📈",
+        "hist_warning": "Kindly add a picture first to show the chart.",
+        "hist_x_label": "Pixel value",
+        "hist_y_label": "Frequency",
+        "filter_title": "#### 🔧 Picture Adjustments",
+        "filter_desc": "Adjustments change spot values based on neighbors (mixing) to do smooth, focus, outline finding, backdrop removal, and more.",
+        "btn_blur": "🔲 Smooth",
+        "btn_sharpen": "✨ Focus",
+        "btn_background": "🎯 Backdrop",
+        "btn_grayscale": "⚫ Monochrome",
+        "btn_edge": "🔍 Outline",
+        "btn_brightness": "☀️ Light",
+        "filter_info": "🔔 Kindly add a picture first to use adjustments.",
+        "blur_settings": "**🔲 Smooth Adjustment Settings**",
+        "blur_kernel": "Grid size",
+        "blur_result": "Smooth Outcome",
+        "sharpen_settings": "**✨ Focus Adjustment Settings**",
+        "sharpen_desc": "Boost details and outlines in the picture.",
+        "sharpen_result": "Focus Outcome",
+        "bg_settings": "**🎯 Backdrop Removal Settings**",
+        "bg_method": "Way (demo uses HSV only now)",
+        "bg_result": "Backdrop Removal Outcome",
+        "bg_mode": "Mask mode",
+        "bg_mode_help": "auto guesses from the brightness along the photo edges; pick another mode if the result looks off.",
+        "bg_profiler": "⏱️ Show stage profiler",
+        "btn_bg_compare": "🔍 Compare all modes",
+        "bg_compare_stats": "All modes finished in {wall:.0f} ms (per-mode times add up to {total:.0f} ms)",
+        "bg_profiler_title": "⏱️ Profiler (total {total:.0f} ms)",
+        "cache_stats_title": "🗄️ Cache statistics",
+        "gray_settings": "**⚫ Monochrome Change Settings**",
+        "gray_desc": "Change the picture to monochrome (black and white).",
+        "gray_result": "Monochrome Outcome",
+        "edge_settings": "**🔍 Outline Finding Settings**",
+        "edge_method": "Outline way",
+        "edge_result": "Outline Picture",
+        "bright_settings": "**☀️ Light & Shade Settings**",
+        "bright_brightness": "Light",
+        "bright_contrast": "Shade",
+        "bright_result": "Light/Shade Outcome",
+        "team_title": "### 👥 Group People",
+        "team_subtitle": "Group 12 – People and Jobs",
+        "team_sid": "ID:",
+        "team_role": "Job:",
+        "upload_method_title": "### How to Upload Photo",
+        "upload_method_text": "**Steps to upload a photo:**\n1. Click the **\"Add a picture here (PNG/JPG/JPEG) 📂\"** button located at the top of the page.\n2. Select an image file from your device (supported formats: PNG, JPG, or JPEG).\n3. Wait until the image is successfully uploaded and displayed on the screen.\n4. If successful, you will see a confirmation message and a preview of the initial image.\n5. Now you can use the editing tools in the left column (geometric transformations) and right column (image adjustments).",
+        "team_group": "Group:",
+        "team_contribution": "Contribution:",
+        "axis_x": "X-line",
+        "axis_y": "Y-line",
+        "axis_diag": "Cross",
+        "dark_mode": "Night Style",
+        "light_mode": "Day Style",
+        "btn_stack_add": "➕ Stack",
+        "stack_title": "#### 🧱 Change Stack",
+        "stack_desc": "Stacked changes are multiplied into one 3×3 matrix and applied with a single warp.",
+        "stack_empty": "The stack is empty. Press ➕ Stack in the change settings.",
+        "btn_stack_show": "Use Stack ✅",
+        "btn_stack_undo": "↩️ Undo",
+        "btn_stack_clear": "🗑️ Clear",
+        "stack_result": "Stack Outcome",
+        "video_title": "#### 🎞️ Video Mode",
+        "video_desc": "Apply one change or adjustment to every frame of a video. Decoding, processing and encoding run on separate threads with bounded queues.",
+        "video_upload": "Add a video (MP4/MOV/WEBM) 🎞️",
+        "video_sample": "Or use a sample clip",
+        "video_tool": "Tool",
+        "video_format": "Output format (WebM plays in the browser, MP4 is faster)",
+        "btn_video_run": "Process Video ▶️",
+        "video_progress": "Processing frame {done}/{total}",
+        "video_stats": "✅ {frames} frames in {elapsed:.1f} s ({fps:.1f} fps)",
+        "video_error": "Error while processing video: {error}",
+        "btn_job_cancel": "⏹️ Cancel",
+        "job_running": "Working…",
+        "job_cancelling": "Cancelling…",
+        "job_cancelled": "Cancelled.",
+        "bg_job_mask": "Computing mask",
+        "bg_job_composite": "Compositing",
+        "bg_mask_preview": "Mask (partial result)",
+        "video_latest_frame": "Latest processed frame",
+    },
+    "zh": {
+        "title": "🧮 图像处理中的矩阵变换",
+        "subtitle": "🎯 实时探索二维矩阵变化和图片调整",
+        "app_goal": "🎯 **目标：** 通过线性代数理念展示二维矩阵变化和图片调整如何影响视觉效果的动手探索。",
+        "features": "- ↩️ 变化：移动、调整大小、旋转、倾斜、翻转\n- 🧽 调整：平滑、聚焦、轮廓检测、背景清除、转为单色、调整光线和阴影",
+        "concept_1_title": "### 🌀 二维矩阵变化",
+        "concept_1_text1": "平面图像是一组点 \\((x, y)\\)，通过直线动作如移动、调整大小、旋转、倾斜和翻转来移动，由2×2或3×3矩阵表示（均匀点）。",
+        "concept_1_text2": "在点位置使用这些矩阵会移动它们：调整大小改变比例，旋转围绕中间旋转视图，倾斜使其倾斜，翻转在选定线上反转视图。",
+        "concept_2_title": "### 📊 图片调整（混合）",
+        "concept_2_text1": "调整使用一个小网格（混合矩阵），在图像上滑动；在每个点，它通过添加网格乘以附近点来制作新的点值。",
+        "concept_2_text2": "具有均匀好数字的网格使视图更柔和或模糊，而具有大好中间和坏侧面的网格使其更锐利并突出边缘。",
+        "concept_3_title": "### 🎲 为什么动手？",
+        "concept_3_text1": "该应用是动手式的，因为用户可以调整设置（如转动度数、大小率、倾斜强度、用于平滑或聚焦的网格种类等），并立即在视图上看到变化。✨",
+        "concept_3_text2": "它将网格或矩阵设置链接到可见效果，使直线变化和混合等思想更容易自然理解。",
+        "quick_concepts": "#### 📝 关键理念",
+        "quick_concepts_text": "- ↩️ 二维变化：移动点位置（移动、调整大小、旋转、倾斜、翻转）。\n- 📊 混合：一个小网格在图像上滑动以制作新的点值。",
+        "upload_title": "### 📷 添加图片",
+        "upload_label": "在此处添加图片（PNG/JPG/JPEG）📂",
+        "upload_success": "✅ 图片添加成功！",
+        "upload_preview": "📷 起始图片视图",
+        "preview_mode": "⚡ 快速预览模式",
+        "preview_help": "工具在缩小副本上运行（长边 {edge} 像素）；下载仍为全分辨率。",
+        "upload_info": "⬆️ 请先添加图片以使用下面的工具。",
+        "tools_title": "### 🔧 图片编辑工具",
+        "tools_subtitle": "🎛️ 选择下面的框以打开变化或调整设置。",
+        "geo_title": "#### 🔄 形状变化",
+        "geo_desc": "形状变化使用直线动作（矩阵）改变点位置、大小和方向。",
+        "btn_translation": "↔️ 移动",
+        "btn_scaling": "📏 大小",
+        "btn_rotation": "🔄 旋转",
+        "btn_shearing": "📐 倾斜",
+        "btn_reflection": "🪞 镜像",
+        "geo_info": "🔔 请先添加图片以尝试变化。",
+        "trans_settings": "**↔️ 移动设置**",
+        "trans_dx": "dx（侧面移动）",
+        "trans_dy": "dy（上下移动）",
+        "btn_apply": "使用",
+        "trans_result": "移动结果",
+        "scale_settings": "**📏 大小设置**",
+        "scale_x": "大小 X",
+        "scale_y": "大小 Y",
+        "scale_result": "大小结果",
+        "rot_settings": "**🔄 旋转设置**",
+        "rot_angle": "旋转角度（度）",
+        "rot_result": "旋转结果",
+        "shear_settings": "**📐 倾斜设置**",
+        "shear_x": "倾斜因子 X",
+        "shear_y": "倾斜因子 Y",
+        "shear_result": "倾斜结果",
+        "refl_settings": "**🪞 镜像设置**",
+        "refl_axis": "镜像线",
+        "refl_result": "镜像结果",
+        "hist_title": "#### 📈 图片图表",
+        "hist_desc": "图表显示点强度的分布（暗–亮），有助于检查光线和阴影。",
+        "btn_histogram": "显示图表 📈",
+        "hist_warning": "请先添加图片以显示图表。",
+        "hist_x_label": "像素值",
+        "hist_y_label": "频率",
+        "filter_title": "#### 🔧 图片调整",
+        "filter_desc": "调整基于邻居（混合）改变点值以进行平滑、聚焦、轮廓查找、背景移除等。",
+        "btn_blur": "🔲 平滑",
+        "btn_sharpen": "✨ 聚焦",
+        "btn_background": "🎯 背景",
+        "btn_grayscale": "⚫ 单色",
+        "btn_edge": "🔍 轮廓",
+        "btn_brightness": "☀️ 光线",
+        "filter_info": "🔔 请先添加图片以使用调整。",
+        "blur_settings": "**🔲 平滑调整设置**",
+        "blur_kernel": "网格大小",
+        "blur_result": "平滑结果",
+        "sharpen_settings": "**✨ 聚焦调整设置**",
+        "sharpen_desc": "提升图片中的细节和轮廓。",
+        "sharpen_result": "聚焦结果",
+        "bg_settings": "**🎯 背景移除设置**",
+        "bg_method": "方式（演示目前仅使用HSV）",
+        "bg_result": "背景移除结果",
+        "bg_mode": "蒙版模式",
+        "bg_mode_help": "auto 根据照片边缘亮度自动判断；效果不理想时请选择其他模式。",
+        "bg_profiler": "⏱️ 显示阶段分析器",
+        "btn_bg_compare": "🔍 比较所有模式",
+        "bg_compare_stats": "所有模式在 {wall:.0f} 毫秒内完成（各模式时间合计 {total:.0f} 毫秒）",
+        "bg_profiler_title": "⏱️ 分析器（总计 {total:.0f} 毫秒）",
+        "cache_stats_title": "🗄️ 缓存统计",
+        "gray_settings": "**⚫ 单色变化设置**",
+        "gray_desc": "将图片转为单色（黑白）。",
+        "gray_result": "单色结果",
+        "edge_settings": "**🔍 轮廓查找设置**",
+        "edge_method": "轮廓方式",
+        "edge_result": "轮廓图片",
+        "bright_settings": "**☀️ 光线和阴影设置**",
+        "bright_brightness": "光线",
+        "bright_contrast": "阴影",
+        "bright_result": "光线/阴影结果",
+        "team_title": "### 👥 组员",
+        "team_subtitle": "第12组 – 人员和职务",
+        "team_sid": "ID:",
+        "team_role": "职务:",
+        "team_group": "组:",
+        "team_contribution": "帮助：",
+        "upload_method_title": "### 如何上传照片",
+        "upload_method_text": "**上传照片的步骤：**\n1. 点击位于页面顶部的 **\"在此处添加图片（PNG/JPG/JPEG）📂\"** 按钮。\n2. 从您的设备中选择图像文件（支持的格式：PNG、JPG 或 JPEG）。\n3. 等待图像成功上传并显示在屏幕上。\n4. 如果成功，您将看到确认消息和初始图像的预览。\n5. 现在您可以使用左侧列（几何变换）和右侧列（图像调整）中的编辑工具。",
+        "axis_x": "X线",
+        "axis_y": "Y线",
+        "axis_diag": "交叉",
+        "dark_mode": "夜间风格",
+        "light_mode": "白天风格",
+        "btn_stack_add": "➕ 堆叠",
+        "stack_title": "#### 🧱 变换堆栈",
+        "stack_desc": "堆叠的变换会相乘为一个 3×3 矩阵，并只进行一次变形。",
+        "stack_empty": "堆栈为空。请在变换设置中点击 ➕ 堆叠。",
+        "btn_stack_show": "使用堆栈 ✅",
+        "btn_stack_undo": "↩️ 撤销",
+        "btn_stack_clear": "🗑️ 清空",
+        "stack_result": "堆栈结果",
+        "video_title": "#### 🎞️ 视频模式",
+        "video_desc": "对视频的每一帧应用一种变换或调整。解码、处理和编码在独立线程中运行，并使用有界队列。",
+        "video_upload": "添加视频（MP4/MOV/WEBM）🎞️",
+        "video_sample": "或使用示例片段",
+        "video_tool": "工具",
+        "video_format": "输出格式（WebM 可在浏览器播放，MP4 更快）",
+        "btn_video_run": "处理视频 ▶️",
+        "video_progress": "正在处理帧 {done}/{total}",
+        "video_stats": "✅ {elapsed:.1f} 秒内处理 {frames} 帧（{fps:.1f} fps）",
+        "video_error": "处理视频时出错：{error}",
+        "btn_job_cancel": "⏹️ 取消",
+        "job_running": "处理中…",
+        "job_cancelling": "正在取消…",
+        "job_cancelled": "已取消。",
+        "bg_job_mask": "正在计算遮罩",
+        "bg_job_composite": "正在合成",
+        "bg_mask_preview": "遮罩（中间结果）",
+        "video_latest_frame": "最新处理的帧",
+    }
+}
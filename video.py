@@ -0,0 +1,202 @@
+"""Streaming frame-by-frame video processing.
+
+Decode, proses, dan encode jalan sebagai pipeline dengan antrean terbatas:
+thread decoder -> thread pemroses -> penulis (thread pemanggil), jadi klip
+panjang tidak pernah dimuat utuh ke memori.
+
+Contoh:
+
+    python video.py l out.webm --op rotate:angle=10 --op grayscale
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+
+from processing import to_opencv, to_streamlit
+
+# Codec dicoba berurutan; VP8/WebM bisa diputar langsung di browser.
+FOURCCS = {
+    ".webm": ["VP80"],
+    ".mp4": ["avc1", "mp4v"],
+    ".avi": ["MJPG"],
+}
+
+_END = object()
+
+
+def _put(q, item, stop):
+    """Blocking put that gives up once `stop` is set (no deadlock on cancel)."""
+    while True:
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            if stop.is_set():
+                return False
+
+
+def _get(q, stop):
+    while True:
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                return _END
+
+
+def _open_writer(out_path, fps, size):
+    ext = os.path.splitext(out_path)[1].lower()
+    for code in FOURCCS.get(ext, ["mp4v"]):
+        writer = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*code), fps, size)
+        if writer.isOpened():
+            return writer
+        writer.release()
+    raise RuntimeError(f"No working video codec for {out_path!r}")
+
+
+def _to_writable(frame):
+    """Writer wants 3-channel frames: lift gray, drop alpha."""
+    if frame.ndim == 2:
+        return cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+    if frame.shape[2] == 4:
+        return frame[:, :, :3]
+    return frame
+
+
+def probe_video(path):
+    """Return (fps, frame_count, (w, h)) without decoding frames."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video: {path}")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    finally:
+        cap.release()
+    return fps, count, size
+
+
+def process_video(in_path, out_path, frame_fn, queue_size=8, progress=None):
+    """Apply `frame_fn(rgb) -> rgb` to every frame of `in_path`.
+
+    `progress(done, total)` is called from the calling thread after each
+    written frame (`total` may be 0 if the container does not report it).
+    Returns a dict with frame count, elapsed seconds and achieved fps.
+    """
+    cap = cv2.VideoCapture(in_path)
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video: {in_path}")
+    src_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    decoded = queue.Queue(maxsize=queue_size)
+    processed = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+
+    def decode():
+        try:
+            while not stop.is_set():
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                if not _put(decoded, to_streamlit(frame), stop):
+                    break
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            cap.release()
+            _put(decoded, _END, stop)
+
+    def work():
+        try:
+            while True:
+                frame = _get(decoded, stop)
+                if frame is _END:
+                    break
+                if not _put(processed, frame_fn(frame), stop):
+                    break
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(processed, _END, stop)
+
+    threads = [threading.Thread(target=decode, name="video-decode", daemon=True),
+               threading.Thread(target=work, name="video-process", daemon=True)]
+    for th in threads:
+        th.start()
+
+    writer = None
+    size = None
+    done = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            frame = _get(processed, stop)
+            if frame is _END:
+                break
+            frame = _to_writable(frame)
+            if writer is None:
+                size = (frame.shape[1], frame.shape[0])
+                writer = _open_writer(out_path, src_fps, size)
+            elif (frame.shape[1], frame.shape[0]) != size:
+                raise ValueError("frame_fn must return frames of a constant size")
+            writer.write(to_opencv(frame))
+            done += 1
+            if progress is not None:
+                progress(done, total)
+    finally:
+        stop.set()
+        for th in threads:
+            th.join()
+        if writer is not None:
+            writer.release()
+
+    if errors:
+        raise errors[0]
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": done,
+        "elapsed": elapsed,
+        "fps": done / elapsed if elapsed > 0 else 0.0,
+        "source_fps": src_fps,
+        "size": size,
+    }
+
+
+def main(argv=None):
+    # Spesifikasi --op sama dengan batch.py.
+    from batch import parse_op, run_ops
+
+    parser = argparse.ArgumentParser(description="Apply transforms/filters to a video, frame by frame.")
+    parser.add_argument("input", help="input video")
+    parser.add_argument("output", help="output video (.webm, .mp4 or .avi)")
+    parser.add_argument("--op", dest="ops", action="append", type=parse_op, default=[],
+                        help="operation spec name:key=val,... (repeatable, applied in order)")
+    parser.add_argument("--queue-size", type=int, default=8,
+                        help="frames buffered between pipeline stages (default: 8)")
+    args = parser.parse_args(argv)
+
+    def report(done, total):
+        if done % 50 == 0 or done == total:
+            print(f"\r{done}/{total or '?'} frames", end="", file=sys.stderr, flush=True)
+
+    stats = process_video(args.input, args.output, lambda frame: run_ops(frame, args.ops),
+                          queue_size=args.queue_size, progress=report)
+    print(file=sys.stderr)
+    print(f"{stats['frames']} frames in {stats['elapsed']:.2f} s "
+          f"({stats['fps']:.1f} fps, source {stats['source_fps']:.1f} fps)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())